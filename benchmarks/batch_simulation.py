@@ -0,0 +1,188 @@
+# benchmarks/batch_simulation.py
+"""
+Balance sweeps with the lockstep NumPy simulator, checked against the graph.
+
+`--validate` plays the same seeds through the compiled graph (heuristic
+backend) and through `src.batch_sim`, then checks that
+  - the batch engine assigns exactly the roles `initialize_game` assigns for each seed,
+  - its vectorized tally and win checks agree with `tally_votes` and the graph's
+    game-over routing on randomized inputs,
+  - the outcome distributions agree: Evil win rate (two-proportion z-test) and
+    mean game length (Welch t-test) within --max-z standard errors.
+Tie-breaking uses different random streams, so individual games are not
+expected to match move for move.
+
+Usage:
+    python -m benchmarks.batch_simulation --players 5 7 9 13 --games 200000
+    python -m benchmarks.batch_simulation --validate --players 5 9 --graph-games 300
+"""
+import io
+import sys
+import math
+import time
+import json
+import random
+import argparse
+import logging
+from contextlib import redirect_stdout
+from typing import Dict, Any, List
+
+import numpy as np
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.graph_setup import get_graph, check_game_over_final
+from src.nodes.utility_nodes import initialize_game
+from src.nodes.day_nodes import tally_votes
+from src.decision_handler import set_ai_backend
+from src.heuristic_policy import seed_heuristic_policy
+from src import batch_sim
+
+DEFAULT_PLAYER_COUNTS = [5, 7, 9, 13, 17]
+
+
+# --- Reference: the graph ---
+
+def run_graph_game(num_players: int, seed: int) -> Dict[str, Any]:
+    """One all-heuristic game through the compiled graph, reset and seeded as run_game_sync does."""
+    random.seed(seed)
+    seed_heuristic_policy(seed)
+    player_ids = [f"P{i:03d}" for i in range(num_players)]
+    state = initialize_game({"player_ids": player_ids, "human_player_id": None})
+    roles = [batch_sim.ROLE_NAMES.index(p['role']) for p in state['players']]
+    winner, rounds = None, 0
+    with redirect_stdout(io.StringIO()):
+        for step_output in get_graph().stream(state, {"recursion_limit": 20 * num_players + 100}, stream_mode="updates"):
+            update = next(iter(step_output.values())) or {}
+            rounds = update.get('round_number', rounds)
+            winner = update.get('winner', winner)
+    return {"roles": roles, "winner": winner, "rounds": rounds}
+
+
+# --- Checks ---
+
+def check_rules(num_players: int, samples: int, rng: np.random.Generator) -> List[str]:
+    """Vectorized tally and win checks against the graph's own functions on random inputs."""
+    problems = []
+    player_ids = [f"P{i:03d}" for i in range(num_players)]
+    votes = rng.integers(-1, num_players, size=(samples, num_players))
+    _, targets, _ = batch_sim.tally(votes, num_players)
+    roles = batch_sim.random_roles(rng, samples, num_players)
+    alive = rng.random((samples, num_players)) < 0.6
+    winners = batch_sim.check_winner(alive, roles)
+    with redirect_stdout(io.StringIO()):
+        for row in range(samples):
+            cast = {player_ids[v]: player_ids[t] for v, t in enumerate(votes[row]) if t >= 0}
+            update = tally_votes({"votes": cast, "alive_players": player_ids, "round_number": 1, "day_digests": {}})
+            expected = update["execution_target"]
+            actual = player_ids[targets[row]] if targets[row] >= 0 else None
+            if expected != actual:
+                problems.append(f"tally mismatch for votes {cast}: graph {expected}, batch {actual}")
+            players = [{"id": player_ids[i], "role": batch_sim.ROLE_NAMES[roles[row, i]],
+                        "status": "alive" if alive[row, i] else "dead"} for i in range(num_players)]
+            graph_over = check_game_over_final({"players": players}) == "game_over_final"
+            if graph_over != (winners[row] != batch_sim.WINNER_NONE):
+                problems.append(f"win check mismatch for {players}: graph over={graph_over}, batch winner={winners[row]}")
+    return problems[:10]
+
+
+def compare_outcomes(num_players: int, num_games: int, base_seed: int, max_z: float) -> Dict[str, Any]:
+    seeds = list(range(base_seed, base_seed + num_games))
+    started = time.perf_counter()
+    graph_games = [run_graph_game(num_players, seed) for seed in seeds]
+    graph_seconds = time.perf_counter() - started
+
+    problems = []
+    roles = batch_sim.roles_for_seeds(seeds, num_players)
+    if roles.tolist() != [game["roles"] for game in graph_games]:
+        problems.append("role assignments differ from initialize_game")
+    # Several batch replicas of the same seeds, so the graph sample dominates the error.
+    replicas = 20
+    started = time.perf_counter()
+    batch = batch_sim.simulate(num_players, num_games * replicas, seed=base_seed, roles=np.tile(roles, (replicas, 1)))
+    batch_seconds = time.perf_counter() - started
+
+    graph_evil = np.array([game["winner"] == 'Evil' for game in graph_games], dtype=float)
+    batch_evil = (batch["winner"] == batch_sim.WINNER_EVIL).astype(float)
+    graph_rounds = np.array([game["rounds"] for game in graph_games], dtype=float)
+    batch_rounds = batch["rounds"].astype(float)
+    z_evil = _z(graph_evil, batch_evil)
+    z_rounds = _z(graph_rounds, batch_rounds)
+    if abs(z_evil) > max_z: problems.append(f"Evil win rate differs: z={z_evil:.2f}")
+    if abs(z_rounds) > max_z: problems.append(f"mean game length differs: z={z_rounds:.2f}")
+    return {
+        "players": num_players, "graph_games": num_games, "batch_games": len(batch_evil),
+        "graph_evil_win_rate": round(float(graph_evil.mean()), 4), "batch_evil_win_rate": round(float(batch_evil.mean()), 4),
+        "graph_mean_rounds": round(float(graph_rounds.mean()), 3), "batch_mean_rounds": round(float(batch_rounds.mean()), 3),
+        "z_evil_win_rate": round(z_evil, 2), "z_mean_rounds": round(z_rounds, 2),
+        "graph_games_per_second": round(num_games / graph_seconds, 1),
+        "batch_games_per_second": round(len(batch_evil) / batch_seconds, 1),
+        "problems": problems,
+    }
+
+
+def _z(a: np.ndarray, b: np.ndarray) -> float:
+    """Welch statistic for the difference of two means (the two-proportion z-test for 0/1 data)."""
+    se = math.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b)) if len(a) > 1 and len(b) > 1 else 0.0
+    if se == 0.0: return 0.0 if a.mean() == b.mean() else math.inf
+    return float((a.mean() - b.mean()) / se)
+
+
+# --- Sweep ---
+
+def sweep(player_counts: List[int], num_games: int, seed: int) -> List[Dict[str, Any]]:
+    results = []
+    for offset, num_players in enumerate(player_counts):
+        started = time.perf_counter()
+        summary = batch_sim.summarize(batch_sim.simulate(num_players, num_games, seed=seed + offset))
+        elapsed = time.perf_counter() - started
+        results.append({"players": num_players, **{k: round(v, 4) if isinstance(v, float) else v for k, v in summary.items()},
+                        "games_per_second": round(num_games / elapsed, 1) if elapsed else None})
+    return results
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Simulate many heuristic games at once with NumPy; optionally validate against the graph.")
+    parser.add_argument("--players", type=int, nargs="+", default=DEFAULT_PLAYER_COUNTS, help="Player counts to simulate.")
+    parser.add_argument("--games", type=int, default=100_000, help="Batch games per player count.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed.")
+    parser.add_argument("--validate", action="store_true", help="Compare with the graph on a shared sample of seeds instead of sweeping.")
+    parser.add_argument("--graph-games", type=int, default=200, help="Graph games per player count for --validate.")
+    parser.add_argument("--max-z", type=float, default=3.0, help="Largest accepted test statistic for --validate.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    out = sys.__stdout__
+
+    if args.validate:
+        set_ai_backend('heuristic')
+        rng = np.random.default_rng(args.seed)
+        results = []
+        for num_players in args.players:
+            result = compare_outcomes(num_players, args.graph_games, args.seed, args.max_z)
+            result["problems"] = check_rules(num_players, 200, rng) + result["problems"]
+            results.append(result)
+            status = "OK" if not result["problems"] else "MISMATCH"
+            print(f"{num_players:>3} players: Evil wins graph {result['graph_evil_win_rate']:.3f} vs batch {result['batch_evil_win_rate']:.3f} "
+                  f"(z={result['z_evil_win_rate']}), rounds {result['graph_mean_rounds']} vs {result['batch_mean_rounds']} "
+                  f"(z={result['z_mean_rounds']}); {result['graph_games_per_second']} vs {result['batch_games_per_second']} games/s  {status}", file=out)
+            for problem in result["problems"]: print(f"    - {problem}", file=out)
+    else:
+        results = sweep(args.players, args.games, args.seed)
+        print(f"{'players':>8} {'games':>9} {'good win':>9} {'evil win':>9} {'rounds':>7} {'imp voted out':>14} {'games/s':>11}", file=out)
+        for r in results:
+            print(f"{r['players']:>8} {r['games']:>9} {r['good_win_rate']:>9.3f} {r['evil_win_rate']:>9.3f} {r['mean_rounds']:>7.2f} "
+                  f"{r['imp_executed_rate']:>14.3f} {r['games_per_second']:>11}", file=out)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "batch_simulation", "created_at": time.time(), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# benchmarks/engine_throughput.py
+"""
+Pure-engine throughput benchmark.
+
+Runs complete games through the compiled LangGraph `graph` with the instant
+'scripted' AI backend and a null output sink, so LLM latency no longer hides
+what LangGraph, Pydantic validation, state copying and logging cost per step.
+`--executor native` runs the same games through the in-process executor instead.
+
+Usage:
+    python -m benchmarks.engine_throughput --players 5 10 25 50 100 --games 20
+    python -m benchmarks.engine_throughput --json bench_engine.json
+    python -m benchmarks.engine_throughput --executor native --players 5 25
+"""
+import io
+import sys
+import time
+import json
+import random
+import argparse
+import logging
+from collections import defaultdict
+from contextlib import redirect_stdout
+from typing import Dict, Any, List
+
+from rich.console import Console
+
+# --- Null Output Sink ---
+# Every src module does `from __main__ import console`, so defining it here first
+# silences all Rich output for the benchmark run.
+console = Console(quiet=True)
+
+from src.graph_setup import get_executor, EXECUTORS
+from src.nodes.utility_nodes import initialize_game
+from src.decision_handler import set_ai_backend
+
+DEFAULT_PLAYER_COUNTS = [5, 10, 25, 50, 100]
+
+
+def run_one_game(num_players: int, seed: int, executor: str = "langgraph") -> Dict[str, Any]:
+    """Plays one all-AI game; returns step count and per-node CPU/wall time."""
+    random.seed(seed)
+    player_ids = [f"P{i:03d}" for i in range(num_players)]
+    state = initialize_game({"player_ids": player_ids, "human_player_id": None})
+
+    node_cpu: Dict[str, float] = defaultdict(float)
+    node_wall: Dict[str, float] = defaultdict(float)
+    node_calls: Dict[str, int] = defaultdict(int)
+    steps = 0
+    winner = None
+    run_config = {"recursion_limit": 20 * num_players + 100}
+    graph = get_executor(executor) # Built once per process; keep that out of the first step's timing
+
+    cpu_mark, wall_mark = time.process_time(), time.perf_counter()
+    # Routing functions print() their decisions; send that to the sink as well.
+    with redirect_stdout(io.StringIO()):
+        for step_output in graph.stream(state, run_config):
+            cpu_now, wall_now = time.process_time(), time.perf_counter()
+            node_name = next(iter(step_output))
+            # Time since the previous yield = node body + executor overhead for this step.
+            node_cpu[node_name] += cpu_now - cpu_mark
+            node_wall[node_name] += wall_now - wall_mark
+            node_calls[node_name] += 1
+            steps += 1
+            node_state = step_output[node_name]
+            if isinstance(node_state, dict) and node_state.get('winner'):
+                winner = node_state['winner']
+            cpu_mark, wall_mark = time.process_time(), time.perf_counter()
+
+    return {"steps": steps, "winner": winner, "node_cpu": node_cpu, "node_wall": node_wall, "node_calls": node_calls}
+
+
+def benchmark_player_count(num_players: int, num_games: int, base_seed: int, executor: str = "langgraph") -> Dict[str, Any]:
+    node_cpu: Dict[str, float] = defaultdict(float)
+    node_calls: Dict[str, int] = defaultdict(int)
+    total_steps = 0
+    wins: Dict[str, int] = defaultdict(int)
+
+    started = time.perf_counter()
+    for game_index in range(num_games):
+        result = run_one_game(num_players, base_seed + game_index, executor)
+        total_steps += result["steps"]
+        wins[str(result["winner"])] += 1
+        for node, seconds in result["node_cpu"].items(): node_cpu[node] += seconds
+        for node, calls in result["node_calls"].items(): node_calls[node] += calls
+    elapsed = time.perf_counter() - started
+
+    return {
+        "players": num_players,
+        "executor": executor,
+        "games": num_games,
+        "elapsed_seconds": round(elapsed, 4),
+        "games_per_second": round(num_games / elapsed, 3) if elapsed else None,
+        "steps_per_second": round(total_steps / elapsed, 1) if elapsed else None,
+        "mean_steps_per_game": round(total_steps / num_games, 1),
+        "wins": dict(wins),
+        "node_cpu_ms_per_call": {
+            node: round(1000 * node_cpu[node] / node_calls[node], 3) for node in sorted(node_cpu)
+        },
+        "node_cpu_share": {
+            node: round(node_cpu[node] / sum(node_cpu.values()), 3) for node in sorted(node_cpu)
+        } if node_cpu else {},
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    out = sys.__stdout__
+    print(f"{'players':>8} {'games/s':>9} {'steps/s':>9} {'steps/game':>11}  top nodes by CPU share", file=out)
+    for r in results:
+        top_nodes = sorted(r["node_cpu_share"].items(), key=lambda kv: kv[1], reverse=True)[:3]
+        top_str = ", ".join(f"{n} {share:.0%} ({r['node_cpu_ms_per_call'][n]:.2f}ms)" for n, share in top_nodes)
+        print(f"{r['players']:>8} {r['games_per_second']:>9} {r['steps_per_second']:>9} {r['mean_steps_per_game']:>11}  {top_str}", file=out)
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Benchmark the game graph with instant scripted decisions.")
+    parser.add_argument("--players", type=int, nargs="+", default=DEFAULT_PLAYER_COUNTS, help="Player counts to benchmark (5 to 100).")
+    parser.add_argument("--games", type=int, default=10, help="Games per player count.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed+i.")
+    parser.add_argument("--executor", choices=EXECUTORS, default="langgraph", help="What runs the graph.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING) # INFO logging would dominate the measurement
+    set_ai_backend('scripted')
+
+    results = [benchmark_player_count(n, args.games, args.seed, args.executor) for n in args.players]
+    print_report(results)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "engine_throughput", "created_at": time.time(), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# benchmarks/executor_equivalence.py
+"""
+Checks that the native executor plays exactly the games LangGraph plays.
+
+Each seed is played twice, once per executor, with the same AI backend and the
+same per-game resets run_game_sync does. The two runs must produce the same
+sequence of (node, update) steps and the same final state; since every
+decision and every random draw happens inside the nodes, any difference in
+what the executors pass to a node shows up here. Also reports the speedup.
+
+Usage:
+    python -m benchmarks.executor_equivalence --players 5 9 25 --games 30
+    python -m benchmarks.executor_equivalence --backends heuristic --players 50 --games 5
+"""
+import io
+import sys
+import time
+import json
+import random
+import argparse
+import logging
+from contextlib import redirect_stdout
+from typing import Dict, Any, List, Optional, Tuple
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.graph_setup import get_executor
+from src.nodes.utility_nodes import initialize_game
+from src.decision_handler import set_ai_backend
+from src.state import apply_state_update
+from src.heuristic_policy import seed_heuristic_policy
+
+DEFAULT_PLAYER_COUNTS = [5, 9, 25]
+DEFAULT_BACKENDS = ["scripted", "heuristic"]
+
+
+def run_game(executor: str, num_players: int, seed: int) -> Tuple[List[Tuple[str, Any]], Dict[str, Any], float]:
+    """One all-AI game, reset and seeded as run_game_sync does. Returns (steps, final state, seconds)."""
+    random.seed(seed)
+    seed_heuristic_policy(seed)
+    player_ids = [f"P{i:03d}" for i in range(num_players)]
+    state = initialize_game({"player_ids": player_ids, "human_player_id": None})
+    graph = get_executor(executor)
+    steps: List[Tuple[str, Any]] = []
+    started = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for step_output in graph.stream(state, {"recursion_limit": 20 * num_players + 100}, stream_mode="updates"):
+            node_name = next(iter(step_output))
+            update = step_output[node_name]
+            steps.append((node_name, dict(update) if update else None))
+            if update: state = apply_state_update(state, update)
+    return steps, {k: (list(v) if k == 'public_log' else v) for k, v in state.items() if k != 'log_readers'}, time.perf_counter() - started
+
+
+def first_difference(a: List[Tuple[str, Any]], b: List[Tuple[str, Any]]) -> Optional[str]:
+    for index, (left, right) in enumerate(zip(a, b)):
+        if left[0] != right[0]: return f"step {index}: node {left[0]} vs {right[0]}"
+        if left[1] != right[1]:
+            keys = sorted(set(left[1] or {}) | set(right[1] or {}))
+            changed = [k for k in keys if (left[1] or {}).get(k) != (right[1] or {}).get(k)]
+            return f"step {index} ({left[0]}): updates differ in {changed}"
+    if len(a) != len(b): return f"step counts differ: {len(a)} vs {len(b)}"
+    return None
+
+
+def compare(backend: str, num_players: int, num_games: int, base_seed: int) -> Dict[str, Any]:
+    set_ai_backend(backend)
+    problems = []
+    seconds = {"langgraph": 0.0, "native": 0.0}
+    total_steps = 0
+    for seed in range(base_seed, base_seed + num_games):
+        reference, reference_state, reference_seconds = run_game("langgraph", num_players, seed)
+        native, native_state, native_seconds = run_game("native", num_players, seed)
+        seconds["langgraph"] += reference_seconds
+        seconds["native"] += native_seconds
+        total_steps += len(reference)
+        difference = first_difference(reference, native)
+        if difference is None and reference_state != native_state: difference = "final states differ"
+        if difference: problems.append(f"seed {seed}: {difference}")
+    return {
+        "backend": backend, "players": num_players, "games": num_games,
+        "mean_steps_per_game": round(total_steps / num_games, 1),
+        "langgraph_games_per_second": round(num_games / seconds["langgraph"], 2),
+        "native_games_per_second": round(num_games / seconds["native"], 2),
+        "speedup": round(seconds["langgraph"] / seconds["native"], 2) if seconds["native"] else None,
+        "problems": problems[:10],
+    }
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Check the native executor against LangGraph on the same seeds.")
+    parser.add_argument("--players", type=int, nargs="+", default=DEFAULT_PLAYER_COUNTS, help="Player counts to compare.")
+    parser.add_argument("--games", type=int, default=20, help="Seeds per backend and player count.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed.")
+    parser.add_argument("--backends", nargs="+", choices=DEFAULT_BACKENDS, default=DEFAULT_BACKENDS, help="AI backends to play with.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    out = sys.__stdout__
+
+    results = []
+    for backend in args.backends:
+        for num_players in args.players:
+            result = compare(backend, num_players, args.games, args.seed)
+            results.append(result)
+            status = "OK" if not result["problems"] else "MISMATCH"
+            print(f"{backend:>10} {num_players:>4} players: {result['langgraph_games_per_second']} vs "
+                  f"{result['native_games_per_second']} games/s (x{result['speedup']}), "
+                  f"{result['mean_steps_per_game']} steps/game  {status}", file=out)
+            for problem in result["problems"]: print(f"    - {problem}", file=out)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "executor_equivalence", "created_at": time.time(), "results": results}, f, indent=2)
+    if any(r["problems"] for r in results): sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# benchmarks/fault_injection.py
+"""
+Latency and throughput cost of recovering from LLM faults (see src/fault_injection.py).
+
+Plays --games all-LLM games at each total fault rate in --rates, split evenly
+over --kinds. The model is replaced by an offline responder: a random valid
+option key or a canned speech, returned after a latency drawn from
+--latencies-from (see latency_sim.LatencyModel). Everything behind the model
+is real: the route timeouts and failover, the circuit breakers, the request
+governor, ai_player's parsing, and the node failure branches with the GM
+handler. The games run on a virtual clock, so a 60 s timeout costs 60
+simulated seconds and no real time. One clock carries on from game to game,
+as in a long tournament. The breakers are reset before each rate.
+
+Reports, per rate:
+- the share of model calls that were faulted;
+- simulated seconds per game (mean and p95) and the increase over a fault-free run;
+- real milliseconds and games per second for the engine;
+- decisions that failed, and how the GM resolved them (recovered, failed, or
+  handler error);
+- decisions answered by the local policy while every route's breaker was open,
+  and breaker trips.
+
+Usage:
+    python -m benchmarks.fault_injection --games 50 --rates 0 0.05 0.1 0.2 0.4
+    python -m benchmarks.fault_injection --kinds malformed_json ambiguous_key --json bench_faults.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import random
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.circuit_breaker import reset_circuit_breakers, breaker_metrics
+from src.fault_injection import FaultInjector, FAULT_KINDS
+from src.latency_sim import LatencyModel, VirtualClockLoop, _percentile
+from src.llm_interface import set_fault_injector
+from src.rate_limiter import RPM_PER_KEY_ENV_VAR
+from src.settings import API_KEY_ENV_VAR, API_KEYS_ENV_VAR
+from src.tournament import Policy, GameSpec, play_game
+
+_OPTION_RE = re.compile(r"^\s+(\d+): \S+$", re.MULTILINE)
+_SPEECH = {"speech_content": "I have nothing certain yet, but I am watching the votes closely.",
+           "intent": "share_observation", "target_player": None, "tone": "neutral"}
+
+
+def _offline_responder(latency: LatencyModel, seed: int):
+    """Stands in for the model: a random listed option key, or a canned speech, after a sampled latency."""
+    rng = random.Random(f"{seed}:offline")
+
+    async def respond(system_prompt: str, user_prompt: str) -> str:
+        keys = sorted(set(_OPTION_RE.findall(user_prompt)))
+        await asyncio.sleep(latency.sample('vote' if keys else 'speak', rng))
+        return rng.choice(keys) if keys else json.dumps(_SPEECH)
+    return respond
+
+
+class _LastTrace:
+    """A trace sink for play_game that keeps only the latest finished game."""
+    trace = None
+
+    @classmethod
+    def add(cls, trace) -> None:
+        cls.trace = trace
+
+
+def _run_rate(rate: float, kinds: Sequence[str], games: int, num_players: int, base_seed: int,
+              latency: LatencyModel, clock: float) -> Dict[str, Any]:
+    reset_circuit_breakers()
+    injector = FaultInjector({kind: rate / len(kinds) for kind in kinds}, seed=base_seed,
+                             responder=_offline_responder(latency, base_seed))
+    set_fault_injector(injector)
+    policies = [Policy("llm", "llm")]
+    simulated: List[float] = []
+    real_seconds = 0.0
+    decisions = failed = local = errors = 0
+    gm = {"recovered": 0, "failed": 0, "handler_error": 0}
+    try:
+        for i in range(games):
+            loop = VirtualClockLoop(start=clock)
+            started = time.perf_counter()
+            result = play_game(GameSpec(i, base_seed + i, "llm", "llm"), policies, num_players, "native",
+                               traces=_LastTrace, loop=loop)
+            real_seconds += time.perf_counter() - started
+            simulated.append(loop.time() - clock)
+            clock = loop.time()
+            if result.error: errors += 1
+            trace = _LastTrace.trace
+            for row in trace.decisions:
+                decisions += 1
+                if row[6] != 'ok': failed += 1
+                if row[8] == 0: local += 1 # No model call: every breaker was open
+            for event in trace.events:
+                if event[4] == 'gm': gm[event[9]] = gm.get(event[9], 0) + 1
+    finally:
+        set_fault_injector(None)
+    metrics = injector.metrics()
+    return {
+        "fault_rate": rate, "games": games, "game_errors": errors,
+        "calls": metrics["calls"], "injected": metrics["injected"], "injected_rate": round(metrics["injected_rate"], 4),
+        "mean_game_seconds": round(sum(simulated) / games, 2),
+        "p95_game_seconds": round(_percentile(simulated, 0.95), 2),
+        "real_ms_per_game": round(1000 * real_seconds / games, 2),
+        "games_per_second": round(games / real_seconds, 2) if real_seconds else 0.0,
+        "decisions": decisions, "failed_decisions": failed, "gm": gm, "local_policy_decisions": local,
+        "breaker_trips": sum(m["trips"] for m in breaker_metrics().values()),
+        "clock": clock,
+    }
+
+
+def run(rates: Sequence[float], kinds: Sequence[str], games: int, num_players: int, base_seed: int,
+        latency: LatencyModel) -> Dict[str, Any]:
+    # Warm-up (imports, agent construction), so the first rate's real time is comparable
+    clock = _run_rate(0.0, kinds, 1, num_players, base_seed, latency, 0.0)["clock"]
+    results = []
+    for rate in rates:
+        result = _run_rate(rate, kinds, games, num_players, base_seed, latency, clock)
+        clock = result.pop("clock")
+        results.append(result)
+    baseline = next((r["mean_game_seconds"] for r in results if r["fault_rate"] == 0), None)
+    for r in results:
+        r["added_seconds_per_game"] = round(r["mean_game_seconds"] - baseline, 2) if baseline is not None else None
+    return {"players": num_players, "games": games, "kinds": list(kinds), "latencies": latency.source, "rates": results}
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    out = sys.__stdout__
+    print(f"{r['games']} games of {r['players']} players per rate; faults: {', '.join(r['kinds'])}; latencies: {r['latencies']}", file=out)
+    print(f"{'rate':>5} {'faulted':>8} {'sim s/game':>10} {'p95 s':>7} {'added s':>8} {'real ms':>8} {'games/s':>8} "
+          f"{'failed':>7} {'recov':>6} {'gm fail':>7} {'gm err':>7} {'local':>6} {'trips':>6}", file=out)
+    for x in r["rates"]:
+        added = f"{x['added_seconds_per_game']:>8.1f}" if x["added_seconds_per_game"] is not None else f"{'-':>8}"
+        print(f"{x['fault_rate']:>5.2f} {100 * x['injected_rate']:>7.1f}% {x['mean_game_seconds']:>10.1f} {x['p95_game_seconds']:>7.1f} "
+              f"{added} {x['real_ms_per_game']:>8.1f} {x['games_per_second']:>8.1f} {x['failed_decisions']:>7} "
+              f"{x['gm']['recovered']:>6} {x['gm']['failed']:>7} {x['gm']['handler_error']:>7} "
+              f"{x['local_policy_decisions']:>6} {x['breaker_trips']:>6}", file=out)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure the latency and throughput cost of recovering from injected LLM faults.")
+    parser.add_argument("--games", type=int, default=50, help="Games per fault rate.")
+    parser.add_argument("--players", type=int, default=7, help="Players per game.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed+i (the same deals at every rate).")
+    parser.add_argument("--rates", type=float, nargs="+", default=[0.0, 0.05, 0.1, 0.2, 0.4], help="Total fault rates to measure.")
+    parser.add_argument("--kinds", nargs="+", choices=FAULT_KINDS, default=list(FAULT_KINDS), help="Fault kinds; each rate is split evenly over them.")
+    parser.add_argument("--latencies-from", default=None, metavar="PATH", help="Game-trace directory, .npz part or game archive to draw model latencies from (default: placeholder latencies).")
+    parser.add_argument("--rpm", type=float, default=1000.0, help="Requests per minute allowed for the offline API key (when no keys are configured).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)
+    logging.getLogger().setLevel(logging.CRITICAL) # Every fault logs errors by design
+    if any(not 0.0 <= rate <= 1.0 for rate in args.rates):
+        print("Error: --rates must be between 0 and 1.", file=sys.__stderr__)
+        sys.exit(2)
+    if not os.getenv(API_KEY_ENV_VAR) and not os.getenv(API_KEYS_ENV_VAR):
+        os.environ[API_KEY_ENV_VAR] = "offline" # Never sent: the responder answers every call
+        os.environ.setdefault(RPM_PER_KEY_ENV_VAR, str(args.rpm))
+    result = run(args.rates, args.kinds, args.games, args.players, args.seed, LatencyModel.load(args.latencies_from))
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "fault_injection", "created_at": time.time(), "results": result}, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# benchmarks/game_archive.py
+"""
+Size and query speed of the SQLite game archive.
+
+Plays --games games with the native executor and archives each one. The
+players are the heuristic bots, but every decision first builds the real LLM
+prompts (role prompt, dynamic context, task). The prompt pair and the answer
+are stored as that decision's exchange, tagged with one of two made-up models
+(the Imp seat alternates between them). So the archived text is what an LLM
+tournament would store, without any LLM calls.
+
+Reports:
+- archive time per game and bytes per game on disk;
+- the compression ratio of the stored text, compared with compressing each
+  blob with no dictionary;
+- the latency of typical queries: Imp kills on round 1 with one model, failed
+  decisions of one prompt version, win rate per model and role, and reading
+  back one exchange and one transcript.
+
+Usage:
+    python -m benchmarks.game_archive --games 500 --players 7
+    python -m benchmarks.game_archive --archive /tmp/games.sqlite --json bench_archive.json
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import argparse
+import logging
+import tempfile
+import statistics
+from typing import Any, Callable, Dict
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.ai_player import load_base_prompt, prompt_version, _build_dynamic_context, _format_task_prompt
+from src.decision_handler import register_ai_backend
+from src.game_archive import GameArchive, zstd_available
+from src.game_trace import note_llm_call, note_llm_exchange
+from src.heuristic_policy import heuristic_decision
+from src.tournament import Policy, GameSpec, play_game
+
+MODELS = ("bench/model-a", "bench/model-b")
+
+
+def _prompted_heuristic(model: str) -> Callable:
+    """A backend that builds the LLM prompts, then answers with the heuristic policy as if `model` had."""
+    async def decide(context):
+        state, player_id = context['full_game_state'], context['player_id']
+        template = load_base_prompt(context.get('player_role', 'Unknown'))
+        user_prompt = f"{_build_dynamic_context(state, player_id, context.get('player_role'))}\n{_format_task_prompt(context)}"
+        decision = heuristic_decision(context)
+        note_llm_call(0.0, model=model)
+        note_llm_exchange(prompt_version(template), template.format(player_id=player_id), user_prompt,
+                          json.dumps(decision) if isinstance(decision, dict) else str(decision))
+        return decision
+    return decide
+
+
+def _timed(fn: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return {"median_ms": round(1000 * statistics.median(times), 3), "rows": len(result) if isinstance(result, list) else result if isinstance(result, int) else 1}
+
+
+def _unshared_ratio(archive: GameArchive, samples: int) -> float:
+    """Compression ratio of the same exchanges compressed one by one with no dictionary."""
+    rows = archive.query("SELECT game_id, seq FROM decisions WHERE exchange IS NOT NULL ORDER BY random() LIMIT ?", (samples,))
+    raw = stored = 0
+    if zstd_available():
+        import zstandard
+        compress = zstandard.ZstdCompressor(level=9).compress
+    else:
+        compress = lambda data: zlib.compress(data, 9)
+    for row in rows:
+        data = json.dumps(archive.exchange(row["game_id"], row["seq"]), ensure_ascii=False).encode('utf-8')
+        raw += len(data)
+        stored += len(compress(data)) + 1 # + the codec tag
+    return round(raw / stored, 2) if stored else 0.0
+
+
+def run(games: int, num_players: int, base_seed: int, path: str, repeats: int) -> Dict[str, Any]:
+    for model in MODELS: register_ai_backend(f"prompted:{model}", _prompted_heuristic(model))
+    policies = [Policy(model, f"prompted:{model}") for model in MODELS]
+    archive = GameArchive(path)
+    play_seconds = archive_seconds = 0.0
+    for i in range(games):
+        spec = GameSpec(i, base_seed + i, MODELS[0], MODELS[i % 2])
+        started = time.perf_counter()
+        # The sink keeps the finished trace, so archiving is timed apart from playing
+        result = play_game(spec, policies, num_players, "native", traces=_LastTrace)
+        play_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        archive.add(_LastTrace.trace)
+        archive_seconds += time.perf_counter() - started
+        if result.error: logging.warning(f"Game {spec} failed: {result.error}")
+    archive.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    stats = archive.stats()
+
+    imp_version = prompt_version(load_base_prompt('Imp'))
+    some_game = archive.query("SELECT id FROM games LIMIT 1")[0]["id"]
+    some_decision = archive.query("SELECT game_id, seq FROM decisions WHERE exchange IS NOT NULL ORDER BY random() LIMIT 1")[0]
+    queries = {
+        "imp_round1_kills_by_model": _timed(lambda: archive.events(kind='kill', round=1, actor_role='Imp', actor_model=MODELS[1]), repeats),
+        "imp_prompt_failed_decisions": _timed(lambda: archive.decisions(prompt_version=imp_version, action='imp_kill', outcome='none'), repeats),
+        "count_votes_by_model": _timed(lambda: archive.count('decisions', model=MODELS[0], action='vote'), repeats),
+        "win_rate_by_model_and_role": _timed(lambda: archive.win_rates(("model", "role")), repeats),
+        "read_one_exchange": _timed(lambda: archive.exchange(some_decision["game_id"], some_decision["seq"]), repeats),
+        "read_one_transcript": _timed(lambda: archive.transcript(some_game), repeats),
+    }
+    win_rates = archive.win_rates(("model", "role"))
+    result = {
+        "players": num_players, "games": stats["games"], "decisions": stats["decisions"], "events": stats["events"],
+        "codec": stats["dictionaries"][-1]["codec"] if stats["dictionaries"] else ("zstd" if zstd_available() else "zlib"),
+        "dictionaries": stats["dictionaries"],
+        "play_ms_per_game": round(1000 * play_seconds / games, 3),
+        "archive_ms_per_game": round(1000 * archive_seconds / games, 3),
+        "file_bytes_per_game": round(os.path.getsize(path) / max(1, stats["games"])),
+        "text_bytes_per_game": round(stats["text_bytes"] / max(1, stats["games"])),
+        "compression_ratio": stats["compression_ratio"],
+        "compression_ratio_without_dictionary": _unshared_ratio(archive, 2000),
+        "queries": queries,
+        "win_rates": [{k: (round(v, 3) if isinstance(v, float) else v) for k, v in row.items()} for row in win_rates],
+    }
+    archive.close()
+    return result
+
+
+class _LastTrace:
+    """A trace sink for play_game that keeps only the latest finished game."""
+    trace = None
+
+    @classmethod
+    def add(cls, trace) -> None:
+        cls.trace = trace
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    out = sys.__stdout__
+    print(f"{r['games']} games of {r['players']} players ({r['decisions']} decisions, {r['events']} events): "
+          f"{r['play_ms_per_game']:.1f} ms/game to play, {r['archive_ms_per_game']:.2f} ms/game to archive", file=out)
+    print(f"{r['file_bytes_per_game']} bytes/game on disk for {r['text_bytes_per_game']} bytes/game of text; "
+          f"{r['codec']} ratio {r['compression_ratio']} with the trained dictionary, "
+          f"{r['compression_ratio_without_dictionary']} without", file=out)
+    for name, q in r["queries"].items():
+        print(f"  {name:<30} {q['median_ms']:>9.3f} ms  ({q['rows']} rows)", file=out)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure game-archive size and query latency.")
+    parser.add_argument("--games", type=int, default=500, help="Games to play and archive.")
+    parser.add_argument("--players", type=int, default=7, help="Players per game.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed+i.")
+    parser.add_argument("--repeats", type=int, default=20, help="Runs per timed query (the median is reported).")
+    parser.add_argument("--archive", default=None, metavar="PATH", help="Archive file (default: a temporary file, removed afterwards; must not exist).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.archive and os.path.exists(args.archive):
+        print(f"Error: {args.archive} already exists.", file=sys.__stderr__)
+        sys.exit(2)
+    directory = tempfile.mkdtemp(prefix="archive-") if args.archive is None else None
+    try:
+        result = run(args.games, args.players, args.seed, args.archive or os.path.join(directory, "games.sqlite"), args.repeats)
+    finally:
+        if directory: shutil.rmtree(directory, ignore_errors=True)
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "game_archive", "created_at": time.time(), "results": result}, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/latency_sim.py
+"""
+Simulated game latency under different scheduling strategies (see src/latency_sim.py).
+
+Plays --games all-AI games per setting on a virtual clock. Every LLM decision
+waits for a latency drawn from the recorded distribution (--latencies-from: a
+game-trace directory, a .npz part or a game archive), or from placeholder
+log-normal latencies if none is given. The settings compare votes gathered
+concurrently or one at a time, each with hedged requests off and on
+(--hedge-quantile). All settings play the same seeds with the same draws.
+
+Reports, per setting: mean, p50 and p95 simulated seconds per game, the mean
+simulated seconds per phase, LLM requests per game, the share of requests that
+were hedges, and the real wall time the simulation took.
+
+Usage:
+    python -m benchmarks.latency_sim --games 1000 --players 7
+    python -m benchmarks.latency_sim --latencies-from /data/traces --hedge-quantile 0.95 --json bench_latency.json
+"""
+import sys
+import time
+import json
+import argparse
+import logging
+from typing import Any, Dict
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.graph_setup import EXECUTORS
+from src.latency_sim import LatencyModel, SchedulingSettings, simulate
+
+
+def run(games: int, num_players: int, base_seed: int, latency: LatencyModel, hedge_quantile: float,
+        executor: str) -> Dict[str, Any]:
+    settings = [
+        SchedulingSettings("concurrent votes", None, None),
+        SchedulingSettings("sequential votes", 1, None),
+        SchedulingSettings("concurrent votes, hedged", None, hedge_quantile),
+        SchedulingSettings("sequential votes, hedged", 1, hedge_quantile),
+    ]
+    summaries = simulate(settings, [base_seed + i for i in range(games)], num_players, latency, executor)
+    return {"players": num_players, "games": games, "latencies": latency.source,
+            "latency_model": latency.summary(), "settings": summaries}
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    out = sys.__stdout__
+    print(f"{r['games']} games of {r['players']} players per setting; latencies: {r['latencies']}", file=out)
+    for action, q in r["latency_model"].items():
+        print(f"  {action:<12} p50 {q['p50']:>6.2f}s  p90 {q['p90']:>6.2f}s  p99 {q['p99']:>6.2f}s  ({q['recorded']} recorded)", file=out)
+    print(f"{'setting':<28} {'mean s':>8} {'p50 s':>8} {'p95 s':>8} {'req/game':>9} {'hedged':>7} {'wall s':>7}", file=out)
+    for s in r["settings"]:
+        print(f"{s['setting']['name']:<28} {s['mean_seconds']:>8.1f} {s['p50_seconds']:>8.1f} {s['p95_seconds']:>8.1f} "
+              f"{s['requests_per_game']:>9.1f} {100 * s['hedged_share']:>6.1f}% {s['wall_seconds']:>7.2f}", file=out)
+        print(f"  per phase: {', '.join(f'{phase} {sec:.1f}s' for phase, sec in s['phase_mean_seconds'].items() if sec)}", file=out)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Simulate game latency on a virtual clock under different scheduling strategies.")
+    parser.add_argument("--games", type=int, default=1000, help="Games per setting.")
+    parser.add_argument("--players", type=int, default=7, help="Players per game.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed+i.")
+    parser.add_argument("--latencies-from", default=None, metavar="PATH", help="Game-trace directory, .npz part or game archive to draw LLM latencies from (default: placeholder latencies).")
+    parser.add_argument("--hedge-quantile", type=float, default=0.9, help="Latency quantile after which the hedged settings send a duplicate request.")
+    parser.add_argument("--executor", choices=EXECUTORS, default="native", help="What runs the graph.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    if not 0.0 < args.hedge_quantile < 1.0:
+        print("Error: --hedge-quantile must be between 0 and 1.", file=sys.__stderr__)
+        sys.exit(2)
+    result = run(args.games, args.players, args.seed, LatencyModel.load(args.latencies_from), args.hedge_quantile, args.executor)
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "latency_sim", "created_at": time.time(), "results": result}, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
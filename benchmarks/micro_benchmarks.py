@@ -0,0 +1,265 @@
+# benchmarks/micro_benchmarks.py
+"""
+Micro-benchmarks for the hot helpers and nodes.
+
+Each case is timed on synthetic game states parameterized by player count and
+public log length. Wall time is measured per call (inputs are rebuilt outside
+the timed region, since the nodes mutate state), then one extra call runs under
+`tracemalloc` to record the allocation peak. Logging is disabled while timing:
+the f-string log messages are still built, only the handler I/O is skipped.
+
+Usage:
+    python -m benchmarks.micro_benchmarks --players 5 25 100 --log-lengths 20 500 5000
+    python -m benchmarks.micro_benchmarks --json bench_micro.json --compare bench_micro_old.json
+"""
+import io
+import sys
+import copy
+import json
+import time
+import random
+import platform
+import argparse
+import logging
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Dict, Any, List, Callable, Tuple, Optional
+
+from rich.console import Console
+
+# --- Null Output Sink ---
+# Every src module does `from __main__ import console`; nodes print on each call.
+console = Console(quiet=True)
+
+from src.state import GraphState, ActionContext
+from src.ai_player import _build_dynamic_context, _format_task_prompt, _parse_option_key
+from src.gm_utils import handle_agent_decision_failure
+from src.utils import get_actor_and_targets
+from src.nodes.day_nodes import start_day_announce, tally_votes
+from src.nodes.utility_nodes import initialize_game, set_winner_and_end
+
+DEFAULT_PLAYER_COUNTS = [5, 25, 100]
+DEFAULT_LOG_LENGTHS = [20, 500, 5000]
+
+# A case builds fresh call arguments from the fixture, then the timed function runs on them.
+BenchCase = Tuple[Callable[[GraphState], tuple], Callable[..., Any]]
+
+
+# --- Fixtures ---
+
+def make_state(num_players: int, log_length: int, seed: int = 0) -> GraphState:
+    """A mid-game state: round 3, a night target pending, everyone voted, `log_length` mixed log lines."""
+    rng = random.Random(seed)
+    random.seed(seed) # initialize_game shuffles roles with the module-level RNG
+    player_ids = [f"P{i:03d}" for i in range(num_players)]
+    with redirect_stdout(io.StringIO()):
+        state = initialize_game({"player_ids": player_ids, "human_player_id": None})
+
+    log: List[str] = []
+    for i in range(log_length):
+        speaker = rng.choice(player_ids)
+        kind = i % 4
+        if kind == 0:
+            speech = {"speech_content": f"I think {rng.choice(player_ids)} is acting strange.", "intent": "accuse",
+                      "target_player": rng.choice(player_ids), "tone": "suspicious"}
+            log.append(f"{speaker}: {json.dumps(speech)}")
+        elif kind == 1:
+            log.append(f"VOTE: {speaker} voted.")
+        elif kind == 2:
+            log.append(f"VOTE_REVEAL: {speaker} voted for {rng.choice(player_ids)}")
+        else:
+            log.append(f"NARRATOR: Day {i // 50 + 1}. [bold]No deaths reported overnight.[/bold]")
+
+    alive = list(state['alive_players'])
+    state['round_number'] = 3
+    state['current_phase'] = 'Voting'
+    state['public_log'] = log
+    state['votes'] = {voter: rng.choice([p for p in alive if p != voter]) for voter in alive}
+    state['previous_round_votes'] = dict(state['votes'])
+    state['target_of_night_action'] = rng.choice(alive)
+    state['last_executed'] = rng.choice(alive)
+    investigator = next((p['id'] for p in state['players'] if p['role'] == 'Investigator'), None)
+    if investigator:
+        state['pending_night_results'] = {investigator: {'investigation': f"[bold]{alive[0]}[/bold] is [green]Good[/green]."}}
+    return state
+
+
+def _player_options(state: GraphState, exclude: str) -> Dict[str, str]:
+    targets = [p for p in state['alive_players'] if p != exclude]
+    return {str(i + 1): pid for i, pid in enumerate(targets)}
+
+
+def _vote_context(state: GraphState) -> ActionContext:
+    player_id = state['alive_players'][0]
+    return {
+        "action_type": "vote", "player_id": player_id, "is_human": False,
+        "options": _player_options(state, player_id),
+        "prompt_message": "Vote for the player you want to execute.",
+        "full_game_state": state, "player_role": "Villager",
+    }
+
+
+# --- Cases ---
+
+def build_cases() -> Dict[str, BenchCase]:
+    def investigator_of(state: GraphState) -> Tuple[str, str]:
+        for p in state['players']:
+            if p['role'] == 'Investigator': return p['id'], 'Investigator'
+        return state['alive_players'][0], 'Villager'
+
+    def gm_failure(status: str, action: str, cleaned: str) -> Callable[[GraphState], tuple]:
+        def setup(state: GraphState) -> tuple:
+            player_id = state['alive_players'][0]
+            details = {"status": status, "intended_action": action, "raw_output": cleaned, "cleaned_output": cleaned,
+                       "options": _player_options(state, player_id), "player_id": player_id}
+            return (copy.deepcopy(state), player_id, details)
+        return setup
+
+    return {
+        "build_dynamic_context": (
+            lambda s: (s, *investigator_of(s)),
+            lambda state, pid, role: _build_dynamic_context(state, pid, role)),
+        "format_task_prompt": (
+            lambda s: (_vote_context(s),),
+            _format_task_prompt),
+        "parse_option_key_direct": (
+            lambda s: ("2", _player_options(s, s['alive_players'][0])),
+            _parse_option_key),
+        "parse_option_key_standalone": (
+            lambda s: ("'3'.", _player_options(s, s['alive_players'][0])),
+            _parse_option_key),
+        "parse_option_key_ambiguous": (
+            lambda s: ("I pick 2, or maybe 3 because they were quiet.", _player_options(s, s['alive_players'][0])),
+            _parse_option_key),
+        "gm_failure_recovered": (
+            gm_failure("parsing_failed", "vote", "I pick 2 because they were quiet."),
+            handle_agent_decision_failure),
+        "gm_failure_final": (
+            gm_failure("parsing_failed", "investigate", "no idea, sorry"),
+            handle_agent_decision_failure),
+        "get_actor_and_targets": (
+            lambda s: (s, "Imp"),
+            get_actor_and_targets),
+        "tally_votes": (
+            lambda s: (copy.deepcopy(s),),
+            tally_votes),
+        "start_day_announce": (
+            lambda s: (copy.deepcopy(s),),
+            start_day_announce),
+        "set_winner_and_end": (
+            lambda s: (copy.deepcopy(s),),
+            set_winner_and_end),
+    }
+
+
+# --- Runner ---
+
+def measure(setup: Callable[[GraphState], tuple], fn: Callable[..., Any], state: GraphState,
+            iterations: int, warmup: int = 3) -> Dict[str, Any]:
+    for _ in range(warmup):
+        fn(*setup(state))
+
+    samples_ns: List[int] = []
+    for _ in range(iterations):
+        args = setup(state)
+        start = time.perf_counter_ns()
+        fn(*args)
+        samples_ns.append(time.perf_counter_ns() - start)
+
+    args = setup(state)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples_us = sorted(ns / 1000.0 for ns in samples_ns)
+    return {
+        "iterations": iterations,
+        "wall_us": {
+            "min": round(samples_us[0], 2),
+            "median": round(statistics.median(samples_us), 2),
+            "p90": round(samples_us[int(0.9 * (len(samples_us) - 1))], 2),
+            "mean": round(statistics.fmean(samples_us), 2),
+        },
+        "peak_alloc_kib": round((peak - baseline) / 1024.0, 2),
+    }
+
+
+def _iterations_for(num_players: int, log_length: int, base: int) -> int:
+    """Fewer repeats for the big fixtures (deepcopy setup dominates otherwise)."""
+    scale = max(1, (num_players * max(log_length, 1)) // 20_000)
+    return max(5, base // scale)
+
+
+def run_suite(player_counts: List[int], log_lengths: List[int], iterations: int,
+              only: Optional[List[str]] = None, seed: int = 0) -> List[Dict[str, Any]]:
+    cases = build_cases()
+    selected = [name for name in cases if not only or name in only]
+    results: List[Dict[str, Any]] = []
+    previous_disable = logging.root.manager.disable
+    logging.disable(logging.CRITICAL)
+    try:
+        with redirect_stdout(io.StringIO()):
+            for num_players in player_counts:
+                for log_length in log_lengths:
+                    state = make_state(num_players, log_length, seed)
+                    n = _iterations_for(num_players, log_length, iterations)
+                    for name in selected:
+                        setup, fn = cases[name]
+                        results.append({"case": name, "players": num_players, "log_length": log_length,
+                                        **measure(setup, fn, state, n)})
+    finally:
+        logging.disable(previous_disable)
+    return results
+
+
+# --- Reporting ---
+
+def _result_key(r: Dict[str, Any]) -> Tuple[str, int, int]:
+    return (r["case"], r["players"], r["log_length"])
+
+
+def print_report(results: List[Dict[str, Any]], baseline: Optional[List[Dict[str, Any]]] = None) -> None:
+    out = sys.__stdout__
+    previous = {_result_key(r): r for r in (baseline or [])}
+    header = f"{'case':<28} {'players':>7} {'log':>6} {'median us':>10} {'p90 us':>10} {'peak KiB':>9}"
+    print(header + ("  vs baseline" if previous else ""), file=out)
+    for r in results:
+        line = (f"{r['case']:<28} {r['players']:>7} {r['log_length']:>6} "
+                f"{r['wall_us']['median']:>10.1f} {r['wall_us']['p90']:>10.1f} {r['peak_alloc_kib']:>9.1f}")
+        old = previous.get(_result_key(r))
+        if old and old["wall_us"]["median"]:
+            line += f"  x{r['wall_us']['median'] / old['wall_us']['median']:.2f}"
+        print(line, file=out)
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for prompt building, parsing, GM recovery and day/end nodes.")
+    parser.add_argument("--players", type=int, nargs="+", default=DEFAULT_PLAYER_COUNTS, help="Player counts.")
+    parser.add_argument("--log-lengths", type=int, nargs="+", default=DEFAULT_LOG_LENGTHS, help="Public log lengths.")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per case (scaled down for big fixtures).")
+    parser.add_argument("--only", nargs="+", default=None, help="Run only these case names.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    parser.add_argument("--compare", dest="compare_path", default=None, help="Earlier --json output to compare medians against.")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare_path:
+        with open(args.compare_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", [])
+
+    results = run_suite(args.players, args.log_lengths, args.iterations, args.only, args.seed)
+    print_report(results, baseline)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "micro", "created_at": time.time(), "python": platform.python_version(),
+                       "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
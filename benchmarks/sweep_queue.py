@@ -0,0 +1,115 @@
+# benchmarks/sweep_queue.py
+"""
+Parameter sweeps (policies x player counts) on a shared work-queue directory.
+
+Enqueue once, start workers on as many hosts as mount QUEUE, then report.
+Workers lease deal batches (see src/work_queue.py), renew the lease while
+playing, and write results back. Jobs whose worker died are reclaimed
+when their lease expires, and rerunning `enqueue` is harmless.
+
+Usage:
+    python -m benchmarks.sweep_queue enqueue /shared/q --policy h=heuristic --policy s=scripted --players 5 7 9 --deals 500
+    python -m benchmarks.sweep_queue work /shared/q --processes 4 --response-cache /tmp/llm_cache.sqlite
+    python -m benchmarks.sweep_queue status /shared/q
+    python -m benchmarks.sweep_queue report /shared/q --json sweep.json
+"""
+import sys
+import time
+import json
+import argparse
+import functools
+import logging
+import multiprocessing
+from typing import Optional
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.graph_setup import EXECUTORS
+from src.tournament import parse_policy, sweep_jobs, run_sweep_job, aggregate_sweep, ALPHA
+from src.work_queue import WorkQueue, LEASE_SECONDS
+from benchmarks.tournament import print_report
+
+
+def _work(queue_dir: str, lease_seconds: float, response_cache: Optional[str], max_jobs: Optional[int], wait: bool,
+          trace_dir: Optional[str] = None, archive_path: Optional[str] = None) -> int:
+    logging.basicConfig(level=logging.WARNING)
+    queue = WorkQueue(queue_dir, lease_seconds=lease_seconds)
+    handler = functools.partial(run_sweep_job, response_cache_path=response_cache, trace_dir=trace_dir,
+                                archive_path=archive_path)
+    return queue.work(handler, max_jobs=max_jobs, wait=wait)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run tournament sweeps from a shared work-queue directory.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Add the jobs of a sweep to the queue.")
+    enqueue.add_argument("queue")
+    enqueue.add_argument("--policy", action="append", required=True, help="Policy spec (see benchmarks.tournament); repeat.")
+    enqueue.add_argument("--good", nargs="+", default=None, help="Policies that play the Good side (default: all).")
+    enqueue.add_argument("--evil", nargs="+", default=None, help="Policies that play the Evil side (default: all).")
+    enqueue.add_argument("--players", type=int, nargs="+", default=[5], help="Player counts to sweep.")
+    enqueue.add_argument("--deals", type=int, default=200, help="Deals per player count.")
+    enqueue.add_argument("--batch-deals", type=int, default=10, help="Deals per job.")
+    enqueue.add_argument("--seed", type=int, default=0, help="Base seed; deal i uses seed+i.")
+    enqueue.add_argument("--executor", choices=EXECUTORS, default="native", help="What runs the graph.")
+
+    work = commands.add_parser("work", help="Claim and play jobs until the queue is finished.")
+    work.add_argument("queue")
+    work.add_argument("--processes", type=int, default=1, help="Worker processes on this host.")
+    work.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS, help="Lease length; renewed every third of it.")
+    work.add_argument("--response-cache", default=None, metavar="PATH", help="Local SQLite LLM response cache shared by this host's processes.")
+    work.add_argument("--max-jobs", type=int, default=None, help="Stop each process after this many jobs.")
+    work.add_argument("--export-trace", default=None, metavar="DIR", help="Write each job's game traces to DIR as one columnar .npz part.")
+    work.add_argument("--archive", default=None, metavar="PATH", help="Add every game to the SQLite game archive at PATH (a local file: SQLite locking is unreliable on NFS).")
+    work.add_argument("--no-wait", action="store_true", help="Exit when nothing is claimable instead of waiting on other workers' leases.")
+
+    status = commands.add_parser("status", help="Count jobs by state.")
+    status.add_argument("queue")
+
+    report = commands.add_parser("report", help="Aggregate finished jobs per sweep cell.")
+    report.add_argument("queue")
+    report.add_argument("--alpha", type=float, default=ALPHA, help="Significance level for the comparisons.")
+    report.add_argument("--json", dest="json_path", default=None, help="Write the reports to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    out = sys.__stdout__
+
+    if args.command == "enqueue":
+        try:
+            policies = [parse_policy(spec) for spec in args.policy]
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.__stderr__)
+            sys.exit(2)
+        queue = WorkQueue(args.queue)
+        jobs = sweep_jobs(policies, args.players, args.deals, args.batch_deals, args.good, args.evil, args.seed, args.executor)
+        added = sum(queue.enqueue(job_id, payload) for job_id, payload in jobs)
+        print(f"{added} jobs added ({len(jobs) - added} already queued) to {args.queue}", file=out)
+    elif args.command == "work":
+        worker_args = (args.queue, args.lease_seconds, args.response_cache, args.max_jobs, not args.no_wait, args.export_trace, args.archive)
+        started = time.perf_counter()
+        if args.processes <= 1:
+            completed = _work(*worker_args)
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                completed = sum(pool.starmap(_work, [worker_args] * args.processes))
+        print(f"{completed} jobs completed in {time.perf_counter() - started:.1f}s; queue: {WorkQueue(args.queue).status()}", file=out)
+    elif args.command == "status":
+        print(json.dumps(WorkQueue(args.queue).status()), file=out)
+    else:
+        reports = aggregate_sweep((result for _, result in WorkQueue(args.queue).results()), args.alpha)
+        for cell in reports:
+            print(f"\n=== {cell['players']} players: Good {', '.join(cell['good_pool'])} vs Evil {', '.join(cell['evil_pool'])} ===", file=out)
+            print_report({**cell, "stop_reason": "fixed budget", "store": None})
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump({"benchmark": "sweep_queue", "created_at": time.time(), "results": reports}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/tournament.py
+"""
+Policy tournament: Elo per policy and role, confidence intervals, early stopping.
+
+Policies are 'NAME=BACKEND[:prompts=DIR,model=MODEL]' (see src.tournament.parse_policy).
+Every deal is played once per (Good policy, Evil policy) pairing; the run stops
+as soon as every paired comparison is decided at --alpha, or after --deals deals.
+With --store, games are sharded across --workers processes that share a SQLite
+results table and LLM response cache; rerunning the same command on the same
+store resumes, skipping finished games.
+
+Usage:
+    python -m benchmarks.tournament --policy heuristic --policy scripted --deals 100
+    python -m benchmarks.tournament --policy base=llm --policy imp_v2=llm:prompts=experiments/imp_v2 \\
+        --policy bots=heuristic --good bots --evil base imp_v2 --workers 4 --store imp_v2.sqlite
+"""
+import sys
+import time
+import json
+import argparse
+import logging
+from typing import Dict, Any
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.graph_setup import EXECUTORS
+from src.settings import validate_llm_config
+from src.tournament import Tournament, parse_policy, ALPHA
+
+
+def _fmt_interval(interval, digits: int) -> str:
+    low, high = interval
+    return "-" if low is None else f"[{low:.{digits}f}, {high:.{digits}f}]"
+
+
+def print_checkpoint(report: Dict[str, Any]) -> None:
+    out = sys.__stdout__
+    status = ", ".join(f"{c['side']} {c['policy_a']}-{c['policy_b']} z={c['z']:.2f}{'*' if c['decided'] else ''}"
+                       for c in report["comparisons"])
+    print(f"  after {report['deals']:>4} deals / {report['games']:>5} games ({report['elapsed_seconds']:.0f}s): {status}", file=out)
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    out = sys.__stdout__
+    print(f"\n{report['games']} games over {report['deals']} deals ({report['failed_games']} failed); "
+          f"stopped: {report['stop_reason']}", file=out)
+    for error in report["errors"]: print(f"    - {error}", file=out)
+    if report["store"]:
+        cache = report["response_cache"]
+        print(f"store {report['store']}: {report['resumed_games']} games reused from earlier runs; "
+              f"LLM response cache {cache['hits']} hits / {cache['misses']} misses", file=out)
+    if report.get("trace_dir"): print(f"game traces written to {report['trace_dir']}", file=out)
+    if report.get("archive"): print(f"games archived to {report['archive']}", file=out)
+    print(f"{'policy':>14} {'role':>13} {'games':>6} {'win rate':>9} {'95% CI':>16} {'elo':>7} {'95% CI':>18}", file=out)
+    for row in report["table"]:
+        print(f"{row['policy']:>14} {row['role']:>13} {row['games']:>6} {row['win_rate']:>9.3f} "
+              f"{_fmt_interval(row['win_rate_interval'], 3):>16} {row['elo']:>7.0f} {_fmt_interval(row['elo_interval'], 0):>18}", file=out)
+    for c in report["comparisons"]:
+        verdict = f"{c['better']} is better" if c["decided"] else "undecided"
+        print(f"{c['side']:>5}: {c['policy_a']} - {c['policy_b']} = {c['win_rate_difference']:+.3f} "
+              f"{_fmt_interval(c['interval'], 3)} over {c['pairs']} paired games, z={c['z']:.2f} "
+              f"(needs {c['z_critical']:.2f}): {verdict}", file=out)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Play policies against each other until their differences are statistically decided.")
+    parser.add_argument("--policy", action="append", required=True, help="Policy spec; repeat for each policy.")
+    parser.add_argument("--good", nargs="+", default=None, help="Policies that play the Good side (default: all).")
+    parser.add_argument("--evil", nargs="+", default=None, help="Policies that play the Evil side (default: all).")
+    parser.add_argument("--players", type=int, default=5, help="Players per game.")
+    parser.add_argument("--deals", type=int, default=200, help="Most deals (seeds) to play; each is played once per pairing.")
+    parser.add_argument("--min-deals", type=int, default=20, help="Deals before the first significance check.")
+    parser.add_argument("--check-every", type=int, default=10, help="Deals between significance checks.")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="Overall false-positive rate across all checks.")
+    parser.add_argument("--workers", type=int, default=1, help="Games played in parallel (worker processes).")
+    parser.add_argument("--executor", choices=EXECUTORS, default="native", help="What runs the graph.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; deal i uses seed+i.")
+    parser.add_argument("--store", default=None, metavar="PATH", help="SQLite file for results and cached LLM responses (created if missing; resumed if not).")
+    parser.add_argument("--export-trace", default=None, metavar="DIR", help="Write every game's events and decisions to DIR as columnar .npz parts (see src/game_trace.py).")
+    parser.add_argument("--archive", default=None, metavar="PATH", help="Add every game to the SQLite game archive at PATH (see src/game_archive.py).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write the final report to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    try:
+        policies = [parse_policy(spec) for spec in args.policy]
+        if any(p.backend == 'llm' for p in policies): validate_llm_config()
+        tournament = Tournament(policies, args.players, args.good, args.evil, max_deals=args.deals,
+                                min_deals=args.min_deals, check_every=args.check_every, alpha=args.alpha,
+                                workers=args.workers, executor=args.executor, base_seed=args.seed, store_path=args.store,
+                                trace_dir=args.export_trace, archive_path=args.archive)
+    except (ValueError, EnvironmentError) as e:
+        print(f"Error: {e}", file=sys.__stderr__)
+        sys.exit(2)
+
+    report = tournament.run(on_checkpoint=print_checkpoint)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "tournament", "created_at": time.time(), "results": report}, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/trace_export.py
+"""
+Cost of exporting game traces, and how fast a large export loads back.
+
+Plays --games heuristic games twice with the native executor (after a short
+warm-up), once without a trace and once recording one; the difference is the
+recording overhead per game. The recorded games are then written again and
+again through a TraceWriter with the default part size until the directory
+holds --load-games games (bulk write throughput and bytes per game). Finally
+`load_traces` reads the whole directory back and one typical aggregate is
+timed: win rate per label and mean decision latency per action.
+
+Usage:
+    python -m benchmarks.trace_export --games 200 --players 7 --load-games 100000
+    python -m benchmarks.trace_export --json bench_traces.json
+"""
+import os
+import sys
+import time
+import json
+import shutil
+import argparse
+import logging
+import tempfile
+from typing import Dict, Any
+
+from rich.console import Console
+
+# --- Null Output Sink (see engine_throughput.py) ---
+console = Console(quiet=True)
+
+from src.game_trace import TraceWriter, load_traces, trace_parts, TRACE_GAMES_PER_PART
+from src.tournament import Policy, GameSpec, play_game
+
+
+class _Collector:
+    """Keeps finished traces in memory (play_game only calls `add`)."""
+    def __init__(self):
+        self.traces = []
+
+    def add(self, trace) -> None:
+        self.traces.append(trace)
+
+
+def _play(games: int, num_players: int, base_seed: int, traces) -> float:
+    policies = [Policy("heuristic", "heuristic")]
+    started = time.perf_counter()
+    for i in range(games):
+        play_game(GameSpec(i, base_seed + i, "heuristic", "heuristic"), policies, num_players, "native", traces)
+    return time.perf_counter() - started
+
+
+def run(games: int, num_players: int, base_seed: int, games_per_part: int, load_games: int, directory: str) -> Dict[str, Any]:
+    _play(min(games, 10), num_players, base_seed, None) # Warm-up: graph build, imports, caches
+    plain_seconds = _play(games, num_players, base_seed, None)
+    collector = _Collector()
+    traced_seconds = _play(games, num_players, base_seed, collector)
+
+    writer = TraceWriter(directory, games_per_part=games_per_part)
+    started = time.perf_counter()
+    while writer.games_written + writer.games_buffered < load_games: # The recorded games again, to reach the target size
+        for trace in collector.traces[:load_games - writer.games_written - writer.games_buffered]:
+            writer.add(trace)
+    writer.flush()
+    write_seconds = time.perf_counter() - started
+    parts = trace_parts(directory)
+
+    started = time.perf_counter()
+    loaded = load_traces(directory)
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    g, d = loaded["games"], loaded["decisions"]
+    good_wins = g["winner"] == "Good"
+    good_rate = {label: float(good_wins[g["label"] == label].mean()) for label in set(g["label"].tolist())}
+    latency = {action: float(d["seconds"][d["action"] == action].mean()) for action in set(d["action"].tolist())}
+    analysis_seconds = time.perf_counter() - started
+
+    return {
+        "players": num_players, "games": games,
+        "record_overhead_ms_per_game": round(1000 * (traced_seconds - plain_seconds) / games, 3),
+        "game_ms_without_trace": round(1000 * plain_seconds / games, 3),
+        "rows_per_game": {table: round(len(columns["game_id"]) / len(g["game_id"]), 1) for table, columns in loaded.items()},
+        "write_seconds": round(write_seconds, 3), "parts": len(parts),
+        "loaded_games": len(g["game_id"]), "loaded_events": len(loaded["events"]["game_id"]),
+        "loaded_bytes": sum(os.path.getsize(p) for p in parts),
+        "load_seconds": round(load_seconds, 3),
+        "analysis_seconds": round(analysis_seconds, 3),
+        "good_win_rate": {str(label): round(rate, 3) for label, rate in sorted(good_rate.items(), key=str)},
+        "mean_decision_ms": {str(action): round(1000 * s, 3) for action, s in sorted(latency.items(), key=str)},
+    }
+
+
+def print_report(r: Dict[str, Any]) -> None:
+    out = sys.__stdout__
+    print(f"{r['games']} games of {r['players']} players: {r['game_ms_without_trace']:.2f} ms/game untraced, "
+          f"recording adds {r['record_overhead_ms_per_game']:.3f} ms/game", file=out)
+    print(f"rows per game: {', '.join(f'{t} {n}' for t, n in r['rows_per_game'].items())}", file=out)
+    print(f"wrote {r['loaded_games']} games as {r['parts']} parts in {r['write_seconds']:.2f}s "
+          f"({r['loaded_bytes'] / r['loaded_games']:.0f} bytes/game)", file=out)
+    print(f"loaded {r['loaded_games']} games / {r['loaded_events']} events ({r['loaded_bytes'] / 1e6:.1f} MB) "
+          f"in {r['load_seconds']:.2f}s; win rate and latency aggregates in {r['analysis_seconds']:.2f}s", file=out)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Measure game-trace recording, writing and loading.")
+    parser.add_argument("--games", type=int, default=200, help="Games to play and record.")
+    parser.add_argument("--players", type=int, default=7, help="Players per game.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed+i.")
+    parser.add_argument("--games-per-part", type=int, default=TRACE_GAMES_PER_PART, help="Games per part file.")
+    parser.add_argument("--load-games", type=int, default=100000, help="Games written and loaded back (the recorded games, repeated).")
+    parser.add_argument("--dir", default=None, help="Output directory (default: a temporary directory, removed afterwards).")
+    parser.add_argument("--json", dest="json_path", default=None, help="Write results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+    directory = args.dir or tempfile.mkdtemp(prefix="traces-")
+    try:
+        result = run(args.games, args.players, args.seed, args.games_per_part, args.load_games, directory)
+    finally:
+        if args.dir is None: shutil.rmtree(directory, ignore_errors=True)
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({"benchmark": "trace_export", "created_at": time.time(), "results": result}, f, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
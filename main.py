@@ -1,14 +1,16 @@
 # main.py
+import time
+_process_started = time.perf_counter() # For --startup-profile
 import sys
 import argparse # Import argparse
 import logging # Import logging
-from src.game_runner import run_game_sync
 from rich.console import Console
 
 # --- Global Console Instance ---
 console = Console()
 
 # --- Argument Parsing ---
+# Parsed before the game modules are imported, so --help and bad arguments return immediately.
 parser = argparse.ArgumentParser(description="Run the Social Deduction Game.")
 parser.add_argument(
     "-d", "--debug",
@@ -20,6 +22,67 @@ parser.add_argument(
     default="Human", # Default human player ID
     help="Specify the ID for the human player."
 )
+parser.add_argument(
+    "--human-timeout",
+    type=float, default=None, metavar="SECONDS",
+    help="Optional time limit for human input. When it expires, --human-fallback decides."
+)
+parser.add_argument(
+    "--human-fallback",
+    choices=["abstain", "ai"], default="abstain",
+    help="What happens when the human input timeout expires: abstain, or let an AI act for the human."
+)
+parser.add_argument(
+    "--trace",
+    default=None, metavar="PATH",
+    help="Record per-node/decision/LLM spans, write them as Chrome trace JSON to PATH and print a per-phase summary."
+)
+parser.add_argument(
+    "--seed",
+    type=int, default=None,
+    help="Seed the game's randomness (roles, narration, fallback policies) for a reproducible run."
+)
+parser.add_argument(
+    "--record",
+    default=None, metavar="PATH",
+    help="Save every decision (input hash + output) to PATH so the game can be replayed. Implies a seed."
+)
+parser.add_argument(
+    "--replay",
+    default=None, metavar="PATH",
+    help="Re-run a recorded game from PATH without LLM calls or human input, stopping at the first divergence."
+)
+parser.add_argument(
+    "--ai-backend",
+    choices=["llm", "heuristic", "scripted"], default="llm",
+    help="Who decides for AI players: the LLM, the rule-based heuristic policy (no LLM calls), or a fixed script."
+)
+parser.add_argument(
+    "--executor",
+    choices=["langgraph", "native"], default="langgraph",
+    help="What runs the game graph: the compiled LangGraph graph, or the in-process native executor (same nodes and routing, less overhead)."
+)
+parser.add_argument(
+    "--export-trace",
+    default=None, metavar="DIR",
+    help="Write the game's events, decisions (latency, tokens) and outcome to DIR as a columnar .npz trace part."
+)
+parser.add_argument(
+    "--archive",
+    default=None, metavar="PATH",
+    help="Add the game (decisions with their prompts and responses, events, transcript, metrics) to the SQLite game archive at PATH."
+)
+parser.add_argument(
+    "--inject-faults",
+    default=None, metavar="SPEC",
+    help="Inject LLM faults to exercise GM recovery, e.g. 'timeout=0.05,malformed_json=0.1' or 'all=0.2' "
+         "(kinds: timeout, http_error, empty, malformed_json, ambiguous_key)."
+)
+parser.add_argument(
+    "--startup-profile",
+    action="store_true",
+    help="Report how long startup took (imports, config, graph compile) before the game begins."
+)
 # Add more arguments here if needed (e.g., player names, number of players)
 
 args = parser.parse_args() # Parse arguments from sys.argv
@@ -36,6 +99,16 @@ logging.basicConfig(
 # Optional: Silence noisy libraries if needed
 # logging.getLogger("httpx").setLevel(logging.WARNING)
 
+from src.startup_profile import StartupProfile, print_startup_report
+startup_profile = StartupProfile(_process_started) if args.startup_profile else None
+if startup_profile: startup_profile.mark("interpreter + argument parsing")
+
+from src.game_runner import run_game_sync
+from src.decision_handler import configure_human_input, set_ai_backend
+from src.settings import validate_llm_config
+from src.replay import load_record
+if startup_profile: startup_profile.mark("import game modules")
+
 
 if __name__ == "__main__":
     # Basic player setup (can be enhanced with command-line args later)
@@ -52,10 +125,44 @@ if __name__ == "__main__":
          else:
              players.append(args.human)
 
+    replay_record = None
+    if args.replay:
+        try:
+            replay_record = load_record(args.replay)
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]Could not load decision record {args.replay}: {e}[/bold red]")
+            sys.exit(1)
+        players, args.human = replay_record["player_ids"], replay_record.get("human_player_id")
+    elif args.ai_backend == "llm":
+        # AI players need the LLM, so check its configuration before the game starts.
+        try:
+            validate_llm_config()
+        except EnvironmentError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            sys.exit(1)
+    if startup_profile: startup_profile.mark("load and validate configuration")
+
+    if startup_profile:
+        from src.graph_setup import get_executor
+        startup_profile.measure("compile graph", lambda: get_executor(args.executor))
+        print_startup_report(startup_profile, console)
 
     console.print(f"Starting game with players: {players}")
     console.print(f"Human player: [bold cyan]{args.human}[/bold cyan]")
     console.print(f"Logging Level: {logging.getLevelName(log_level)}") # Show the level
 
+    configure_human_input(timeout_seconds=args.human_timeout, fallback=args.human_fallback)
+    set_ai_backend(args.ai_backend)
+    if args.inject_faults:
+        from src.fault_injection import FaultInjector, parse_fault_rates
+        from src.llm_interface import set_fault_injector
+        try:
+            set_fault_injector(FaultInjector(parse_fault_rates(args.inject_faults), seed=args.seed))
+        except ValueError as e:
+            console.print(f"[bold red]{e}[/bold red]")
+            sys.exit(1)
+
     # Pass the necessary info to the runner
-    run_game_sync(player_list=players, human_player_id=args.human)
\ No newline at end of file
+    run_game_sync(player_list=players, human_player_id=args.human, trace_path=args.trace,
+                  seed=args.seed, record_path=args.record, replay_record=replay_record,
+                  executor=args.executor, trace_export_dir=args.export_trace, archive_path=args.archive)
@@ -5,6 +5,8 @@ import asyncio
 import re
 # --- ADDED json and ValidationError ---
 import json
+import hashlib
+import functools
 from pydantic import ValidationError
 # -----------------------------------
 # --- Added Union for return type ---
@@ -16,7 +18,14 @@ import logging
 
 # Import ActionContext Literals etc.
 from src.state import ActionContext, GraphState, Literal
-from src.llm_interface import get_llm_response_string
+from src.llm_interface import get_llm_response_string, llm_routes_available
+from src.tracing import span
+from src.player_memory import memory_context, get_player_memory, estimate_tokens
+from src.day_digest import latest_day_digest
+from src.suspicion_matrix import suspicion_context
+from src.log_index import relevant_log_positions, investigation_targets, RELEVANT_TOKEN_BUDGET
+from src.heuristic_policy import heuristic_decision
+from src.game_trace import note_llm_exchange
 
 
 # # --- !!! TEMPORARY DEBUG FLAG !!! ---
@@ -28,15 +37,18 @@ from src.llm_interface import get_llm_response_string
 
 
 # --- Constants ---
-RECENT_LOG_COUNT = 3
+RECENT_LOG_COUNT = 3 # Older entries reach the prompt through the player's memory summary
 
 # --- Prompts and Context ---
 BASE_PROMPT_DIR = os.path.join(os.path.dirname(__file__), 'prompts')
-def load_base_prompt(role: str) -> str:
+def load_base_prompt(role: str, prompt_dir: Optional[str] = None) -> str:
+    """Role prompt from `prompt_dir` if it has one (prompt variants), else from src/prompts."""
     # Added Investigator role mapping
     role_map = {'Imp': 'impostor', 'Villager': 'villager', 'Investigator': 'investigator'}
     filename = role_map.get(role, 'villager') + '.txt' # Default to villager if role unknown
     filepath = os.path.join(BASE_PROMPT_DIR, filename)
+    if prompt_dir and os.path.isfile(os.path.join(prompt_dir, filename)):
+        filepath = os.path.join(prompt_dir, filename)
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read().strip()
@@ -49,6 +61,35 @@ def load_base_prompt(role: str) -> str:
         return f"You are Player {{player_id}}. Your role is {role}. Your goal depends on your role's objectives."
 
 
+@functools.lru_cache(maxsize=64)
+def prompt_version(template: str) -> str:
+    """Short content hash of a role prompt template; names a prompt variant across runs and archives."""
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+
+
+def _clean_log_line(L: str) -> str:
+    """One public log line as prompt text: speech JSON flattened, markup and channel prefixes removed."""
+    # --- Simplify cleaning, assume log contains player: {json} or SYS/GM messages ---
+    # Attempt to extract JSON if it looks like player speech
+    match = re.match(r"(\w+):\s*(\{.*?\})", L) # Basic match for PlayerID: {json}
+    if match:
+        player_id_log = match.group(1)
+        try:
+            speech_data = json.loads(match.group(2))
+            content = speech_data.get('speech_content', '[Speech Content Missing]')
+            intent = speech_data.get('intent')
+            target = speech_data.get('target_player')
+            target_str = f" (-> {target})" if target else ""
+            intent_str = f" [{intent}]" if intent else ""
+            return f"{player_id_log}{intent_str}{target_str}: \"{content}\""
+        except json.JSONDecodeError:
+            # Fallback if JSON is invalid
+            return re.sub(r'\[/?(?:bold|italic|color|dim|strike|underline|blink|reverse|conceal|code|on\s+\w+|[a-z]+(?: on \w+)?|/?rule)\]', '', L)
+    # For non-JSON logs (SYS, GM, older formats), keep basic cleaning
+    cleaned_line = re.sub(r'\[/?(?:bold|italic|color|dim|strike|underline|blink|reverse|conceal|code|on\s+\w+|[a-z]+(?: on \w+)?|/?rule)\]', '', L)
+    return re.sub(r"^(SYS|VOTE|SPEAK|VOTE_REVEAL|DIM|NARRATOR|GM): ", "", cleaned_line).strip()
+
+
 def _build_dynamic_context(
     game_state: GraphState,
     player_id_for_context: str,
@@ -83,8 +124,14 @@ def _build_dynamic_context(
         context_str += f"Last Night's Victim: {victim_display}\n"
         context_str += f"Last Executed Player (End of Round {prev_round_num if prev_round_num > 0 else 'N/A'}): {executed_display}\n"
 
+        # --- Shared Day Digest (computed once per day by the day nodes) ---
+        digest_round, day_digest = latest_day_digest(game_state)
+        digest_has_votes = bool(day_digest) and digest_round == prev_round_num and "Votes:" in day_digest
+
         # --- Format Previous Votes (public) ---
-        if previous_votes:
+        if digest_has_votes:
+            pass # The digest below already carries the compact breakdown
+        elif previous_votes:
             context_str += f"\nPrevious Vote Breakdown (Round {prev_round_num}):\n"
             # --- MODIFIED: Include intent/target if available in log format ---
             # Assuming log format might become richer, adapt if needed.
@@ -96,33 +143,35 @@ def _build_dynamic_context(
         elif round_num > 1:
              context_str += f"\nPrevious Vote Breakdown (Round {prev_round_num}):\n  (No votes recorded for previous round)\n"
 
+        if day_digest:
+            context_str += f"\nPublic Digest of Day {digest_round}:\n{day_digest}\n"
+
+        # --- Whole-Game Suspicion Table (shared, public) ---
+        context_str += suspicion_context(game_state)
+
+        # --- Summarized Memory of Older Events (bounded size) ---
+        context_str += memory_context(game_state, player_id_for_context, player_role_for_context, RECENT_LOG_COUNT,
+                                      digested_round=digest_round)
+
+        # --- Earlier Events Relevant to This Player (inverted index, top-k) ---
+        investigated = []
+        if player_role_for_context == 'Investigator':
+            investigated = investigation_targets(get_player_memory(game_state, player_id_for_context).private_notes.values())
+        relevant_positions = relevant_log_positions(game_state, player_id_for_context, investigated,
+                                                    exclude_recent=RECENT_LOG_COUNT)
+        relevant_lines, relevant_tokens = [], 0
+        for position in relevant_positions:
+            line = f"- {_clean_log_line(public_log[position])}"
+            relevant_tokens += estimate_tokens(line)
+            if relevant_tokens > RELEVANT_TOKEN_BUDGET: break
+            relevant_lines.append(line)
+        if relevant_lines:
+            context_str += "\nEarlier Events Involving You:\n" + "\n".join(relevant_lines) + "\n"
+
         # --- Format Recent Log Snippet (public) ---
         log_tail = public_log[-RECENT_LOG_COUNT:]
         if log_tail:
-             # --- Simplify cleaning, assume log contains player: {json} or SYS/GM messages ---
-             cleaned_log_tail = []
-             for L in log_tail:
-                 # Attempt to extract JSON if it looks like player speech
-                 match = re.match(r"(\w+):\s*(\{.*?\})", L) # Basic match for PlayerID: {json}
-                 if match:
-                     player_id_log = match.group(1)
-                     try:
-                         speech_data = json.loads(match.group(2))
-                         content = speech_data.get('speech_content', '[Speech Content Missing]')
-                         intent = speech_data.get('intent')
-                         target = speech_data.get('target_player')
-                         target_str = f" (-> {target})" if target else ""
-                         intent_str = f" [{intent}]" if intent else ""
-                         cleaned_log_tail.append(f"{player_id_log}{intent_str}{target_str}: \"{content}\"")
-                     except json.JSONDecodeError:
-                         # Fallback if JSON is invalid
-                         cleaned_log_tail.append(re.sub(r'\[/?(?:bold|italic|color|dim|strike|underline|blink|reverse|conceal|code|on\s+\w+|[a-z]+(?: on \w+)?|/?rule)\]', '', L))
-                 else:
-                     # For non-JSON logs (SYS, GM, older formats), keep basic cleaning
-                     cleaned_line = re.sub(r'\[/?(?:bold|italic|color|dim|strike|underline|blink|reverse|conceal|code|on\s+\w+|[a-z]+(?: on \w+)?|/?rule)\]', '', L)
-                     cleaned_line = re.sub(r"^(SYS|VOTE|SPEAK|VOTE_REVEAL|DIM|NARRATOR|GM): ", "", cleaned_line).strip()
-                     cleaned_log_tail.append(cleaned_line)
-             # ------------------------------------------------------------------------
+             cleaned_log_tail = [_clean_log_line(L) for L in log_tail]
              context_str += f"\nRecent Events Log (Last {RECENT_LOG_COUNT}):\n" + "\n".join([f"- {L}" for L in cleaned_log_tail]) + "\n"
 
         # --- ADD PRIVATE CONTEXT (if applicable) ---
@@ -221,14 +270,66 @@ def _placeholder_ai_investigate(options: Optional[Dict[str, str]]) -> Optional[s
 # -----------------------------------------------------------------------------------
 
 
+# --- Scripted Stand-in (instant, deterministic; used for engine benchmarks) ---
+SCRIPTED_SPEECH = {
+    "speech_content": "I have nothing new to add this turn.",
+    "intent": "general_statement",
+    "target_player": None,
+    "tone": "neutral"
+}
+
+def scripted_ai_decision(context: ActionContext) -> Optional[Any]:
+    """Always picks the first option (or a fixed speech). No LLM, no randomness."""
+    if context['action_type'] == 'speak':
+        return dict(SCRIPTED_SPEECH)
+    options = context.get('options')
+    return next(iter(options)) if options else None
+
+
+# --- Option Key Parsing (shared by vote/imp_kill/investigate) ---
+def _parse_option_key(response_str: str, options: Dict[str, str]) -> Optional[str]:
+    """Extracts the chosen option key from a cleaned LLM response; None if absent or ambiguous."""
+    found_key = None
+    match = None
+    potential_keys = list(options.keys())
+    # 1. Direct Match
+    if response_str in potential_keys:
+        found_key = response_str
+        logging.info(f"  Successfully parsed key via direct match: {found_key}")
+    # 2. Regex for standalone key
+    else:
+         keys_pattern = r'(?<!\d)(' + '|'.join(re.escape(k) for k in potential_keys) + r')(?!\d)'
+         match = re.search(keys_pattern, response_str)
+         if match:
+             key_candidate = match.group(1)
+             if re.fullmatch(r"[\s\.,!\"'\(]*" + re.escape(key_candidate) + r"[\s\.,!\"'\)]*", response_str, re.IGNORECASE):
+                  found_key = key_candidate
+                  logging.info(f"  Successfully parsed key via regex (standalone full match): {found_key}")
+             else:
+                  logging.warning(f"  Regex found key '{key_candidate}' but it's part of larger/ambiguous text ('{response_str}'). Considered parsing failure.")
+         else:
+              logging.warning(f"  Could not find any potential key ({potential_keys}) in response '{response_str}' using regex.")
+
+    if not found_key:
+        if match:
+             logging.warning(f"  Could not parse key: Ambiguous key '{match.group(1)}' found within larger text '{response_str}'. Options: {potential_keys}.")
+        else:
+             logging.warning(f"  Could not parse key: No valid key found in response '{response_str}'. Options: {potential_keys}.")
+        return None
+    return found_key
+
+
 # --- Central AI Decision Logic (MODIFIED for Speech JSON Output) ---
 # --- Return type changed to Union[Optional[Any], Dict] ---
-async def get_ai_decision_logic(context: ActionContext) -> Union[Optional[Any], Dict]:
+async def get_ai_decision_logic(
+    context: ActionContext, prompt_dir: Optional[str] = None, model: Optional[str] = None
+) -> Union[Optional[Any], Dict]:
     """
     Orchestrates AI decision: Gets LLM response, attempts parsing based on action_type.
     For 'speak', expects JSON conforming to SpeechOutput schema.
     If parsing/validation fails, returns a failure dictionary.
     If LLM call itself fails, returns failure dictionary.
+    `prompt_dir` and `model` override the role prompts and the primary model (tournament policies).
     """
     action_type = context['action_type']
     player_id = context['player_id']
@@ -236,22 +337,32 @@ async def get_ai_decision_logic(context: ActionContext) -> Union[Optional[Any],
     options = context.get('options')
     full_game_state = context['full_game_state']
 
-    system_prompt = load_base_prompt(role).format(player_id=player_id)
-    dynamic_context_str = _build_dynamic_context(
-        game_state=full_game_state,
-        player_id_for_context=player_id,
-        player_role_for_context=role
-    )
-    task_prompt_str = _format_task_prompt(context)
-    user_prompt = f"{dynamic_context_str}\n{task_prompt_str}"
+    # --- Degraded mode: all model routes tripped, answer locally without waiting ---
+    if not llm_routes_available(model):
+        logging.warning(f"All LLM routes are circuit-open; using local policy for {player_id} ({action_type}).")
+        local_output = heuristic_decision(context)
+        if local_output is not None: return local_output
+
+    with span("build_prompt", "prompt", player_id=player_id, action_type=action_type):
+        template = load_base_prompt(role, prompt_dir)
+        system_prompt = template.format(player_id=player_id)
+        dynamic_context_str = _build_dynamic_context(
+            game_state=full_game_state,
+            player_id_for_context=player_id,
+            player_role_for_context=role
+        )
+        task_prompt_str = _format_task_prompt(context)
+        user_prompt = f"{dynamic_context_str}\n{task_prompt_str}"
 
     should_stream = (action_type == 'speak') # Keep streaming for 'speak'
     llm_response_str: Optional[str] = await get_llm_response_string(
          system_prompt=system_prompt,
          user_prompt=user_prompt,
          player_id=player_id,
-         enable_streaming=should_stream
+         enable_streaming=should_stream,
+         primary_model=model
     )
+    note_llm_exchange(prompt_version(template), system_prompt, user_prompt, llm_response_str)
 
     # --- Handle LLM call failure FIRST ---
     if llm_response_str is None:
@@ -315,40 +426,7 @@ async def get_ai_decision_logic(context: ActionContext) -> Union[Optional[Any],
     # --- Handle Key-Based Actions (vote, imp_kill, investigate) ---
     elif action_type in ['vote', 'imp_kill', 'investigate'] and options:
         logging.debug(f"  Attempting to parse key from cleaned response: '{response_str}' for action {action_type}")
-        # Existing key parsing logic remains here...
-        found_key = None
-        potential_keys = list(options.keys())
-        # 1. Direct Match
-        if response_str in potential_keys:
-            found_key = response_str
-            logging.info(f"  Successfully parsed key via direct match: {found_key}")
-        # 2. Regex for standalone key
-        else:
-             keys_pattern = r'(?<!\d)(' + '|'.join(re.escape(k) for k in potential_keys) + r')(?!\d)'
-             match = re.search(keys_pattern, response_str)
-             if match:
-                 key_candidate = match.group(1)
-                 if re.fullmatch(r"[\s\.,!\"'\(]*" + re.escape(key_candidate) + r"[\s\.,!\"'\)]*", response_str, re.IGNORECASE):
-                      found_key = key_candidate
-                      logging.info(f"  Successfully parsed key via regex (standalone full match): {found_key}")
-                 else:
-                      logging.warning(f"  Regex found key '{key_candidate}' but it's part of larger/ambiguous text ('{response_str}'). Considered parsing failure.")
-                      found_key = None
-             else:
-                  logging.warning(f"  Could not find any potential key ({potential_keys}) in response '{response_str}' using regex.")
-                  found_key = None
-
-        if found_key:
-            final_output = found_key # Store the key string
-        else:
-            # Logging for key parsing failure...
-            if response_str in potential_keys:
-                 logging.error(f"  Logic Error: Direct match key '{response_str}' was somehow missed.")
-            elif match and not re.fullmatch(r"[\s\.,!\"'\(]*" + re.escape(match.group(1)) + r"[\s\.,!\"'\)]*", response_str, re.IGNORECASE):
-                 logging.warning(f"  Could not parse key: Ambiguous key '{match.group(1)}' found within larger text '{response_str}'. Options: {potential_keys}.")
-            else:
-                 logging.warning(f"  Could not parse key: No valid key found in response '{response_str}'. Options: {potential_keys}.")
-            final_output = None # Parsing failed
+        final_output = _parse_option_key(response_str, options) # Key string, or None on failure
 
     # --- Handle Other/Unknown Action Types ---
     else:
@@ -0,0 +1,257 @@
+# src/batch_sim.py
+"""
+Lockstep batch simulation of many games at once, for balance analysis.
+
+The graph plays one game one node at a time; even with the heuristic backend
+that is milliseconds per game, too slow for win rates over millions of games.
+Here a batch of games with the same player count is a set of NumPy arrays
+(roles, alive masks, the accusation matrix, vote and defense counts, the
+Investigator's knowledge), and every phase - night kill, investigation, the
+discussion's speaking turns, voting, tallying and the win checks - is one
+vectorized step over all games still running. Games that end drop out of the
+active mask, and their rows are dropped between rounds once enough have ended,
+so the long tail of late rounds only pays for the games still going.
+
+The players follow the same rules as `heuristic_policy` (pressure from
+accusations and votes received, the Investigator acting on its results, the
+Imp following the crowd and making unsuspicious kills), and tallying and the
+win checks mirror `tally_votes` and the graph's game-over conditions. Only
+tie-breaking differs: here it draws from a NumPy generator, so individual
+games do not match the graph's move for move, but the outcome distributions
+do (see benchmarks/batch_simulation.py, which checks this on a shared sample
+of seeds). Requires NumPy; nothing else in the game imports this module.
+"""
+import random
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .heuristic_policy import (ACCUSED_WEIGHT, VOTED_WEIGHT, DEFENSE_WEIGHT, ACCUSED_ME_WEIGHT,
+                               IMP_PRESSURE_TO_DEFEND, ACCUSE_THRESHOLD)
+
+ROLE_VILLAGER, ROLE_INVESTIGATOR, ROLE_IMP = 0, 1, 2
+ROLE_NAMES = ('Villager', 'Investigator', 'Imp')
+KNOWN_NONE, KNOWN_GOOD, KNOWN_EVIL = 0, 1, 2
+WINNER_NONE, WINNER_GOOD, WINNER_EVIL = 0, 1, 2
+WINNER_NAMES = (None, 'Good', 'Evil')
+
+SPEECHES_PER_PLAYER = 2 # discussion_phase's MAX_SPEAKING_ROUNDS
+KNOWN_SCORE = 1000.0 # heuristic_policy scores players with a known alignment +/- this
+IMP_ACCUSED_KILL_PENALTY = 10.0 # heuristic_policy's kill scorer, per accusation of the Imp
+TIE_NOISE = 0.25 # Scores are multiples of 0.5, so noise below that only breaks ties
+DEFAULT_CHUNK_SIZE = 4096 # Games per lockstep batch; bounds the (games, n, n) arrays
+
+
+# --- Setup ---
+
+def role_counts(num_players: int) -> Tuple[int, int]:
+    """(Imps, Investigators) for a player count, as `initialize_game` assigns them."""
+    if num_players < 3:
+        raise ValueError(f"Need at least 3 players, got {num_players}.")
+    imp_count = 1
+    investigator_count = 1 if num_players >= 4 else 0
+    if num_players - imp_count - investigator_count < 1: investigator_count = 0
+    return imp_count, investigator_count
+
+
+def _roles_from_order(order: np.ndarray, num_players: int) -> np.ndarray:
+    """Roles by player index, given each game's shuffled player order (as in `initialize_game`)."""
+    imp_count, investigator_count = role_counts(num_players)
+    roles_by_rank = np.full(num_players, ROLE_VILLAGER, dtype=np.int8)
+    roles_by_rank[:imp_count] = ROLE_IMP
+    roles_by_rank[imp_count:imp_count + investigator_count] = ROLE_INVESTIGATOR
+    roles = np.empty(order.shape, dtype=np.int8)
+    np.put_along_axis(roles, order, np.broadcast_to(roles_by_rank, order.shape), axis=1)
+    return roles
+
+
+def random_roles(rng: np.random.Generator, num_games: int, num_players: int) -> np.ndarray:
+    """Uniformly shuffled role assignments, shape (games, players)."""
+    return _roles_from_order(np.argsort(rng.random((num_games, num_players)), axis=1), num_players)
+
+
+def roles_for_seeds(seeds: Sequence[int], num_players: int) -> np.ndarray:
+    """The exact role assignments the graph's `initialize_game` makes for games seeded with `seeds`."""
+    order = np.empty((len(seeds), num_players), dtype=np.int64)
+    for row, seed in enumerate(seeds):
+        shuffled = list(range(num_players))
+        random.Random(seed).shuffle(shuffled)
+        order[row] = shuffled
+    return _roles_from_order(order, num_players)
+
+
+# --- Vectorized Rules ---
+
+def masked_argmax(scores: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Argmax over the last axis among `mask`; -1 where nothing is allowed."""
+    choice = np.where(mask, scores, -np.inf).argmax(axis=-1)
+    return np.where(mask.any(axis=-1), choice, -1)
+
+
+def tally(votes: np.ndarray, num_players: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `tally_votes` for a batch: `votes` is (games, voters) of target indices, -1 for abstain.
+    Returns (vote counts per target, execution target or -1, tie flag). A single highest
+    count executes; a tie for the highest count executes nobody.
+    """
+    counts = (votes[:, :, None] == np.arange(num_players)).sum(axis=1)
+    top = counts.max(axis=1)
+    leaders = (counts == top[:, None]) & (top[:, None] > 0)
+    single = leaders.sum(axis=1) == 1
+    target = np.where(single, leaders.argmax(axis=1), -1)
+    return counts, target, leaders.sum(axis=1) > 1
+
+
+def check_winner(alive: np.ndarray, roles: np.ndarray) -> np.ndarray:
+    """The graph's game-over checks: Good once no Imp is alive, Evil once good players <= Imps."""
+    imps = (alive & (roles == ROLE_IMP)).sum(axis=1)
+    good = alive.sum(axis=1) - imps
+    return np.where(imps == 0, WINNER_GOOD, np.where(good <= imps, WINNER_EVIL, WINNER_NONE)).astype(np.int8)
+
+
+# --- Lockstep Simulation ---
+
+def simulate_batch(roles: np.ndarray, rng: np.random.Generator, max_rounds: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    Plays every game in `roles` (games, players) to the end with heuristic players.
+    Returns arrays 'winner' (WINNER_*), 'rounds', 'executions' and 'imp_executed'.
+    """
+    num_games, n = roles.shape
+    max_rounds = max_rounds or n + 1 # Every night kills someone, so games end well before this
+    ids = np.arange(num_games) # Row -> game; rows of finished games are dropped between rounds
+    games = np.arange(num_games)
+    players = np.arange(n)
+    is_imp = roles == ROLE_IMP
+    imp = is_imp.argmax(axis=1) # One Imp per game (role_counts)
+    has_investigator = (roles == ROLE_INVESTIGATOR).any(axis=1)
+    investigator = (roles == ROLE_INVESTIGATOR).argmax(axis=1)
+
+    alive = np.ones((num_games, n), dtype=bool)
+    accusations = np.zeros((num_games, n, n), dtype=np.int32) # [game, accuser, target]
+    times_accused = np.zeros((num_games, n), dtype=np.int32)
+    votes_received = np.zeros((num_games, n), dtype=np.int32)
+    defenses = np.zeros((num_games, n), dtype=np.int32)
+    known = np.zeros((num_games, n), dtype=np.int8) # The Investigator's results, KNOWN_*
+    active = np.ones(num_games, dtype=bool)
+    # Results, indexed by game rather than by row
+    winner = np.zeros(num_games, dtype=np.int8)
+    rounds = np.zeros(num_games, dtype=np.int32)
+    executions = np.zeros(num_games, dtype=np.int32)
+    imp_executed = np.zeros(num_games, dtype=bool)
+
+    def pressure() -> np.ndarray:
+        return ACCUSED_WEIGHT * times_accused + VOTED_WEIGHT * votes_received - DEFENSE_WEIGHT * defenses
+
+    def finish_games() -> None:
+        result = check_winner(alive, roles)
+        ended = active & (result != WINNER_NONE)
+        winner[ids[ended]] = result[ended]
+        active[ended] = False
+
+    def with_known(scores: np.ndarray, investigator_rows: np.ndarray) -> np.ndarray:
+        """Known alignments override the scores in the Investigator's rows."""
+        rows = investigator_rows[:, None]
+        scores = np.where(rows & (known == KNOWN_EVIL), KNOWN_SCORE, scores)
+        return np.where(rows & (known == KNOWN_GOOD), -KNOWN_SCORE, scores)
+
+    for round_number in range(1, max_rounds + 1):
+        if not active.any(): break
+        if active.sum() < 0.75 * len(active): # Drop finished games so later rounds only pay for live ones
+            keep = np.flatnonzero(active)
+            (ids, roles, is_imp, imp, has_investigator, investigator, alive, accusations, times_accused,
+             votes_received, defenses, known, active) = (
+                ids[keep], roles[keep], is_imp[keep], imp[keep], has_investigator[keep], investigator[keep],
+                alive[keep], accusations[keep], times_accused[keep], votes_received[keep], defenses[keep],
+                known[keep], active[keep])
+            games = np.arange(len(keep))
+            num_games = len(keep)
+        rounds[ids[active]] = round_number
+
+        # --- Night: Imp kill, then investigation (both before the victim dies) ---
+        p = pressure()
+        kill_scores = -p - IMP_ACCUSED_KILL_PENALTY * accusations[games, :, imp]
+        kill_allowed = alive & (players != imp[:, None]) & active[:, None]
+        victim = masked_argmax(kill_scores + TIE_NOISE * rng.random((num_games, n)), kill_allowed)
+
+        investigating = active & has_investigator & alive[games, investigator]
+        check_scores = p + ACCUSED_ME_WEIGHT * accusations[games, :, investigator] + 1e6 * (known == KNOWN_NONE)
+        check_allowed = alive & (players != investigator[:, None]) & investigating[:, None]
+        checked = masked_argmax(check_scores + TIE_NOISE * rng.random((num_games, n)), check_allowed)
+        found = checked >= 0
+        known[games[found], checked[found]] = np.where(is_imp[games[found], checked[found]], KNOWN_EVIL, KNOWN_GOOD)
+
+        killed = victim >= 0
+        alive[games[killed], victim[killed]] = False
+        finish_games()
+        if not active.any(): break
+
+        # --- Discussion: two speaking turns per alive player, in player order ---
+        speakers_alive = alive.sum(axis=1)
+        speaker_rank = np.cumsum(alive, axis=1) - 1
+        turns = SPEECHES_PER_PLAYER * speakers_alive
+        for turn in range(int(turns[active].max())):
+            speaking = active & (turn < turns)
+            slot = turn % np.maximum(speakers_alive, 1)
+            me = (alive & (speaker_rank == slot[:, None])).argmax(axis=1)
+            my_role = roles[games, me]
+            p = pressure()
+            others = alive & (players != me[:, None])
+            defend = speaking & (my_role == ROLE_IMP) & (p[games, me] >= IMP_PRESSURE_TO_DEFEND)
+            scores = p + ACCUSED_ME_WEIGHT * (my_role != ROLE_IMP)[:, None] * accusations[games, :, me]
+            scores = with_known(scores, my_role == ROLE_INVESTIGATOR)
+            target = masked_argmax(scores + TIE_NOISE * rng.random((num_games, n)), others)
+            has_target = target >= 0
+            target_score = np.where(has_target, scores[games, np.maximum(target, 0)], -np.inf)
+            accuse = speaking & ~defend & has_target & (target_score >= ACCUSE_THRESHOLD)
+            seed_suspicion = speaking & ~defend & ~accuse & has_target & (my_role == ROLE_IMP)
+            random_target = masked_argmax(rng.random((num_games, n)), others)
+            target = np.where(seed_suspicion, random_target, target)
+            accuse |= seed_suspicion
+            accusations[games[accuse], me[accuse], target[accuse]] += 1
+            times_accused[games[accuse], target[accuse]] += 1
+            defenses[games[defend], me[defend]] += 1
+
+        # --- Voting (simultaneous, so every voter sees the same counts) ---
+        p = pressure()
+        accused_me = accusations.transpose(0, 2, 1) # [game, voter, candidate] = candidate accused voter
+        vote_scores = p[:, None, :] + ACCUSED_ME_WEIGHT * (roles != ROLE_IMP)[:, :, None] * accused_me
+        investigator_rows = (players[None, :] == investigator[:, None]) & has_investigator[:, None]
+        known_rows = known[:, None, :]
+        vote_scores = np.where(investigator_rows[:, :, None] & (known_rows == KNOWN_EVIL), KNOWN_SCORE, vote_scores)
+        vote_scores = np.where(investigator_rows[:, :, None] & (known_rows == KNOWN_GOOD), -KNOWN_SCORE, vote_scores)
+        voters = alive & active[:, None]
+        vote_allowed = voters[:, :, None] & alive[:, None, :] & ~np.eye(n, dtype=bool)[None]
+        votes = masked_argmax(vote_scores + TIE_NOISE * rng.random((num_games, n, n)), vote_allowed)
+
+        # --- Tally, reveal and execution ---
+        counts, executed, _ = tally(votes, n)
+        votes_received += counts
+        executing = active & (executed >= 0)
+        alive[games[executing], executed[executing]] = False
+        executions[ids[executing]] += 1
+        imp_executed[ids[executing & (executed == imp)]] = True
+        finish_games()
+
+    return {"winner": winner, "rounds": rounds, "executions": executions, "imp_executed": imp_executed}
+
+
+def simulate(num_players: int, num_games: int, seed: Optional[int] = None, roles: Optional[np.ndarray] = None,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """Simulates `num_games` games (random roles, or `roles`) in chunks; results concatenated in game order."""
+    rng = np.random.default_rng(seed)
+    if roles is None: roles = random_roles(rng, num_games, num_players)
+    parts = [simulate_batch(roles[start:start + chunk_size], rng) for start in range(0, len(roles), chunk_size)]
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]} if parts else {}
+
+
+def summarize(result: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Win rates and game length for one simulated configuration."""
+    games = len(result["winner"])
+    good_wins = int((result["winner"] == WINNER_GOOD).sum())
+    return {
+        "games": games,
+        "good_win_rate": good_wins / games if games else 0.0,
+        "evil_win_rate": int((result["winner"] == WINNER_EVIL).sum()) / games if games else 0.0,
+        "mean_rounds": float(result["rounds"].mean()) if games else 0.0,
+        "imp_executed_rate": float(result["imp_executed"].mean()) if games else 0.0,
+    }
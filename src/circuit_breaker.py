@@ -0,0 +1,149 @@
+# src/circuit_breaker.py
+"""
+Per-route circuit breakers for LLM calls.
+
+When OpenRouter or one model degrades, every call used to wait out the full
+timeout before the GM narrated a failure. A breaker watches the recent outcome
+window of one model route and trips OPEN once the error/timeout rate is too
+high; callers then skip that route immediately (failing over to the next model
+in the chain, or to the local policy). After a cooldown the breaker goes
+HALF_OPEN and lets a single probe through; a successful probe closes it again.
+"""
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Deque, Literal
+
+from .llm_session import loop_time # time.monotonic() on a normal loop; virtual in latency simulations
+
+# --- Breaker Constants ---
+BREAKER_WINDOW_SIZE = 10            # Outcomes remembered per route
+BREAKER_MIN_CALLS = 4               # Don't judge a route on fewer calls than this
+BREAKER_FAILURE_RATE_THRESHOLD = 0.5
+BREAKER_CONSECUTIVE_FAILURES = 3    # Trip immediately after this many failures in a row
+BREAKER_COOLDOWN_SECONDS = 30.0     # First OPEN period; doubles on each failed probe
+BREAKER_MAX_COOLDOWN_SECONDS = 300.0
+BREAKER_PROBE_TIMEOUT_SECONDS = 90.0 # A probe that never reports back frees the slot after this
+# -------------------------
+
+BreakerState = Literal['closed', 'open', 'half_open']
+
+
+class CircuitBreaker:
+    """Thread-safe breaker for one model route; shared by every game in the process."""
+    def __init__(self, route: str):
+        self.route = route
+        self.state: BreakerState = 'closed'
+        self._outcomes: Deque[bool] = deque(maxlen=BREAKER_WINDOW_SIZE) # True = failure
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._cooldown = BREAKER_COOLDOWN_SECONDS
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+        # --- Metrics ---
+        self.trips = 0
+        self.rejected_calls = 0
+        self.failures_by_kind: Dict[str, int] = {}
+
+    def _transition(self, new_state: BreakerState, reason: str) -> None:
+        if new_state == self.state: return
+        logging.warning(f"Circuit breaker [{self.route}]: {self.state} -> {new_state} ({reason}).")
+        self.state = new_state
+
+    def allow_request(self) -> bool:
+        """True if a call may be sent on this route now. In HALF_OPEN only one probe is allowed."""
+        with self._lock:
+            now = loop_time()
+            if self.state == 'open':
+                if now - self._opened_at < self._cooldown:
+                    self.rejected_calls += 1
+                    return False
+                self._transition('half_open', f"cooldown of {self._cooldown:.0f}s elapsed")
+                self._probe_started_at = 0.0
+            if self.state == 'half_open':
+                if self._probe_started_at and now - self._probe_started_at < BREAKER_PROBE_TIMEOUT_SECONDS:
+                    self.rejected_calls += 1
+                    return False # A probe is already in flight
+                self._probe_started_at = now
+            return True
+
+    def is_available(self) -> bool:
+        """Non-reserving check: could a call on this route be attempted right now?"""
+        with self._lock:
+            if self.state == 'open':
+                return loop_time() - self._opened_at >= self._cooldown
+            if self.state == 'half_open':
+                return not (self._probe_started_at and loop_time() - self._probe_started_at < BREAKER_PROBE_TIMEOUT_SECONDS)
+            return True
+
+    def release_probe(self) -> None:
+        """Frees a half-open probe slot claimed by allow_request() when no request was judged (deadline, cancellation)."""
+        with self._lock:
+            if self.state == 'half_open': self._probe_started_at = 0.0
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive_failures = 0
+            if self.state == 'half_open':
+                self._transition('closed', "probe succeeded")
+                self._outcomes.clear()
+                self._cooldown = BREAKER_COOLDOWN_SECONDS
+
+    def record_failure(self, kind: str = 'error') -> None:
+        with self._lock:
+            self.failures_by_kind[kind] = self.failures_by_kind.get(kind, 0) + 1
+            self._outcomes.append(True)
+            self._consecutive_failures += 1
+            if self.state == 'half_open':
+                self._cooldown = min(self._cooldown * 2, BREAKER_MAX_COOLDOWN_SECONDS)
+                self._trip(f"probe failed ({kind})")
+                return
+            failure_rate = sum(self._outcomes) / len(self._outcomes)
+            if self._consecutive_failures >= BREAKER_CONSECUTIVE_FAILURES:
+                self._trip(f"{self._consecutive_failures} consecutive failures ({kind})")
+            elif len(self._outcomes) >= BREAKER_MIN_CALLS and failure_rate >= BREAKER_FAILURE_RATE_THRESHOLD:
+                self._trip(f"failure rate {failure_rate:.0%} over last {len(self._outcomes)} calls")
+
+    def _trip(self, reason: str) -> None:
+        # Caller holds the lock.
+        self._opened_at = loop_time()
+        self._probe_started_at = 0.0
+        self.trips += 1
+        self._transition('open', reason)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "rejected_calls": self.rejected_calls,
+                "failures_by_kind": dict(self.failures_by_kind),
+                "recent_failure_rate": (sum(self._outcomes) / len(self._outcomes)) if self._outcomes else 0.0,
+            }
+
+
+# --- Registry (process-wide) ---
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_circuit_breaker(route: str) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(route)
+        if breaker is None:
+            breaker = _breakers[route] = CircuitBreaker(route)
+        return breaker
+
+
+def breaker_metrics() -> Dict[str, Dict[str, Any]]:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {b.route: b.metrics() for b in breakers}
+
+
+def reset_circuit_breakers() -> None:
+    """Forgets every route's state and metrics (e.g. between benchmark runs)."""
+    with _registry_lock:
+        _breakers.clear()
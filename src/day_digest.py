@@ -0,0 +1,95 @@
+# src/day_digest.py
+"""
+Once-per-day public digest.
+
+At the end of `discussion_phase` the day's discussion is summarized once:
+who accused whom, who defended themselves, role claims and shared clues, who
+stayed silent. `tally_votes` appends the vote breakdown and outcome. The result
+is stored in `GraphState.day_digests` (keyed by round, as a string) and every
+player's next prompt includes the same text, instead of each player
+re-reading the raw log lines of the day.
+"""
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .game_log import parse_log_entry, SUSPICION_INTENTS
+
+DIGEST_MAX_ITEMS = 8 # Per digest line; the rest is counted as "+N more"
+_ROLE_CLAIM_RE = re.compile(r"\bI(?:'m| am)\s+(?:the\s+|an?\s+)?(Investigator|Villager|Imp|Impostor)\b", re.IGNORECASE)
+
+
+def _join_limited(items: List[str]) -> str:
+    shown = "; ".join(items[:DIGEST_MAX_ITEMS])
+    return shown + (f"; +{len(items) - DIGEST_MAX_ITEMS} more" if len(items) > DIGEST_MAX_ITEMS else "")
+
+
+def summarize_discussion(entries: Sequence[str]) -> str:
+    """Digest of one discussion phase's log entries (speech, silence); other lines are ignored."""
+    accusations: Counter = Counter()
+    defenses: Counter = Counter()
+    claims: Dict[str, str] = {}
+    clues: List[str] = []
+    silent: List[str] = []
+    speakers = set()
+    for entry in entries:
+        event = parse_log_entry(entry)
+        if event.kind == 'silent':
+            if event.actor not in speakers and event.actor not in silent: silent.append(event.actor)
+            continue
+        if event.kind != 'speech': continue
+        speakers.add(event.actor)
+        if event.actor in silent: silent.remove(event.actor)
+        if event.intent in SUSPICION_INTENTS and event.target and event.target != event.actor:
+            accusations[(event.actor, event.target)] += 1
+        elif event.intent == 'defend_self':
+            defenses[event.actor] += 1
+        elif event.intent == 'share_clue' and event.target:
+            clues.append(f"{event.actor} about {event.target}")
+        claim = _ROLE_CLAIM_RE.search(event.text)
+        if claim: claims[event.actor] = claim.group(1).capitalize()
+
+    lines = []
+    if accusations:
+        lines.append("Accusations: " + _join_limited([f"{a} -> {t}" + (f" (x{c})" if c > 1 else "") for (a, t), c in accusations.most_common()]))
+        accused = Counter()
+        for (_, target), count in accusations.items(): accused[target] += count
+        lines.append("Most accused: " + ", ".join(f"{p} ({c})" for p, c in accused.most_common(3)))
+    if defenses:
+        lines.append("Defended themselves: " + _join_limited([p for p, _ in defenses.most_common()]))
+    if claims:
+        lines.append("Role claims: " + _join_limited([f"{p} claims {role}" for p, role in claims.items()]))
+    if clues:
+        lines.append("Clues shared: " + _join_limited(clues))
+    if silent:
+        lines.append("Stayed silent: " + _join_limited(silent))
+    return "\n".join(lines) if lines else "Discussion: nothing notable was said."
+
+
+def summarize_votes(votes: Dict[str, str], execution_target: Optional[str], tied_players: Optional[List[str]]) -> str:
+    """Compact vote breakdown (target <- voters, most votes first) plus the outcome."""
+    by_target: Dict[str, List[str]] = {}
+    for voter, target in votes.items():
+        if target: by_target.setdefault(target, []).append(voter)
+    if not by_target:
+        breakdown = "Votes: none cast"
+    else:
+        ranked = sorted(by_target.items(), key=lambda kv: len(kv[1]), reverse=True)
+        breakdown = "Votes: " + _join_limited([f"{t} ({len(v)}) <- {', '.join(v)}" for t, v in ranked])
+    if execution_target: outcome = f"Outcome: {execution_target} to be executed."
+    elif tied_players: outcome = f"Outcome: tie between {', '.join(tied_players)}, no execution."
+    else: outcome = "Outcome: no execution."
+    return f"{breakdown}\n{outcome}"
+
+
+def latest_day_digest(game_state) -> Tuple[Optional[int], Optional[str]]:
+    """The most recent day's digest and its round number, or (None, None)."""
+    digests = game_state.get('day_digests') or {}
+    if not digests: return None, None
+    round_key = max(digests, key=int)
+    return int(round_key), digests[round_key]
+
+
+def merge_day_digests(existing: Optional[Dict[str, str]], new: Dict[str, str]) -> Dict[str, str]:
+    """GraphState reducer for `day_digests`: nodes return only the rounds they wrote."""
+    return {**(existing or {}), **new}
@@ -1,6 +1,11 @@
 # src/decision_handler.py
 import asyncio
-from typing import Optional, Any, Dict, List
+import os
+import sys
+import queue
+import threading
+import time
+from typing import Optional, Any, Dict, List, Literal, Callable, Awaitable
 import logging
 
 # --- ADDED: Import SpeechOutput for creating the dict ---
@@ -14,11 +19,149 @@ except ImportError:
      console = Console()
 
 from .state import ActionContext
-from .ai_player import get_ai_decision_logic
+from .ai_player import get_ai_decision_logic, scripted_ai_decision
+from .heuristic_policy import heuristic_decision
+from .tracing import traced
+from .replay import get_replay_session
+from .game_trace import get_game_trace
+
+# --- AI Decision Backends ---
+async def _scripted_backend(context: ActionContext) -> Optional[Any]:
+    return scripted_ai_decision(context)
+
+async def _heuristic_backend(context: ActionContext) -> Optional[Any]:
+    return heuristic_decision(context)
+
+AI_DECISION_BACKENDS: Dict[str, Callable[[ActionContext], Awaitable[Any]]] = {
+    'llm': get_ai_decision_logic,
+    'scripted': _scripted_backend, # Instant decisions for engine benchmarks
+    'heuristic': _heuristic_backend, # Rule-based play from state alone; cheap stand-in for LLM players
+}
+_active_ai_backend: str = 'llm'
+_player_backends: Dict[str, str] = {} # Per-player overrides of the active backend (e.g. tournament seats)
+
+def set_ai_backend(name: str) -> None:
+    """Selects which backend answers for AI players (see AI_DECISION_BACKENDS)."""
+    global _active_ai_backend
+    if name not in AI_DECISION_BACKENDS:
+        raise ValueError(f"Unknown AI backend '{name}'. Choose from: {list(AI_DECISION_BACKENDS)}")
+    _active_ai_backend = name
+    logging.info(f"AI decision backend set to '{name}'.")
+
+def get_ai_backend() -> str:
+    return _active_ai_backend
+
+def register_ai_backend(name: str, backend: Callable[[ActionContext], Awaitable[Any]]) -> None:
+    """Adds (or replaces) a named backend, e.g. an LLM backend with its own prompts or model."""
+    AI_DECISION_BACKENDS[name] = backend
+
+def set_player_backends(assignments: Dict[str, str]) -> None:
+    """Per-player backends ({player_id: backend name}); players not listed use the active backend."""
+    global _player_backends
+    unknown = {name for name in assignments.values() if name not in AI_DECISION_BACKENDS}
+    if unknown:
+        raise ValueError(f"Unknown AI backends {sorted(unknown)}. Choose from: {list(AI_DECISION_BACKENDS)}")
+    _player_backends = dict(assignments)
+
+def backend_for(player_id: str) -> str:
+    return _player_backends.get(player_id, _active_ai_backend)
+
+# --- Human Input Settings ---
+# None = wait forever. Otherwise, after this many seconds the fallback decides.
+HUMAN_INPUT_TIMEOUT_SECONDS: Optional[float] = None
+HUMAN_INPUT_FALLBACK: Literal['ai', 'abstain'] = 'abstain'
+
+def configure_human_input(timeout_seconds: Optional[float] = None, fallback: Literal['ai', 'abstain'] = 'abstain') -> None:
+    """Sets the optional human input timeout and what happens when it expires."""
+    global HUMAN_INPUT_TIMEOUT_SECONDS, HUMAN_INPUT_FALLBACK
+    HUMAN_INPUT_TIMEOUT_SECONDS = timeout_seconds if timeout_seconds and timeout_seconds > 0 else None
+    HUMAN_INPUT_FALLBACK = fallback
+
+
+# --- Decision Concurrency ---
+# How many gathered decisions (e.g. the private votes) may run at once. None = all of them;
+# 1 = one after another, as a provider with strict rate limits may need.
+DECISION_CONCURRENCY: Optional[int] = None
+
+def configure_decision_concurrency(limit: Optional[int] = None) -> None:
+    global DECISION_CONCURRENCY
+    DECISION_CONCURRENCY = limit if limit and limit > 0 else None
+
+
+# --- Background stdin Reader ---
+# A single daemon thread owns stdin and feeds lines into a queue, so waiting for
+# the human never blocks the event loop and a timed-out read can be abandoned
+# (the late line is discarded at the start of the next request).
+_human_lines: "queue.Queue[Optional[str]]" = queue.Queue()
+_reader_thread: Optional[threading.Thread] = None
+_reader_lock = threading.Lock()
+
+def _stdin_reader_loop() -> None:
+    # Reads the raw file descriptor rather than calling input(): a daemon thread parked
+    # inside the buffered stdin object aborts the interpreter at shutdown.
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, ValueError, OSError):
+        _human_lines.put(None)
+        return
+    pending = b""
+    while True:
+        try:
+            chunk = os.read(fd, 1024)
+        except OSError:
+            chunk = b""
+        if not chunk:
+            if pending: _human_lines.put(pending.decode(errors='replace'))
+            _human_lines.put(None) # EOF sentinel; repeated reads keep returning it
+            return
+        pending += chunk
+        while b"\n" in pending:
+            line, pending = pending.split(b"\n", 1)
+            _human_lines.put(line.decode(errors='replace').rstrip("\r"))
+
+def _ensure_reader_started() -> None:
+    global _reader_thread
+    with _reader_lock:
+        if _reader_thread is None:
+            _reader_thread = threading.Thread(target=_stdin_reader_loop, name="human-stdin-reader", daemon=True)
+            _reader_thread.start()
+
+def _discard_stale_input() -> None:
+    """Drops lines typed before the prompt was shown (e.g. late answers to a timed-out prompt)."""
+    while True:
+        try:
+            line = _human_lines.get_nowait()
+        except queue.Empty:
+            return
+        if line is None: # Keep the EOF sentinel
+            _human_lines.put(None)
+            return
+
+def _read_human_line(prompt: str, deadline: Optional[float]) -> str:
+    """
+    Prints the prompt and waits for one line from the reader thread.
+    Raises EOFError on end of input and TimeoutError once the deadline passes.
+    """
+    console.print(prompt, end="")
+    remaining = None if deadline is None else deadline - time.monotonic()
+    if remaining is not None and remaining <= 0:
+        raise TimeoutError("Human input deadline already passed.")
+    try:
+        line = _human_lines.get(timeout=remaining)
+    except queue.Empty:
+        raise TimeoutError("Human input timed out.")
+    if line is None:
+        _human_lines.put(None)
+        raise EOFError
+    return line
+
 
 # --- MODIFIED Human Decision for Speak ---
-def _get_human_decision_via_input(context: ActionContext) -> Optional[Any]:
-    """Gets decision from a human player via console input using Rich."""
+def _get_human_decision_via_input(context: ActionContext, deadline: Optional[float] = None) -> Optional[Any]:
+    """
+    Gets decision from a human player via console input using Rich.
+    Blocking; get_decision runs it in a worker thread. Raises TimeoutError past `deadline`.
+    """
     player_id = context['player_id']
     action_type = context['action_type']
     prompt_msg = context.get('prompt_message', "Decision needed:")
@@ -34,7 +177,7 @@ def _get_human_decision_via_input(context: ActionContext) -> Optional[Any]:
                     console.print("[bold]Options:[/bold]")
                     for key, value in options.items():
                         console.print(f"  [yellow]{key}[/yellow]: {value}")
-                choice_key = console.input("[bold]Enter the key:[/bold] ")
+                choice_key = _read_human_line("[bold]Enter the key:[/bold] ", deadline)
                 if choice_key in options:
                     console.print(f"Selected: {options[choice_key]} (Key: [yellow]{choice_key}[/yellow])")
                     return choice_key # Return the key string
@@ -46,7 +189,7 @@ def _get_human_decision_via_input(context: ActionContext) -> Optional[Any]:
     # --- MODIFIED: Handling for 'speak' action ---
     elif action_type == 'speak':
         try:
-            user_input = console.input("[bold]Enter input:[/bold] ")
+            user_input = _read_human_line("[bold]Enter input:[/bold] ", deadline)
             if user_input is None or not user_input.strip(): # Handle empty input or cancellation
                 console.print("\n[yellow]Input cancelled or empty.[/yellow]")
                 # Return a dict representing silence/failure for consistency?
@@ -73,16 +216,37 @@ def _get_human_decision_via_input(context: ActionContext) -> Optional[Any]:
     else:
         # Fallback for other action types without options (if any)
         try:
-            user_input = console.input("[bold]Enter input:[/bold] ")
+            user_input = _read_human_line("[bold]Enter input:[/bold] ", deadline)
             return user_input # Return raw string for unknown types
         except (EOFError, KeyboardInterrupt):
             print("\n[yellow]Input cancelled by user.[/yellow]")
             return None
 
 
-# --- Unified Decision Entry Point (remains the same) ---
+# --- Unified Decision Entry Point ---
+@traced("get_decision", "decision")
 async def get_decision(context: ActionContext) -> Optional[Any]:
-    """Calls Human input or AI logic, logging appropriately."""
+    """
+    Calls Human input or AI logic, logging appropriately.
+    While a game is being recorded or replayed (see replay.py), the decision goes through that session.
+    While a game trace is active (see game_trace.py), its latency, outcome and LLM usage are recorded.
+    """
+    game_trace = get_game_trace()
+    if game_trace is not None:
+        backend = 'human' if context['is_human'] else backend_for(context['player_id'])
+        return await game_trace.record_decision(context, _decide, backend)
+    return await _decide(context)
+
+
+async def _decide(context: ActionContext) -> Optional[Any]:
+    replay_session = get_replay_session()
+    if replay_session is not None:
+        return await replay_session.handle(context, _get_live_decision)
+    return await _get_live_decision(context)
+
+
+async def _get_live_decision(context: ActionContext) -> Optional[Any]:
+    """Asks the human or the active AI backend."""
     player_id = context['player_id']
     action_type = context['action_type']
     role = context.get('player_role', 'Unknown')
@@ -91,9 +255,21 @@ async def get_decision(context: ActionContext) -> Optional[Any]:
     SECRET_ACTIONS: List[str] = ['imp_kill', 'investigate']
 
     if context['is_human']:
-        logging.debug(f"Handling synchronous human input for {player_id} ({action_type})")
-        # Now returns string (key) or dict (speak) or None
-        return _get_human_decision_via_input(context)
+        logging.debug(f"Handling human input for {player_id} ({action_type}) in a worker thread")
+        _ensure_reader_started()
+        _discard_stale_input()
+        deadline = (time.monotonic() + HUMAN_INPUT_TIMEOUT_SECONDS) if HUMAN_INPUT_TIMEOUT_SECONDS else None
+        try:
+            # Now returns string (key) or dict (speak) or None
+            return await asyncio.to_thread(_get_human_decision_via_input, context, deadline)
+        except TimeoutError:
+            console.print(f"\n[yellow]No input from {player_id} within {HUMAN_INPUT_TIMEOUT_SECONDS:.0f}s.[/yellow]")
+            if HUMAN_INPUT_FALLBACK == 'ai':
+                logging.info(f"Human input timed out for {player_id} ({action_type}); AI acts on their behalf.")
+                console.print(f"[yellow]An AI stand-in acts for {player_id} this turn.[/yellow]")
+                return await AI_DECISION_BACKENDS[backend_for(player_id)](context)
+            logging.info(f"Human input timed out for {player_id} ({action_type}); abstaining.")
+            return None
     else:
         logging.info(f"--- AI Player '{player_id}' ({role}) taking Action: {action_type} ---")
         if action_type in PUBLIC_ACTIONS:
@@ -104,4 +280,20 @@ async def get_decision(context: ActionContext) -> Optional[Any]:
              console.print(f"[yellow]AI Player {player_id} ({role}) performing unknown action: {action_type}...[/yellow]")
 
         # Returns string (key) or dict (speak) or failure dict or None
-        return await get_ai_decision_logic(context)
\ No newline at end of file
+        return await AI_DECISION_BACKENDS[backend_for(player_id)](context)
+
+
+async def gather_decisions(contexts: List[ActionContext]) -> List[Any]:
+    """
+    Runs independent decisions concurrently (e.g. private votes), so a human thinking
+    no longer stalls AI calls; at most DECISION_CONCURRENCY at a time if that is set.
+    Results keep input order; exceptions are returned, not raised.
+    """
+    if DECISION_CONCURRENCY is None:
+        return await asyncio.gather(*(get_decision(ctx) for ctx in contexts), return_exceptions=True)
+    semaphore = asyncio.Semaphore(DECISION_CONCURRENCY) # FIFO: decisions still start in request order
+
+    async def _limited(ctx: ActionContext) -> Optional[Any]:
+        async with semaphore:
+            return await get_decision(ctx)
+    return await asyncio.gather(*(_limited(ctx) for ctx in contexts), return_exceptions=True)
@@ -0,0 +1,119 @@
+# src/fault_injection.py
+"""
+Fault injection for the LLM provider, to exercise the recovery path on demand.
+
+A `FaultInjector` is installed with `llm_interface.set_fault_injector` and wraps
+every model call, so each fault goes through the same code a real one would.
+For each call it draws at most one fault:
+- timeout: the call hangs, so the route's asyncio.wait_for fires.
+- http_error: pydantic-ai's ModelHTTPError (503), which counts against the
+  route's breaker, then failover to the next route.
+- empty: an empty answer.
+- malformed_json: the answer as JSON cut short. A speech is cut in half; an
+  option key becomes '{"choice": "2"'.
+- ambiguous_key: an option key inside a sentence ("I'd go with 2, I think").
+  The parser rejects it and the GM interprets it (see gm_utils). It applies to
+  key answers only.
+
+The corrupted answers reach ai_player's parsing, the node failure branches and
+handle_agent_decision_failure. With a `responder`, the model is never called:
+the responder answers instead (offline runs, see benchmarks/fault_injection.py).
+"""
+import re
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Mapping, Optional
+
+FAULT_KINDS = ("timeout", "http_error", "empty", "malformed_json", "ambiguous_key")
+INJECTED_HTTP_STATUS = 503
+HANG_SECONDS = 3600.0 # How long an injected timeout hangs; the caller's own timeout fires first
+
+Responder = Callable[[str, str], Awaitable[str]] # (system_prompt, user_prompt) -> answer
+
+
+def parse_fault_rates(spec: str) -> Dict[str, float]:
+    """
+    'KIND=RATE,...', e.g. 'timeout=0.05,malformed_json=0.1'. 'all=RATE' splits RATE evenly over every kind.
+    Raises ValueError on unknown kinds, bad numbers, or rates summing to more than 1.
+    """
+    rates: Dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        kind, sep, value = item.partition('=')
+        try:
+            rate = float(value)
+        except ValueError:
+            raise ValueError(f"Fault spec '{item}': expected KIND=RATE with a numeric rate.") from None
+        if not sep or not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Fault spec '{item}': expected KIND=RATE with 0 <= RATE <= 1.")
+        if kind == 'all':
+            for k in FAULT_KINDS: rates[k] = rates.get(k, 0.0) + rate / len(FAULT_KINDS)
+        elif kind in FAULT_KINDS:
+            rates[kind] = rates.get(kind, 0.0) + rate
+        else:
+            raise ValueError(f"Fault spec '{item}': unknown kind '{kind}'. Choose from: all, {', '.join(FAULT_KINDS)}")
+    if sum(rates.values()) > 1.0 + 1e-9:
+        raise ValueError(f"Fault rates sum to {sum(rates.values()):.3f}, more than 1.")
+    return rates
+
+
+def _corrupt(kind: str, response: str) -> Optional[str]:
+    """The response with fault `kind` applied; None if the kind does not apply to it."""
+    text = response.strip()
+    is_json = text.startswith('{') or text.startswith('```')
+    if kind == 'empty':
+        return ""
+    if kind == 'malformed_json':
+        return text[:len(text) // 2] if is_json else f'{{"choice": "{text}"'
+    if kind == 'ambiguous_key':
+        return None if is_json or not re.fullmatch(r"\w+", text) else f"I'd go with {text}, I think"
+    return None
+
+
+class FaultInjector:
+    """Replaces a configurable share of model calls with faults; see llm_interface.set_fault_injector."""
+    def __init__(self, rates: Mapping[str, float], seed: Optional[int] = None, responder: Optional[Responder] = None):
+        unknown = set(rates) - set(FAULT_KINDS)
+        if unknown: raise ValueError(f"Unknown fault kinds: {', '.join(sorted(unknown))}")
+        if sum(rates.values()) > 1.0 + 1e-9: raise ValueError("Fault rates sum to more than 1.")
+        self.rates = {kind: float(rates.get(kind, 0.0)) for kind in FAULT_KINDS}
+        self.responder = responder
+        self._rng = random.Random(seed)
+        # --- Metrics ---
+        self.calls = 0
+        self.injected: Dict[str, int] = {kind: 0 for kind in FAULT_KINDS}
+
+    def _draw(self) -> Optional[str]:
+        u = self._rng.random()
+        for kind, rate in self.rates.items():
+            if u < rate: return kind
+            u -= rate
+        return None
+
+    async def wrap(self, call: Coroutine, model_name: str, system_prompt: Optional[str], user_prompt: str) -> str:
+        """Awaitable that replaces `call` (one model request): its answer, possibly corrupted, or a fault."""
+        self.calls += 1
+        fault = self._draw()
+        if self.responder is not None or fault in ('timeout', 'http_error'):
+            call.close() # Never sent
+        if fault == 'timeout':
+            self.injected[fault] += 1
+            logging.info(f"Fault injection: hanging the call to {model_name}.")
+            await asyncio.sleep(HANG_SECONDS)
+            raise TimeoutError(f"Injected timeout ({model_name})")
+        if fault == 'http_error':
+            from pydantic_ai.exceptions import ModelHTTPError
+            self.injected[fault] += 1
+            logging.info(f"Fault injection: HTTP {INJECTED_HTTP_STATUS} from {model_name}.")
+            raise ModelHTTPError(status_code=INJECTED_HTTP_STATUS, model_name=model_name, body="injected fault")
+        response = await (self.responder(system_prompt or "", user_prompt) if self.responder is not None else call)
+        corrupted = _corrupt(fault, response or "") if fault else None
+        if corrupted is None: return response
+        self.injected[fault] += 1
+        logging.info(f"Fault injection: {fault} answer from {model_name}: '{corrupted[:70]}'")
+        return corrupted
+
+    def metrics(self) -> Dict[str, Any]:
+        injected = sum(self.injected.values())
+        return {"calls": self.calls, "injected": dict(self.injected),
+                "injected_rate": (injected / self.calls) if self.calls else 0.0}
@@ -0,0 +1,421 @@
+# src/game_archive.py
+"""
+Persistent archive of finished games in one SQLite file, indexed for analysis.
+
+Each finished game (a GameTrace, see game_trace.py) is stored as rows of five tables:
+- games: seed, label, winner, rounds, wall time, LLM calls and tokens, and
+  the compressed public log (the transcript).
+- seats: one row per player, with role, backend, model, prompt version and
+  whether the player's side won. The model and prompt version are the ones
+  most of the seat's decisions used.
+- decisions: one row per decision, with role, model, prompt version, outcome,
+  the player chosen, latency and token counts, plus the compressed prompt and
+  response pair (system prompt, user prompt, raw response).
+- events: speeches, votes, kills, executions, investigations and GM
+  interventions. Actor and target roles and the actor's model are copied onto
+  each row, so common filters need no join.
+- dictionaries: the compression dictionaries the blobs refer to.
+
+Indexes cover lookups by model, prompt version, role and outcome. A question
+like "all Imp kills on round 1 with model X" reads one index range:
+
+    archive.events(kind='kill', round=1, actor_role='Imp', actor_model='X')
+
+Prompts repeat almost entirely from one decision to the next (the role
+prompt, the rules, most of the game so far), and each blob is compressed on
+its own. So blobs are compressed with a dictionary trained on the archive's
+own text. The first `DICT_TRAINING_GAMES` games are stored without one. A
+dictionary is then trained from their transcripts and exchanges, and those
+rows are recompressed with it in the same transaction. `train_dictionary(force=True)`
+trains a newer one, e.g. after the prompts changed. Older rows keep the one
+they were written with. zstd (the optional `zstandard` package) is used when
+installed; otherwise zlib with a preset dictionary. A zstd archive needs
+zstandard to be read.
+
+The file is shared like the tournament store (see tournament_store.py): one
+connection per process, WAL mode, and one short write transaction per game.
+Games are keyed by their trace id, so a game is archived once. A sweep job
+that is reclaimed replays its games under new ids, so they are archived again.
+"""
+import os
+import json
+import time
+import zlib
+import logging
+import importlib.util
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .tournament_store import _Database, worker_label
+from .game_trace import GameTrace
+
+DICT_TRAINING_GAMES = 200 # Games stored without a dictionary before the first one is trained
+DICT_SIZE = 112 * 1024 # zstd's default dictionary size
+DICT_SAMPLE_BYTES = 100 * DICT_SIZE # Training text; more adds time, not ratio
+ZSTD_LEVEL = 9
+ZSTD_LEVEL_WITHOUT_DICTIONARY = 3 # Those rows are recompressed once a dictionary is trained
+ZLIB_LEVEL = 9
+ZLIB_DICT_SIZE = 32 * 1024 # deflate's window: preset dictionary bytes beyond this are never used
+
+_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, codec TEXT NOT NULL, samples INTEGER NOT NULL,
+    created_at REAL NOT NULL, data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY, -- GameTrace.game_id
+    archived_at REAL NOT NULL, worker TEXT, seed INTEGER, label TEXT, players INTEGER NOT NULL, winner TEXT,
+    rounds INTEGER NOT NULL, steps INTEGER NOT NULL, seconds REAL NOT NULL, decisions INTEGER NOT NULL,
+    llm_calls INTEGER NOT NULL, tokens_in INTEGER NOT NULL, tokens_out INTEGER NOT NULL, error TEXT,
+    transcript BLOB NOT NULL, transcript_bytes INTEGER NOT NULL, dictionary INTEGER
+);
+CREATE INDEX IF NOT EXISTS games_by_label ON games (label, winner);
+CREATE INDEX IF NOT EXISTS games_by_winner ON games (winner);
+CREATE INDEX IF NOT EXISTS games_without_dictionary ON games (id) WHERE dictionary IS NULL;
+CREATE TABLE IF NOT EXISTS seats (
+    game_id INTEGER NOT NULL, player TEXT NOT NULL, role TEXT, backend TEXT, model TEXT, prompt_version TEXT,
+    survived INTEGER NOT NULL, won INTEGER, -- won: NULL if the game had no winner
+    PRIMARY KEY (game_id, player)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS seats_by_model ON seats (model, role, won);
+CREATE INDEX IF NOT EXISTS seats_by_prompt ON seats (prompt_version, role, won);
+CREATE INDEX IF NOT EXISTS seats_by_role ON seats (role, won);
+CREATE TABLE IF NOT EXISTS decisions (
+    game_id INTEGER NOT NULL, seq INTEGER NOT NULL, round INTEGER NOT NULL, player TEXT, role TEXT,
+    action TEXT, backend TEXT, model TEXT, prompt_version TEXT, outcome TEXT, choice TEXT,
+    seconds REAL NOT NULL, llm_calls INTEGER NOT NULL, llm_seconds REAL NOT NULL,
+    tokens_in INTEGER NOT NULL, tokens_out INTEGER NOT NULL, cache_hits INTEGER NOT NULL,
+    exchange BLOB, exchange_bytes INTEGER NOT NULL, dictionary INTEGER,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE INDEX IF NOT EXISTS decisions_by_model ON decisions (model, action, round);
+CREATE INDEX IF NOT EXISTS decisions_by_prompt ON decisions (prompt_version, action, outcome);
+CREATE INDEX IF NOT EXISTS decisions_by_role ON decisions (role, action, outcome);
+CREATE INDEX IF NOT EXISTS decisions_by_outcome ON decisions (outcome, action);
+CREATE TABLE IF NOT EXISTS events (
+    game_id INTEGER NOT NULL, seq INTEGER NOT NULL, round INTEGER NOT NULL, phase TEXT, kind TEXT NOT NULL,
+    actor TEXT, actor_role TEXT, actor_model TEXT, target TEXT, target_role TEXT,
+    intent TEXT, tone TEXT, outcome TEXT,
+    PRIMARY KEY (game_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_by_actor ON events (kind, actor_role, actor_model, round);
+CREATE INDEX IF NOT EXISTS events_by_target ON events (kind, target_role, round);
+"""
+
+# Columns the filter helpers accept, per table (values are bound, names come only from here)
+_FILTER_COLUMNS = {
+    "games": ("id", "seed", "label", "players", "winner", "rounds", "error"),
+    "seats": ("game_id", "player", "role", "backend", "model", "prompt_version", "survived", "won"),
+    "decisions": ("game_id", "seq", "round", "player", "role", "action", "backend", "model", "prompt_version",
+                  "outcome", "choice"),
+    "events": ("game_id", "seq", "round", "phase", "kind", "actor", "actor_role", "actor_model", "target",
+               "target_role", "intent", "tone", "outcome"),
+}
+# Blob columns: left out of row results, read with transcript() / exchange()
+_BLOB_COLUMNS = {"transcript", "exchange", "dictionary"}
+
+
+def zstd_available() -> bool:
+    """zstd compression needs the optional `zstandard` package."""
+    return importlib.util.find_spec("zstandard") is not None
+
+
+# --- Compression ---
+
+class _Codec:
+    """Compresses and decompresses text with one dictionary (or none). Blobs start with a codec tag."""
+    TAGS = {'zstd': b'Z', 'zlib': b'D'}
+
+    def __init__(self, codec: str, dictionary: Optional[bytes] = None):
+        self.codec = codec
+        self.dictionary = dictionary
+        if codec == 'zstd':
+            if not zstd_available(): raise RuntimeError("This archive uses zstd compression; install the `zstandard` package to use it.")
+            import zstandard
+            zdict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            if zdict is not None: zdict.precompute_compress(level=ZSTD_LEVEL) # Loaded once, not per blob
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL if zdict else ZSTD_LEVEL_WITHOUT_DICTIONARY, dict_data=zdict)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=zdict)
+
+    def compress(self, text: str) -> Tuple[bytes, int]:
+        """(blob, uncompressed size in bytes)."""
+        data = text.encode('utf-8')
+        if self.codec == 'zstd':
+            return b'Z' + self._compressor.compress(data), len(data)
+        if self.dictionary:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=self.dictionary)
+            return b'D' + compressor.compress(data) + compressor.flush(), len(data)
+        return b'D' + zlib.compress(data, ZLIB_LEVEL), len(data)
+
+    def decompress(self, blob: bytes) -> str:
+        if blob[:1] != self.TAGS[self.codec]: raise ValueError(f"Blob is not {self.codec}-compressed.")
+        if self.codec == 'zstd':
+            return self._decompressor.decompress(blob[1:]).decode('utf-8')
+        decompressor = zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+        return (decompressor.decompress(blob[1:]) + decompressor.flush()).decode('utf-8')
+
+
+def _train(codec: str, samples: Sequence[bytes]) -> bytes:
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.train_dictionary(DICT_SIZE, list(samples), level=ZSTD_LEVEL).as_bytes()
+    # deflate has no trainer: the newest text, up to its window, is the dictionary
+    return b"".join(samples)[-ZLIB_DICT_SIZE:]
+
+
+def _exchange_text(system_prompt: Optional[str], user_prompt: Optional[str], response: Optional[str]) -> str:
+    return json.dumps({"system": system_prompt, "user": user_prompt, "response": response}, ensure_ascii=False)
+
+
+# --- Archive ---
+
+class GameArchive(_Database):
+    SCHEMA = _ARCHIVE_SCHEMA
+    FILE_PRAGMAS = ("auto_vacuum = INCREMENTAL",) # New files only; training gives back the pages it frees
+
+    def __init__(self, path: str, training_games: int = DICT_TRAINING_GAMES):
+        super().__init__(path)
+        self.training_games = training_games
+        self._codecs: Dict[Tuple[str, Optional[int]], _Codec] = {}
+        self._train_at = training_games # Games without a dictionary that trigger training (doubled after a failed try)
+
+    # --- Codecs ---
+    def _codec(self, codec: str, dictionary_id: Optional[int]) -> _Codec:
+        key = (codec, dictionary_id)
+        if key not in self._codecs:
+            data = None
+            if dictionary_id is not None:
+                row = self.conn.execute("SELECT codec, data FROM dictionaries WHERE id = ?", (dictionary_id,)).fetchone()
+                if row is None or row[0] != codec: raise ValueError(f"{self.path} has no {codec} dictionary {dictionary_id}.")
+                data = row[1]
+            self._codecs[key] = _Codec(codec, data)
+        return self._codecs[key]
+
+    def _write_codec(self) -> Tuple[_Codec, Optional[int]]:
+        """The codec new blobs use: the newest dictionary this process can use, else none."""
+        codecs = ('zstd', 'zlib') if zstd_available() else ('zlib',)
+        row = self.conn.execute(f"SELECT id, codec FROM dictionaries WHERE codec IN ({', '.join('?' * len(codecs))}) "
+                                "ORDER BY id DESC LIMIT 1", codecs).fetchone()
+        if row is None: return self._codec(codecs[0], None), None
+        return self._codec(row[1], row[0]), row[0]
+
+    def _unpack(self, blob: Optional[bytes], dictionary_id: Optional[int]) -> Optional[str]:
+        if blob is None: return None
+        codec = next((name for name, tag in _Codec.TAGS.items() if tag == blob[:1]), None)
+        if codec is None: raise ValueError("Unknown blob codec tag.")
+        return self._codec(codec, dictionary_id).decompress(blob)
+
+    # --- Writing ---
+    def add(self, trace: GameTrace) -> bool:
+        """Archives a finished game; False if a game with its id is already archived."""
+        if not trace.games: raise ValueError("GameTrace.finish must be called before the game is archived.")
+        (game_id, seed, label, players, winner, rounds, steps, seconds,
+         decision_count, llm_calls, tokens_in, tokens_out, error) = trace.games[0]
+        codec, dictionary_id = self._write_codec()
+        details = {detail[0]: detail for detail in trace.details}
+        role_of = {player: role for _, player, role, _, _ in trace.roles}
+        models: Dict[str, Counter] = {}
+        prompts: Dict[str, Counter] = {}
+        decision_rows = []
+        for (_, seq, round_number, player, action, backend, outcome, d_seconds, d_calls, d_llm_seconds,
+             d_in, d_out, cache_hits) in trace.decisions:
+            _, choice, model, prompt_version, system_prompt, user_prompt, response = details.get(seq, (seq,) + (None,) * 6)
+            if model: models.setdefault(player, Counter())[model] += 1
+            if prompt_version: prompts.setdefault(player, Counter())[prompt_version] += 1
+            blob, raw_bytes = (None, 0) if system_prompt is None else codec.compress(_exchange_text(system_prompt, user_prompt, response))
+            decision_rows.append((game_id, seq, round_number, player, role_of.get(player), action, backend, model,
+                                  prompt_version, outcome, choice, d_seconds, d_calls, d_llm_seconds, d_in, d_out,
+                                  cache_hits, blob, raw_bytes, dictionary_id if blob is not None else None))
+        seat_model = {player: counts.most_common(1)[0][0] for player, counts in models.items()}
+        seat_prompt = {player: counts.most_common(1)[0][0] for player, counts in prompts.items()}
+        seat_rows = []
+        for _, player, role, backend, survived in trace.roles:
+            side = 'Evil' if role == 'Imp' else 'Good' # As tournament.side_of
+            seat_rows.append((game_id, player, role, backend, seat_model.get(player), seat_prompt.get(player), survived,
+                              None if winner not in ('Good', 'Evil') else int(side == winner)))
+        event_rows = [(game_id, seq, round_number, phase, kind, actor, role_of.get(actor), seat_model.get(actor),
+                       target, role_of.get(target), intent, tone, outcome)
+                      for _, seq, round_number, phase, kind, actor, target, intent, tone, outcome, _ in trace.events]
+        transcript, transcript_bytes = codec.compress("\n".join(trace.transcript))
+
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO games (id, archived_at, worker, seed, label, players, winner, rounds, steps, seconds, "
+                "decisions, llm_calls, tokens_in, tokens_out, error, transcript, transcript_bytes, dictionary) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (game_id, time.time(), worker_label(), None if seed < 0 else seed, label, players, winner, rounds, steps,
+                 seconds, decision_count, llm_calls, tokens_in, tokens_out, error or None, transcript, transcript_bytes,
+                 dictionary_id)).rowcount == 1
+            if added:
+                conn.executemany("INSERT INTO seats VALUES (?, ?, ?, ?, ?, ?, ?, ?)", seat_rows)
+                conn.executemany("INSERT INTO decisions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", decision_rows)
+                conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", event_rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if added and dictionary_id is None and self.training_games > 0:
+            waiting = conn.execute("SELECT count(*) FROM games WHERE dictionary IS NULL").fetchone()[0]
+            if waiting >= self._train_at and self.train_dictionary() is None:
+                self._train_at *= 2 # Too little text so far (or another process trained one); try again later
+        return added
+
+    def train_dictionary(self, force: bool = False) -> Optional[int]:
+        """
+        Trains a dictionary on the newest games' transcripts and exchanges and recompresses every blob
+        stored without a dictionary with it. Without `force`, does nothing once the archive has one.
+        Returns the new dictionary's id (None if none was trained).
+        """
+        codec = 'zstd' if zstd_available() else 'zlib'
+        conn = self.conn
+        if not force and conn.execute("SELECT 1 FROM dictionaries").fetchone(): return None
+        samples: List[bytes] = []
+        total = 0
+        for game_id, blob, dictionary_id in conn.execute("SELECT id, transcript, dictionary FROM games ORDER BY archived_at DESC"):
+            texts = [self._unpack(blob, dictionary_id)]
+            texts += [self._unpack(b, d) for b, d in conn.execute(
+                "SELECT exchange, dictionary FROM decisions WHERE game_id = ? AND exchange IS NOT NULL", (game_id,))]
+            for text in texts:
+                samples.append(text.encode('utf-8'))
+                total += len(samples[-1])
+            if total >= DICT_SAMPLE_BYTES: break
+        if not samples: return None
+        started = time.perf_counter()
+        try:
+            data = _train(codec, samples)
+        except Exception as e: # zstd refuses to train on too little or too uniform text
+            logging.warning(f"Game archive {self.path}: could not train a {codec} dictionary from {len(samples)} samples: {e}")
+            return None
+
+        dictionary_id = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not force and conn.execute("SELECT 1 FROM dictionaries").fetchone(): # Another process won
+                conn.execute("ROLLBACK")
+                return None
+            dictionary_id = conn.execute("INSERT INTO dictionaries (codec, samples, created_at, data) VALUES (?, ?, ?, ?)",
+                                         (codec, len(samples), time.time(), data)).lastrowid
+            new_codec = self._codec(codec, dictionary_id)
+            games = self._recompress(conn, "games", "transcript", new_codec, dictionary_id)
+            exchanges = self._recompress(conn, "decisions", "exchange", new_codec, dictionary_id)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            self._codecs.pop((codec, dictionary_id), None) # Its id may be reused by the next dictionary
+            raise
+        conn.executescript("PRAGMA incremental_vacuum;") # Gives back the old blobs' pages (execute() frees only one)
+        logging.info(f"Game archive {self.path}: trained {codec} dictionary {dictionary_id} ({len(data)} bytes, "
+                     f"{len(samples)} samples) in {time.perf_counter() - started:.2f}s; recompressed {games} "
+                     f"transcripts and {exchanges} exchanges.")
+        return dictionary_id
+
+    def _recompress(self, conn, table: str, blob_column: str, codec: _Codec, dictionary_id: int) -> int:
+        """
+        Rewrites the rows of `table` stored without a dictionary with `codec`. The rows are deleted and
+        inserted again rather than updated: shrinking rows in place would leave their pages mostly empty.
+        """
+        cursor = conn.execute(f"SELECT * FROM {table} WHERE dictionary IS NULL AND {blob_column} IS NOT NULL")
+        names = [column[0] for column in cursor.description]
+        blob_index, dictionary_index = names.index(blob_column), names.index("dictionary")
+        rows = [list(row) for row in cursor]
+        for row in rows:
+            row[blob_index] = codec.compress(self._unpack(row[blob_index], None))[0]
+            row[dictionary_index] = dictionary_id
+        conn.execute(f"DELETE FROM {table} WHERE dictionary IS NULL AND {blob_column} IS NOT NULL")
+        conn.executemany(f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", rows)
+        return len(rows)
+
+    # --- Reading ---
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Any SELECT, as a list of {column: value} rows (e.g. for joins the helpers below do not cover)."""
+        cursor = self.conn.execute(sql, params)
+        names = [column[0] for column in cursor.description or ()]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def _select(self, table: str, filters: Dict[str, Any], limit: Optional[int], count: bool = False):
+        unknown = set(filters) - set(_FILTER_COLUMNS[table])
+        if unknown: raise ValueError(f"Cannot filter {table} by {sorted(unknown)}. Choose from: {list(_FILTER_COLUMNS[table])}")
+        where = " AND ".join(f"{column} IS NULL" if value is None else f"{column} = ?" for column, value in filters.items())
+        params = [value for value in filters.values() if value is not None]
+        if count:
+            return self.conn.execute(f"SELECT count(*) FROM {table}" + (f" WHERE {where}" if where else ""), params).fetchone()[0]
+        columns = [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})") if row[1] not in _BLOB_COLUMNS]
+        sql = f"SELECT {', '.join(columns)} FROM {table}" + (f" WHERE {where}" if where else "")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.query(sql, params)
+
+    def games(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Games whose columns equal every filter (e.g. label='a vs b', winner='Evil'); blobs left out."""
+        return self._select("games", filters, limit)
+
+    def seats(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        return self._select("seats", filters, limit)
+
+    def decisions(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Decisions matching every filter (e.g. model=..., action='vote', outcome='parsing_failed'); see exchange()."""
+        return self._select("decisions", filters, limit)
+
+    def events(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Events matching every filter (e.g. kind='kill', round=1, actor_role='Imp', actor_model=...)."""
+        return self._select("events", filters, limit)
+
+    def count(self, table: str, **filters: Any) -> int:
+        if table not in _FILTER_COLUMNS: raise ValueError(f"Unknown archive table '{table}'. Choose from: {list(_FILTER_COLUMNS)}")
+        return self._select(table, filters, None, count=True)
+
+    def transcript(self, game_id: int) -> Optional[List[str]]:
+        """The game's public log, one entry per item; None if the game is not archived."""
+        row = self.conn.execute("SELECT transcript, dictionary FROM games WHERE id = ?", (game_id,)).fetchone()
+        if row is None: return None
+        text = self._unpack(*row)
+        return text.split("\n") if text else []
+
+    def exchange(self, game_id: int, seq: int) -> Optional[Dict[str, Optional[str]]]:
+        """{'system', 'user', 'response'} of one decision; None if it made no LLM request."""
+        row = self.conn.execute("SELECT exchange, dictionary FROM decisions WHERE game_id = ? AND seq = ?", (game_id, seq)).fetchone()
+        if row is None or row[0] is None: return None
+        return json.loads(self._unpack(*row))
+
+    def win_rates(self, group_by: Iterable[str] = ("model", "role")) -> List[Dict[str, Any]]:
+        """Seats, wins and win rate per group of seat columns (games without a winner are left out)."""
+        group_by = list(group_by)
+        unknown = set(group_by) - set(_FILTER_COLUMNS["seats"])
+        if unknown: raise ValueError(f"Cannot group seats by {sorted(unknown)}. Choose from: {list(_FILTER_COLUMNS['seats'])}")
+        columns = ", ".join(group_by)
+        return self.query(f"SELECT {columns}, count(*) AS seats, sum(won) AS wins, avg(won) AS win_rate FROM seats "
+                          f"WHERE won IS NOT NULL GROUP BY {columns} ORDER BY {columns}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Row counts and stored vs uncompressed text size."""
+        conn = self.conn
+        games, transcript_raw, transcript_stored = conn.execute(
+            "SELECT count(*), coalesce(sum(transcript_bytes), 0), coalesce(sum(length(transcript)), 0) FROM games").fetchone()
+        decisions, exchange_raw, exchange_stored = conn.execute(
+            "SELECT count(*), coalesce(sum(exchange_bytes), 0), coalesce(sum(length(exchange)), 0) FROM decisions").fetchone()
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        raw, stored = transcript_raw + exchange_raw, transcript_stored + exchange_stored
+        return {
+            "games": games, "decisions": decisions, "events": conn.execute("SELECT count(*) FROM events").fetchone()[0],
+            "dictionaries": [dict(zip(("id", "codec", "samples", "bytes"), row)) for row in
+                             conn.execute("SELECT id, codec, samples, length(data) FROM dictionaries ORDER BY id")],
+            "text_bytes": raw, "stored_text_bytes": stored,
+            "compression_ratio": round(raw / stored, 2) if stored else None,
+            "file_bytes": page_count * page_size,
+        }
+
+
+# --- Per-Process Archives (batch runs) ---
+
+_archives: Dict[str, GameArchive] = {}
+
+
+def open_archive(path: str) -> GameArchive:
+    """This process's GameArchive for `path`; its connection is reopened after a fork."""
+    path = os.path.abspath(path)
+    if path not in _archives: _archives[path] = GameArchive(path)
+    return _archives[path]
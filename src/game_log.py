@@ -0,0 +1,263 @@
+# src/game_log.py
+"""
+Append-only, structurally shared public log.
+
+Nodes used to rebuild the log for every decision (`current_log + logs_added`)
+and again at the end of each node, copying the whole list each time. A
+`LogView` is an immutable view of the first `n` entries of a shared backing
+list. Adding entries to the newest view appends to the backing list in place
+and returns a longer view; older views (snapshots handed to earlier decisions)
+keep seeing exactly the entries they had. Re-adding entries that the backing
+list already holds at that position (e.g. `snapshot + logs_this_phase` once
+per turn) just fast-forwards, so the cost of `view + new` is proportional to
+`len(new)`, not to the length of the log.
+
+Views have no mutating methods; `view + [entry]` is the only way to extend.
+A log is owned by one game and is not meant to be extended from several
+threads at once.
+"""
+import re
+import json
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from collections.abc import Sequence, Mapping
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, List, Union, Any, Optional, NamedTuple, overload
+
+
+class LogView(Sequence):
+    __slots__ = ("_entries", "_length")
+
+    def __init__(self, entries: List[str], length: int):
+        self._entries = entries
+        self._length = length
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[str] = ()) -> "LogView":
+        backing = list(entries)
+        return cls(backing, len(backing))
+
+    # --- Sequence protocol ---
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            entries = self._entries # Copies only the sliced part
+            return [entries[i] for i in range(*index.indices(self._length))]
+        if index < 0: index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("log index out of range")
+        return self._entries[index]
+
+    def __iter__(self) -> Iterator[str]:
+        entries = self._entries
+        for i in range(self._length):
+            yield entries[i]
+
+    # --- Structural sharing ---
+    def __add__(self, new_entries: Iterable[str]) -> "LogView":
+        new_entries = list(new_entries) if not isinstance(new_entries, (list, tuple, LogView)) else new_entries
+        if not new_entries: return self
+        if not self._length and isinstance(new_entries, LogView): return new_entries # Share, don't copy
+        entries, start = self._entries, self._length
+        count = len(new_entries)
+        # Fast-forward over entries the backing list already holds at this position.
+        shared = 0
+        limit = min(count, len(entries) - start)
+        while shared < limit:
+            existing, new = entries[start + shared], new_entries[shared]
+            if existing is not new and existing != new: break
+            shared += 1
+        if shared == count:
+            return LogView(entries, start + count)
+        if start + shared == len(entries):
+            entries.extend(new_entries[shared:])
+            return LogView(entries, start + count)
+        # Branching from an older snapshot with different entries: copy once.
+        branch = entries[:start + shared]
+        branch.extend(new_entries[shared:])
+        return LogView(branch, len(branch))
+
+    def __radd__(self, other: Iterable[str]) -> List[str]:
+        return list(other) + list(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LogView):
+            return len(self) == len(other) and (
+                (self._entries is other._entries) or list(self) == list(other))
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"LogView({list(self)!r})"
+
+    def __deepcopy__(self, memo) -> "LogView":
+        return self  # Immutable: copies may share it
+
+    def __copy__(self) -> "LogView":
+        return self
+
+    def __reduce__(self):
+        return (LogView.from_entries, (list(self),))
+
+    def to_list(self) -> List[str]:
+        return self._entries[:self._length]
+
+
+def as_log_view(log: Union[LogView, Iterable[str], None]) -> LogView:
+    """Wraps a plain list (e.g. from an older caller) into a LogView."""
+    if isinstance(log, LogView): return log
+    return LogView.from_entries(log or ())
+
+
+def append_log_entries(log: Union[LogView, Iterable[str], None], new_entries: Iterable[str]) -> LogView:
+    """GraphState reducer for `public_log`: nodes return only their new entries."""
+    return as_log_view(log) + new_entries
+
+
+def state_snapshot(state: Mapping, public_log: LogView) -> Mapping:
+    """
+    Read-only view of the state for an ActionContext, with `public_log` replaced.
+    Top-level keys cannot be reassigned through it and the log cannot be mutated;
+    building it costs one shallow dict copy, never a log copy.
+    """
+    return MappingProxyType({**state, "public_log": public_log})
+
+
+def json_default(obj: Any) -> Any:
+    """`default=` hook for json.dumps: serializes log views and read-only state snapshots."""
+    if isinstance(obj, LogView): return obj.to_list()
+    if isinstance(obj, Mapping): return dict(obj)
+    return str(obj)
+
+
+# --- Entry Parsing ---
+# Turns the log lines written by the nodes back into structured events, for
+# consumers that summarize or index the log instead of showing it verbatim.
+
+class LogEvent(NamedTuple):
+    kind: str # 'speech', 'silent', 'vote_reveal', 'death', 'execution', 'day_start', 'night_start' or 'other'
+    actor: Optional[str] = None # Speaker / voter
+    target: Optional[str] = None # Speech target / vote target / dead player
+    intent: Optional[str] = None # Speech intent
+    text: str = "" # Speech content, or the cleaned line for 'other'
+    round_number: Optional[int] = None # Only on 'day_start' / 'death' / 'night_start'
+    tone: Optional[str] = None # Speech tone
+
+
+SUSPICION_INTENTS = ('accuse', 'initiate_vote', 'point_out_contradiction') # Speech intents that cast suspicion on the target
+
+_NON_PLAYER_PREFIXES = ("SYS", "VOTE", "VOTE_REVEAL", "NARRATOR", "GM", "SPEAK", "DIM")
+_RICH_TAG_RE = re.compile(r'\[/?(?:bold|italic|color|dim|strike|underline|blink|reverse|conceal|code|on\s+\w+|[a-z]+(?: (?:on )?\w+)*|/?rule)\]') # Also multi-style tags like [bold magenta]
+_VOTE_REVEAL_RE = re.compile(r"^VOTE_REVEAL: (\S+) voted for (\S+)$")
+_DAY_RE = re.compile(r"^NARRATOR: Day (\d+)\. (?:Player (\S+) was found dead\.)?")
+_EXECUTED_RE = re.compile(r"^NARRATOR: Player (\S+) was executed by vote\.")
+_NIGHT_RE = re.compile(r"^SYS: Round (\d+): Night phase begins\.")
+
+
+def strip_markup(text: str) -> str:
+    return _RICH_TAG_RE.sub('', text)
+
+
+@lru_cache(maxsize=4096) # Every incremental reader parses the same new entries; parse each once
+def parse_log_entry(entry: str) -> LogEvent:
+    """Classifies one public log line. Never raises; unknown lines come back as kind 'other'."""
+    prefix, sep, rest = entry.partition(": ")
+    if sep and rest.startswith("{") and prefix not in _NON_PLAYER_PREFIXES:
+        try:
+            speech = json.loads(rest)
+        except json.JSONDecodeError:
+            speech = None
+        if isinstance(speech, dict):
+            return LogEvent('speech', actor=prefix, target=speech.get('target_player') or None,
+                            intent=speech.get('intent'), text=str(speech.get('speech_content', '')),
+                            tone=speech.get('tone'))
+    if entry.endswith(" remains silent.") and " " not in entry[:-len(" remains silent.")]:
+        return LogEvent('silent', actor=entry[:-len(" remains silent.")])
+    match = _VOTE_REVEAL_RE.match(entry)
+    if match: return LogEvent('vote_reveal', actor=match.group(1), target=match.group(2))
+    match = _DAY_RE.match(entry)
+    if match:
+        if match.group(2): return LogEvent('death', target=match.group(2), round_number=int(match.group(1)))
+        return LogEvent('day_start', round_number=int(match.group(1)))
+    match = _EXECUTED_RE.match(entry)
+    if match: return LogEvent('execution', target=match.group(1))
+    match = _NIGHT_RE.match(entry)
+    if match: return LogEvent('night_start', round_number=int(match.group(1)))
+    return LogEvent('other', text=strip_markup(entry))
+
+
+class IncrementalLogReader(ABC):
+    """
+    Base for consumers that fold the public log into a summary one entry at a
+    time. `fold` processes only entries not seen before; if it is handed a log
+    that does not continue the one it folded (a new game), it starts over.
+    Subclasses implement `_reset_summary` and `_fold_event`.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.folded_count = 0
+        self._last_folded: Optional[str] = None
+        self.round_number = 0 # Round of the entries being folded, from day/night markers
+        self._reset_summary()
+
+    def fold(self, public_log: Sequence[str], upto: Optional[int] = None) -> int:
+        """Folds `public_log[folded_count:upto]` (default: to the end). Returns how many entries were folded."""
+        upto = len(public_log) if upto is None else max(0, min(upto, len(public_log)))
+        if self.folded_count and (upto < self.folded_count or public_log[self.folded_count - 1] is not self._last_folded):
+            self.reset()
+        start = self.folded_count
+        for i in range(start, upto):
+            event = parse_log_entry(public_log[i])
+            if event.round_number is not None: self.round_number = event.round_number
+            self._fold_event(event)
+        if upto > start:
+            self.folded_count = upto
+            self._last_folded = public_log[upto - 1]
+        return upto - start
+
+    @abstractmethod
+    def _reset_summary(self) -> None:
+        """Clears the subclass's summary (called on construction and when a new game's log arrives)."""
+
+    @abstractmethod
+    def _fold_event(self, event: LogEvent) -> None:
+        """Adds one parsed entry to the summary."""
+
+
+# --- Per-Game Readers ---
+# The readers of one game live in its state (GraphState['log_readers'], created by
+# initialize_game), so they start and end with the game and concurrent games never share one.
+
+class LogReaders:
+    """One game's incremental log readers, created on first use and keyed by their owners."""
+    def __init__(self):
+        self._readers: dict = {}
+
+    def get(self, key: Any, factory: Callable[[], IncrementalLogReader]) -> IncrementalLogReader:
+        reader = self._readers.get(key)
+        if reader is None:
+            reader = self._readers[key] = factory()
+        return reader
+
+    def __repr__(self) -> str:
+        return f"LogReaders({len(self._readers)} readers)"
+
+
+def log_readers(game_state: Mapping) -> LogReaders:
+    """
+    The game's readers. A state that did not come from initialize_game (a hand-built
+    context) gets a fresh container, so its readers last for that one call.
+    """
+    readers = game_state.get('log_readers')
+    return readers if readers is not None else LogReaders()
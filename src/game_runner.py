@@ -1,6 +1,7 @@
 # src/game_runner.py
-from typing import Optional
+from typing import Optional, Dict, Any
 import logging
+import random
 import re
 
 try:
@@ -9,21 +10,62 @@ except ImportError:
      from rich.console import Console
      console = Console() # Fallback
 
-from .graph_setup import graph
+from .graph_setup import get_executor
 from .nodes.utility_nodes import initialize_game
-from .state import GraphState
+from .state import GraphState, apply_state_update
+from .llm_session import llm_session
+from .rate_limiter import get_request_governor
+from .circuit_breaker import breaker_metrics
+from .tracing import start_tracing, stop_tracing, Tracer
+from .replay import start_recording, start_replay, stop_session, get_replay_session
+from .decision_handler import get_ai_backend, backend_for
+from .game_trace import start_game_trace, stop_game_trace, get_game_trace, trace_writer
+from .game_archive import open_archive
+from .suspicion_matrix import get_suspicion_matrix
+from .heuristic_policy import seed_heuristic_policy
 import sys
 
 def is_debug_enabled():
     return logging.getLogger().isEnabledFor(logging.DEBUG)
 
 
-def run_game_sync(player_list: list[str], human_player_id: str):
-    """Runs the game synchronously using the stream method with Rich formatting."""
-    if human_player_id not in player_list:
+def run_game_sync(
+    player_list: list[str],
+    human_player_id: Optional[str],
+    trace_path: Optional[str] = None,
+    seed: Optional[int] = None,
+    record_path: Optional[str] = None,
+    replay_record: Optional[Dict[str, Any]] = None,
+    executor: str = "langgraph",
+    trace_export_dir: Optional[str] = None,
+    archive_path: Optional[str] = None,
+):
+    """
+    Runs the game synchronously using the stream method with Rich formatting.
+    With `trace_path`, spans are recorded, written there as Chrome trace JSON and summarized per phase.
+    With `seed`, the game's randomness (roles, narration, placeholder policies) is reproducible.
+    With `record_path`, every decision's input hash and output is saved there at game end;
+    `replay_record` (see replay.load_record) re-runs such a game without any LLM or human input.
+    `executor` picks what runs the graph: 'langgraph' or 'native' (see graph_setup.get_executor).
+    With `trace_export_dir`, the game's events, decisions and outcome are written there as a columnar
+    trace part (see game_trace.py). With `archive_path`, the game is added to that SQLite game archive
+    (see game_archive.py).
+    """
+    if replay_record is not None:
+        player_list = replay_record["player_ids"]
+        human_player_id = replay_record.get("human_player_id")
+        seed = replay_record["seed"]
+    if human_player_id and human_player_id not in player_list:
         console.print(f"[bold red]Error: Human player ID '{human_player_id}' not found in player list: {player_list}[/bold red]")
         return
 
+    if seed is None and record_path:
+        seed = random.SystemRandom().randrange(2**32) # A recording is only replayable with a known seed
+    if seed is not None:
+        random.seed(seed)
+        logging.info(f"Seeded game RNG with {seed}.")
+    seed_heuristic_policy(seed)
+
     initial_setup_config = {"player_ids": player_list, "human_player_id": human_player_id}
     logging.info(f"Preparing initial game state with config: {initial_setup_config}")
 
@@ -35,23 +77,150 @@ def run_game_sync(player_list: list[str], human_player_id: str):
          console.print(f"[bold red]An error occurred during game initialization: {e}[/bold red]")
          return
 
+    if replay_record is not None:
+        start_replay(replay_record)
+        console.print(f"[bold]Replaying recorded game (seed {seed}, {len(replay_record.get('decisions', []))} decisions, no LLM calls).[/bold]")
+    elif record_path:
+        start_recording(seed, player_list, human_player_id, get_ai_backend())
     console.print("\n[bold blue]--- Starting Game Simulation ---[/bold blue]")
+    if trace_path: start_tracing()
+    if trace_export_dir or archive_path: start_game_trace(seed)
+    # One pooled HTTP session per game: every LLM call reuses its connections.
+    final_state: Optional[GraphState] = None
+    try:
+        with llm_session() as session:
+            final_state = _stream_game(first_game_state, player_list, executor)
+            pool_metrics = session.metrics()
+    finally:
+        replay_session = stop_session()
+        game_trace = stop_game_trace()
+    if game_trace:
+        backends = {p: 'human' if p == human_player_id else backend_for(p) for p in player_list}
+        game_trace.finish(final_state, backends, None if final_state else "game ended without a final state")
+        if trace_export_dir: _export_game_trace(game_trace, trace_export_dir)
+        if archive_path: _archive_game(game_trace, archive_path)
+    if replay_session:
+        _finish_replay_session(replay_session, final_state, record_path)
+    if final_state:
+        _report_suspicion_analytics(final_state)
+    tracer = stop_tracing()
+    if tracer:
+        _print_trace_summary(tracer)
+        try:
+            tracer.export_chrome_trace(trace_path)
+            console.print(f"[dim]Trace written to {trace_path} (open in ui.perfetto.dev or chrome://tracing).[/dim]")
+        except OSError as e:
+            logging.error(f"Could not write trace to {trace_path}: {e}")
+    logging.info(f"LLM connection pool metrics: {pool_metrics}")
+    governor = get_request_governor() if pool_metrics["requests_total"] else None # Replays and scripted games never create one
+    if governor:
+        logging.info(f"LLM request governor metrics: {governor.metrics()}")
+    logging.info(f"LLM circuit breakers: {breaker_metrics()}")
+    if is_debug_enabled():
+        console.print(f"[dim]LLM pool: {pool_metrics['requests_total']} requests, peak {pool_metrics['peak_in_flight']}/{pool_metrics['max_connections']} in flight, "
+                      f"{pool_metrics['saturated_requests']} issued while saturated.[/dim]")
+
+
+def _finish_replay_session(replay_session, final_state: Optional[GraphState], record_path: Optional[str]):
+    problem = replay_session.finish(final_state.get('winner') if final_state else None)
+    if replay_session.mode == 'record':
+        try:
+            replay_session.save(record_path)
+            console.print(f"[dim]Decision record ({len(replay_session.decisions)} decisions, seed {replay_session.header['seed']}) "
+                          f"written to {record_path}.[/dim]")
+        except OSError as e:
+            logging.error(f"Could not write decision record to {record_path}: {e}")
+    elif problem:
+        console.print(f"[bold red]Replay diverged:[/bold red] {problem}")
+    else:
+        console.print(f"[bold green]Replay matched the recording ({len(replay_session.decisions)} decisions).[/bold green]")
+
+
+def _export_game_trace(game_trace, directory: str):
+    writer = trace_writer(directory)
+    writer.add(game_trace)
+    try:
+        path = writer.flush()
+        console.print(f"[dim]Game trace ({len(game_trace.events)} events, {len(game_trace.decisions)} decisions) written to {path}.[/dim]")
+    except OSError as e:
+        logging.error(f"Could not write game trace to {directory}: {e}")
+
+
+def _archive_game(game_trace, path: str):
+    try:
+        open_archive(path).add(game_trace)
+        console.print(f"[dim]Game archived to {path} ({len(game_trace.decisions)} decisions, {len(game_trace.events)} events).[/dim]")
+    except Exception as e: # sqlite3.Error, or a zstd archive opened without zstandard
+        logging.error(f"Could not archive game to {path}: {e}")
+
+
+def _report_suspicion_analytics(final_state: GraphState):
+    """Logs how well accusations and votes tracked the real roles; prints a table in debug mode."""
+    roles = {p['id']: p.get('role') for p in final_state.get('players') or []}
+    stats = get_suspicion_matrix(final_state).analytics(roles)
+    logging.info(f"Suspicion analytics: good-team accusation accuracy {stats['good_accusation_accuracy']}, "
+                 f"vote accuracy {stats['good_vote_accuracy']} (evil share {stats['evil_share']}).")
+    if not is_debug_enabled(): return
+    from rich.table import Table
+    table = Table(title="Suspicion Analytics", show_lines=False)
+    for column in ("Player", "Role", "Accused others", "On evil", "Votes cast", "Votes on evil", "Times accused", "Defenses"):
+        table.add_column(column, justify="left" if column in ("Player", "Role") else "right")
+    for player_id, s in sorted(stats["players"].items()):
+        table.add_row(player_id, str(s["role"]), str(s["accusations"]), str(s["accusations_on_evil"]),
+                      str(s["votes"]), str(s["votes_on_evil"]), str(s["times_accused"]), str(s["defenses"]))
+    console.print(table)
+
+
+def _print_trace_summary(tracer: Tracer):
+    """Prints where the game's wall time went, per phase and span category."""
+    from rich.table import Table
+    summary = tracer.summarize_by_phase()
+    categories = sorted({cat for phase in summary.values() for cat in phase["by_category_ms"]})
+    table = Table(title="Trace Summary (ms)")
+    table.add_column("Phase")
+    table.add_column("Steps", justify="right")
+    table.add_column("Wall", justify="right")
+    for cat in categories:
+        table.add_column(cat, justify="right")
+    for phase, data in sorted(summary.items(), key=lambda kv: kv[1]["wall_ms"], reverse=True):
+        table.add_row(phase, str(data["steps"]), f"{data['wall_ms']:.1f}",
+                      *(f"{data['by_category_ms'].get(cat, 0.0):.1f} ({data['counts'].get(cat, 0)})" for cat in categories))
+    console.print(table)
+    logging.info(f"Trace summary by phase: {summary}")
+
+
+def _stream_game(first_game_state: GraphState, player_list: list[str], executor: str = "langgraph") -> Optional[GraphState]:
+    """
+    Streams the graph to completion, printing debug output and the final result. Returns the last state.
+    Nodes yield only the keys they changed; the full state is rebuilt here by applying each
+    update with the same reducers the graph uses.
+    """
+    last_state_yielded: Optional[GraphState] = None
+    current_state: GraphState = first_game_state
     try:
-        last_state_yielded: Optional[GraphState] = None
         run_config = {"recursion_limit": 100}
-        logging.info(f"Streaming graph with config: {run_config}")
+        logging.info(f"Streaming graph ({executor} executor) with config: {run_config}")
 
-        for step_output in graph.stream(first_game_state, run_config):
+        for step_output in get_executor(executor).stream(first_game_state, run_config, stream_mode="updates"):
             if not isinstance(step_output, dict) or not step_output: continue
             node_name = list(step_output.keys())[0]
-            state_yielded = step_output[node_name]
-            if not isinstance(state_yielded, dict): continue
+            state_update = step_output[node_name] or {} # A node that changed nothing yields None
+            if not isinstance(state_update, dict): continue
+
+            current_state = apply_state_update(current_state, state_update)
+            state_yielded = last_state_yielded = current_state
+            game_trace = get_game_trace()
+            if game_trace is not None: game_trace.observe(node_name, state_update, current_state)
 
-            last_state_yielded = state_yielded
+            replay_session = get_replay_session()
+            if replay_session is not None and replay_session.divergence is not None:
+                console.print(f"\n[bold red]Stopping replay after step '{node_name}': the game diverged from the recording.[/bold red]")
+                return last_state_yielded
 
             if is_debug_enabled():
                 console.print(f"\n[bold magenta]--- Debug: Completed Step: {node_name} ---[/bold magenta]")
                 console.print(f" [dim] Current Phase:[/dim] [yellow]{state_yielded.get('current_phase', 'N/A')}[/yellow]")
+                console.print(f" [dim] Changed:[/dim] {', '.join(state_update) or 'nothing'}")
                 alive_players_list = state_yielded.get('alive_players')
                 if alive_players_list:
                      console.print(f" [dim] Alive Players:[/dim] {', '.join(sorted(alive_players_list))}")
@@ -94,4 +263,5 @@ def run_game_sync(player_list: list[str], human_player_id: str):
              logging.error(f"Last known state before error: {last_state_yielded}")
              if is_debug_enabled():
                   console.print("[dim]Last known state logged for debugging:[/dim]")
-                  console.print(f"[dim]{last_state_yielded}[/dim]")
\ No newline at end of file
+                  console.print(f"[dim]{last_state_yielded}[/dim]")
+    return last_state_yielded
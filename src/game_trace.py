@@ -0,0 +1,449 @@
+# src/game_trace.py
+"""
+Columnar export of game traces, for analytics over many games.
+
+Once a game ends, its console output and text log are gone. A `GameTrace`
+records one game as rows of four tables with a fixed schema (`TRACE_SCHEMA`):
+
+- games: one row per game (seed, label, winner, rounds, wall time and totals).
+- roles: one row per seat (role, AI backend or tournament policy, survived).
+- events: one row per public event, in order. Covers speeches (intent, target,
+  tone), silences, votes and abstentions, kills (the Imp who chose the target
+  as actor), executions, investigations
+  (target and result, from the Investigator's private result) and GM
+  interventions.
+- decisions: one row per `get_decision` call (player, action, outcome,
+  latency, LLM calls and time, tokens in/out, response-cache hits).
+
+Events come from the step updates the runner already streams: new public log
+entries (parsed with game_log.parse_log_entry) plus `pending_night_results`.
+Decisions come from `get_decision`. Each decision's LLM calls report their
+usage to it through a context variable, so gathered (concurrent) votes are
+attributed correctly. While no trace is active, every hook costs one global
+lookup.
+
+A `TraceWriter` buffers finished games and writes them in bulk, one `.npz`
+part per `TRACE_GAMES_PER_PART` games. Part names carry the host and process,
+so worker processes can share an output directory. Columns are laid out the
+way Arrow lays them out, which makes a later Parquet conversion a straight copy:
+- numbers are typed arrays;
+- repeated strings (players, roles, intents, ...) are int32 codes plus a
+  dictionary, with -1 for null;
+- free text is UTF-8 bytes plus offsets.
+`load_traces` concatenates every part of a directory with no pickle and no
+per-row Python work; text is decoded only when a row of a `TextColumn` is read.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import atexit
+import socket
+import logging
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .game_log import parse_log_entry, strip_markup
+from .tracing import NODE_PHASES
+
+TRACE_SCHEMA_VERSION = 1
+TRACE_GAMES_PER_PART = 1000 # Games buffered per process before a part file is written
+
+# Column types: a numpy dtype, 'category' (dictionary-encoded, nullable) or 'text' (UTF-8 + offsets).
+# Add columns at the end and bump TRACE_SCHEMA_VERSION; never reorder or retype one.
+TRACE_SCHEMA: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "games": (("game_id", "int64"), ("seed", "int64"), ("label", "category"), ("players", "int16"),
+              ("winner", "category"), ("rounds", "int16"), ("steps", "int32"), ("seconds", "float64"),
+              ("decisions", "int32"), ("llm_calls", "int32"), ("tokens_in", "int64"), ("tokens_out", "int64"),
+              ("error", "text")),
+    "roles": (("game_id", "int64"), ("player", "category"), ("role", "category"), ("backend", "category"),
+              ("survived", "bool")),
+    # kind: speech / silent / vote / kill / execution / investigation / gm.
+    # intent: speech intent, or the action a GM intervention concerns.
+    # outcome: vote 'cast' / 'abstained'; investigation 'Good' / 'Evil' / 'failed'; gm 'recovered' / 'failed' / 'handler_error'.
+    "events": (("game_id", "int64"), ("seq", "int32"), ("round", "int16"), ("phase", "category"),
+               ("kind", "category"), ("actor", "category"), ("target", "category"), ("intent", "category"),
+               ("tone", "category"), ("outcome", "category"), ("text", "text")),
+    # outcome: 'ok', 'none' (no answer), 'exception', or the failure status the GM handles (e.g. 'parsing_failed').
+    "decisions": (("game_id", "int64"), ("seq", "int32"), ("round", "int16"), ("player", "category"),
+                  ("action", "category"), ("backend", "category"), ("outcome", "category"), ("seconds", "float64"),
+                  ("llm_calls", "int16"), ("llm_seconds", "float64"), ("tokens_in", "int32"), ("tokens_out", "int32"),
+                  ("cache_hits", "int16")),
+}
+
+_GM_RECOVERED_RE = re.compile(r"^GM: Interpreted (\S+)'s ambiguous (\w+) response")
+_GM_FAILED_RE = re.compile(r"^GM: Player (\S+)'s (\w+) action ultimately failed")
+_GM_HANDLER_ERROR_RE = re.compile(r"^SYS: Error during GM handling for (\S+)\.")
+_ABSTAINED_RE = re.compile(r"^VOTE: (\S+) abstained\.")
+_INVESTIGATION_RE = re.compile(r"Player (\S+) is associated with the (Good|Evil) team")
+
+
+# --- LLM Usage per Decision ---
+
+class _DecisionUsage:
+    __slots__ = ("llm_calls", "llm_seconds", "tokens_in", "tokens_out", "cache_hits", "model", "exchange")
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.cache_hits = 0
+        self.model: Optional[str] = None # Route that answered
+        self.exchange: Optional[tuple] = None # (prompt_version, system_prompt, user_prompt, response)
+
+
+_decision_usage: contextvars.ContextVar[Optional[_DecisionUsage]] = contextvars.ContextVar("decision_usage", default=None)
+
+
+def note_llm_call(seconds: float = 0.0, cached: bool = False, model: Optional[str] = None) -> None:
+    """
+    Called by llm_interface for every model route attempt (or cache hit) of the current decision;
+    `model` is set on the attempt (or cache hit) that produced the answer.
+    """
+    usage = _decision_usage.get()
+    if usage is None: return
+    if model: usage.model = model
+    if cached:
+        usage.cache_hits += 1
+        return
+    usage.llm_calls += 1
+    usage.llm_seconds += seconds
+
+
+def note_llm_tokens(request_tokens: Optional[int], response_tokens: Optional[int]) -> None:
+    """Token counts as reported by the provider (missing counts add nothing)."""
+    usage = _decision_usage.get()
+    if usage is None: return
+    usage.tokens_in += request_tokens or 0
+    usage.tokens_out += response_tokens or 0
+
+
+def note_llm_exchange(prompt_version: Optional[str], system_prompt: str, user_prompt: str, response: Optional[str]) -> None:
+    """The prompts the current decision sent and the raw response it got (called by ai_player)."""
+    usage = _decision_usage.get()
+    if usage is None: return
+    usage.exchange = (prompt_version, system_prompt, user_prompt, response)
+
+
+# --- Recording One Game ---
+
+class GameTrace:
+    """Rows of one game for every TRACE_SCHEMA table, in schema column order."""
+    def __init__(self, seed: Optional[int] = None, label: Optional[str] = None):
+        self.game_id = uuid.uuid4().int >> 65 # Random 63-bit id: unique across processes and hosts without coordination
+        self.seed = seed
+        self.label = label
+        self.started = time.perf_counter()
+        self.steps = 0
+        self.events: List[tuple] = []
+        self.decisions: List[tuple] = []
+        self.roles: List[tuple] = []
+        self.games: List[tuple] = []
+        # Not in TRACE_SCHEMA (kept for game_archive): per decision (seq, choice, model, prompt_version,
+        # system_prompt, user_prompt, response), and the full public log once the game is finished.
+        self.details: List[tuple] = []
+        self.transcript: List[str] = []
+        self._decision_seq = 0
+        self._night_killer: Optional[str] = None # The Imp whose kill the next death announcement reports
+
+    def observe(self, node_name: str, update: Mapping[str, Any], state: Mapping[str, Any]) -> None:
+        """Folds one step: `update` is what the node returned, `state` the state after applying it."""
+        self.steps += 1
+        round_number = state.get('round_number') or 0
+        phase = NODE_PHASES.get(node_name, node_name)
+        for entry in update.get('public_log') or ():
+            self._add_log_event(entry, round_number, phase)
+        if node_name == 'investigator_action':
+            for investigator, results in (update.get('pending_night_results') or {}).items():
+                result = (results or {}).get('investigation')
+                if not result: continue
+                match = _INVESTIGATION_RE.search(strip_markup(result))
+                self._add_event(round_number, phase, 'investigation', investigator,
+                                match.group(1) if match else None, outcome=match.group(2) if match else 'failed')
+
+    def _add_event(self, round_number: int, phase: str, kind: str, actor: Optional[str] = None,
+                   target: Optional[str] = None, intent: Optional[str] = None, tone: Optional[str] = None,
+                   outcome: Optional[str] = None, text: str = "") -> None:
+        self.events.append((self.game_id, len(self.events), round_number, phase, kind, actor, target, intent, tone, outcome, text))
+
+    def _add_log_event(self, entry: str, round_number: int, phase: str) -> None:
+        event = parse_log_entry(entry)
+        if event.kind == 'speech':
+            self._add_event(round_number, phase, 'speech', event.actor, event.target, event.intent, event.tone, text=event.text)
+        elif event.kind == 'silent':
+            self._add_event(round_number, phase, 'silent', event.actor)
+        elif event.kind == 'vote_reveal':
+            self._add_event(round_number, phase, 'vote', event.actor, event.target, outcome='cast')
+        elif event.kind == 'death':
+            self._add_event(round_number, phase, 'kill', self._night_killer, event.target)
+        elif event.kind == 'execution':
+            self._add_event(round_number, phase, 'execution', target=event.target)
+        else:
+            for pattern, outcome in ((_GM_RECOVERED_RE, 'recovered'), (_GM_FAILED_RE, 'failed'), (_GM_HANDLER_ERROR_RE, 'handler_error')):
+                match = pattern.match(entry)
+                if match:
+                    action = match.group(2) if pattern.groups > 1 else None
+                    self._add_event(round_number, phase, 'gm', match.group(1), intent=action, outcome=outcome, text=strip_markup(entry))
+                    return
+            match = _ABSTAINED_RE.match(entry)
+            if match: self._add_event(round_number, phase, 'vote', match.group(1), outcome='abstained')
+
+    async def record_decision(self, context: Mapping[str, Any], decide: Callable[[Any], Awaitable[Any]], backend: str) -> Any:
+        """Runs `decide(context)`, recording its latency, outcome and the LLM usage it reports."""
+        seq = self._decision_seq # Taken before any await, so gathered decisions keep request order
+        self._decision_seq += 1
+        usage = _DecisionUsage()
+        token = _decision_usage.set(usage)
+        started = time.perf_counter()
+        outcome, result = 'exception', None
+        try:
+            result = await decide(context)
+            if result is None: outcome = 'none'
+            elif isinstance(result, dict) and 'status' in result: outcome = str(result['status'])
+            else: outcome = 'ok'
+            return result
+        finally:
+            _decision_usage.reset(token)
+            round_number = (context.get('full_game_state') or {}).get('round_number') or 0
+            player_id, action = context.get('player_id'), context.get('action_type')
+            self.decisions.append((self.game_id, seq, round_number, player_id, action,
+                                   backend, outcome, time.perf_counter() - started, usage.llm_calls, usage.llm_seconds,
+                                   usage.tokens_in, usage.tokens_out, usage.cache_hits))
+            if action == 'imp_kill': self._night_killer = player_id
+            choice = _decision_choice(context, result if outcome == 'ok' else None)
+            self.details.append((seq, choice, usage.model) + (usage.exchange or (None, None, None, None)))
+
+    def finish(self, final_state: Optional[Mapping[str, Any]], backends: Mapping[str, str],
+               error: Optional[str] = None) -> "GameTrace":
+        """Adds the games and roles rows; `backends` maps player id to the backend (or policy) that played it."""
+        final_state = final_state or {}
+        players = final_state.get('players') or []
+        alive = set(final_state.get('alive_players') or ())
+        self.roles = [(self.game_id, p['id'], p.get('role'), backends.get(p['id']), p['id'] in alive) for p in players]
+        self.transcript = list(final_state.get('public_log') or ())
+        decisions = self.decisions
+        self.games = [(self.game_id, -1 if self.seed is None else self.seed, self.label, len(players),
+                       final_state.get('winner'), final_state.get('round_number') or 0, self.steps,
+                       time.perf_counter() - self.started, len(decisions), sum(d[8] for d in decisions),
+                       sum(d[10] for d in decisions), sum(d[11] for d in decisions), error or "")]
+        return self
+
+    def tables(self) -> Dict[str, List[tuple]]:
+        return {"games": self.games, "roles": self.roles, "events": self.events, "decisions": self.decisions}
+
+
+def _decision_choice(context: Mapping[str, Any], result: Any) -> Optional[str]:
+    """The player a decision picked: the option's player for keyed actions, the speech's target for speeches."""
+    if isinstance(result, dict): return result.get('target_player') or None
+    if isinstance(result, str): return (context.get('options') or {}).get(result, result)
+    return None
+
+
+# --- Active Trace (process-wide, one game at a time) ---
+
+_active_trace: Optional[GameTrace] = None
+
+
+def start_game_trace(seed: Optional[int] = None, label: Optional[str] = None) -> GameTrace:
+    global _active_trace
+    _active_trace = GameTrace(seed, label)
+    return _active_trace
+
+
+def stop_game_trace() -> Optional[GameTrace]:
+    global _active_trace
+    trace, _active_trace = _active_trace, None
+    return trace
+
+
+def get_game_trace() -> Optional[GameTrace]:
+    return _active_trace
+
+
+# --- Column Encoding ---
+# numpy is imported here, not at module level: every game imports this module, few export.
+
+def _encode_table(table: str, rows: Sequence[tuple]) -> Dict[str, Any]:
+    import numpy as np
+    columns = TRACE_SCHEMA[table]
+    values_by_column = list(zip(*rows)) if rows else [()] * len(columns)
+    arrays: Dict[str, Any] = {}
+    for (name, kind), values in zip(columns, values_by_column):
+        key = f"{table}.{name}"
+        if kind == 'category':
+            dictionary: Dict[str, int] = {}
+            arrays[f"{key}.codes"] = np.fromiter((-1 if v is None else dictionary.setdefault(str(v), len(dictionary)) for v in values),
+                                                 dtype=np.int32, count=len(values))
+            arrays[f"{key}.values"] = np.array(list(dictionary), dtype=str)
+        elif kind == 'text':
+            encoded = [str(v).encode('utf-8') for v in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            arrays[f"{key}.offsets"] = offsets
+            arrays[f"{key}.data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        else:
+            arrays[key] = np.array(values, dtype=kind)
+    return arrays
+
+
+class TextColumn(Sequence):
+    """A UTF-8 string column (bytes + offsets); rows are decoded when read."""
+    def __init__(self, data: bytes, offsets):
+        self._data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError("text column index out of range")
+        return self._data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        data, offsets = self._data, self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+    def to_list(self) -> List[str]:
+        return list(self)
+
+
+# --- Writing ---
+
+class TraceWriter:
+    """
+    Buffers finished GameTraces and writes them to `directory` in bulk, one `.npz` part per
+    `games_per_part` games (and whatever is left on `flush`). Parts are written to a temporary
+    name and renamed into place, so a reader never sees a partial file.
+    """
+    def __init__(self, directory: str, games_per_part: int = TRACE_GAMES_PER_PART, compress: bool = True):
+        self.directory = directory
+        self.games_per_part = max(1, games_per_part)
+        self.compress = compress
+        self.games_buffered = 0
+        self.games_written = 0
+        self.parts_written: List[str] = []
+        self._rows: Dict[str, List[tuple]] = {table: [] for table in TRACE_SCHEMA}
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, trace: GameTrace) -> None:
+        if not trace.games: raise ValueError("GameTrace.finish must be called before the trace is written.")
+        for table, rows in trace.tables().items():
+            self._rows[table].extend(rows)
+        self.games_buffered += 1
+        if self.games_buffered >= self.games_per_part: self.flush()
+
+    def flush(self, part_name: Optional[str] = None) -> Optional[str]:
+        """
+        Writes the buffered games as one part; returns its path (None if nothing was buffered).
+        A fixed `part_name` replaces an earlier part of that name, e.g. when a retried job rewrites its games.
+        """
+        if not self.games_buffered: return None
+        import numpy as np
+        arrays: Dict[str, Any] = {"schema": np.array(json.dumps({"version": TRACE_SCHEMA_VERSION, "tables": TRACE_SCHEMA}))}
+        for table, rows in self._rows.items():
+            arrays.update(_encode_table(table, rows))
+        name = part_name or f"{time.strftime('%Y%m%d-%H%M%S')}-{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.directory, f"part-{name}.npz")
+        tmp = os.path.join(self.directory, f".part-{uuid.uuid4().hex}.tmp")
+        with open(tmp, 'wb') as f:
+            (np.savez_compressed if self.compress else np.savez)(f, **arrays)
+        os.replace(tmp, path)
+        logging.info(f"Wrote {self.games_buffered} game traces ({len(self._rows['events'])} events) to {path}")
+        self.games_written += self.games_buffered
+        self.games_buffered = 0
+        self._rows = {table: [] for table in TRACE_SCHEMA}
+        self.parts_written.append(path)
+        return path
+
+
+# --- Per-Process Writers (batch runs) ---
+
+_writers: Dict[str, TraceWriter] = {}
+_writers_pid: Optional[int] = None
+
+
+def trace_writer(directory: str) -> TraceWriter:
+    """
+    This process's writer for `directory`, created on first use. Buffered games are flushed at process
+    exit, worker processes of a multiprocessing pool included (their atexit hooks never run).
+    """
+    global _writers_pid
+    if _writers_pid != os.getpid(): # Games buffered before a fork belong to the parent
+        if _writers_pid is None:
+            atexit.register(flush_trace_writers)
+        from multiprocessing import util
+        util.Finalize(None, flush_trace_writers, exitpriority=10)
+        _writers.clear()
+        _writers_pid = os.getpid()
+    directory = os.path.abspath(directory)
+    if directory not in _writers: _writers[directory] = TraceWriter(directory)
+    return _writers[directory]
+
+
+def flush_trace_writers() -> List[str]:
+    """Writes every game buffered by this process's writers; returns the new part paths."""
+    if _writers_pid != os.getpid(): return []
+    return [path for path in (writer.flush() for writer in _writers.values()) if path]
+
+
+# --- Loading ---
+
+def trace_parts(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith("part-") and name.endswith(".npz"))
+    return [path]
+
+
+def load_traces(path: str, tables: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Every part under `path` (a directory or one part file), as {table: {column: values}}. Numbers are
+    numpy arrays, 'category' columns object arrays of str / None, 'text' columns TextColumns.
+    """
+    import numpy as np
+    tables = list(tables or TRACE_SCHEMA)
+    unknown = set(tables) - set(TRACE_SCHEMA)
+    if unknown: raise ValueError(f"Unknown trace tables {sorted(unknown)}. Choose from: {list(TRACE_SCHEMA)}")
+    pieces: Dict[str, List[Any]] = {}
+    dictionaries: Dict[str, Dict[str, int]] = {}
+    for part in trace_parts(path):
+        with np.load(part, allow_pickle=False) as arrays:
+            version = json.loads(str(arrays["schema"]))["version"]
+            if version != TRACE_SCHEMA_VERSION:
+                raise ValueError(f"Unsupported trace schema version {version!r} in {part}.")
+            for table in tables:
+                for name, kind in TRACE_SCHEMA[table]:
+                    key = f"{table}.{name}"
+                    if kind == 'category':
+                        # Re-code into one dictionary across parts; the trailing -1 keeps nulls null
+                        dictionary = dictionaries.setdefault(key, {})
+                        recode = np.array([dictionary.setdefault(v, len(dictionary)) for v in arrays[f"{key}.values"].tolist()] + [-1],
+                                          dtype=np.int32)
+                        pieces.setdefault(key, []).append(recode[arrays[f"{key}.codes"]])
+                    elif kind == 'text':
+                        pieces.setdefault(key, []).append((arrays[f"{key}.data"].tobytes(), arrays[f"{key}.offsets"]))
+                    else:
+                        pieces.setdefault(key, []).append(arrays[key])
+    loaded: Dict[str, Dict[str, Any]] = {}
+    for table in tables:
+        columns: Dict[str, Any] = {}
+        for name, kind in TRACE_SCHEMA[table]:
+            key = f"{table}.{name}"
+            parts = pieces.get(key, [])
+            if kind == 'category':
+                values = np.empty(len(dictionaries.get(key, {})) + 1, dtype=object)
+                values[:-1] = list(dictionaries.get(key, {}))
+                columns[name] = values[np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)]
+            elif kind == 'text':
+                starts = np.cumsum([0] + [len(data) for data, _ in parts[:-1]], dtype=np.int64)
+                offsets = [np.zeros(1, dtype=np.int64)] + [o[1:] + start for (_, o), start in zip(parts, starts)]
+                columns[name] = TextColumn(b"".join(data for data, _ in parts), np.concatenate(offsets))
+            else:
+                columns[name] = np.concatenate(parts) if parts else np.zeros(0, dtype=kind)
+        loaded[table] = columns
+    return loaded
@@ -12,6 +12,7 @@ from typing import Dict, Any, Optional, Union
 
 # Import state type hints
 from .state import GraphState, PlayerState, ActionContext
+from .tracing import traced
 
 # --- REMOVED local get_decision import --- No longer needed here
 
@@ -92,6 +93,7 @@ def narrate_gm_intervention(
 
 # --- MODIFIED GM Handler (Simpler Recovery Logic) ---
 # --- Changed back to SYNC function ---
+@traced("handle_agent_decision_failure", "gm")
 def handle_agent_decision_failure(
     state: GraphState,
     player_id: str,
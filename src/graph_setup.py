@@ -1,5 +1,12 @@
 # src/graph_setup.py
-from langgraph.graph import StateGraph, END
+"""
+Builds the game graph. Compilation (and importing LangGraph) happens on the
+first `get_graph()` call, not at import time; the compiled graph is cached.
+The topology is declared once as tables so `get_native_graph()` can run the
+same nodes and routing without LangGraph.
+"""
+import functools
+import logging
 # --- MODIFIED: Replace star import with explicit imports ---
 # from .nodes import * # Original line (comment out or delete)
 from .nodes import ( # Add explicit imports
@@ -10,22 +17,7 @@ from .nodes import ( # Add explicit imports
 )
 
 from .state import GraphState, PlayerState # Import GraphState here
-
-# --- Graph Builder ---
-graph_builder = StateGraph(GraphState)
-
-# --- Add Nodes ---
-# ... (nodes remain the same) ...
-graph_builder.add_node("start_night", start_night_phase)
-graph_builder.add_node("imp_action", imp_action)
-graph_builder.add_node("investigator_action", investigator_action)
-graph_builder.add_node("start_day_announce", start_day_announce)
-graph_builder.add_node("discussion", discussion_phase)
-graph_builder.add_node("voting", voting_phase)
-graph_builder.add_node("tally_votes", tally_votes)
-graph_builder.add_node("announce_process_execution", announce_process_execution)
-graph_builder.add_node("announce_no_execution", announce_no_execution)
-graph_builder.add_node("set_winner_end", set_winner_and_end)
+from .tracing import traced_node
 
 # --- Define Conditional Logic (MODIFIED) ---
 
@@ -96,34 +88,95 @@ def check_game_over_final(state: GraphState) -> str:
           return "continue_night"
 
 
-# --- Add Edges ---
-# ... (Edges remain the same) ...
-graph_builder.set_entry_point("start_night")
-graph_builder.add_edge("start_night", "imp_action")
-graph_builder.add_edge("imp_action", "investigator_action")
-graph_builder.add_edge("investigator_action", "start_day_announce")
-graph_builder.add_conditional_edges( "start_day_announce", check_game_over_after_night,
-                                   {"game_over_early": "set_winner_end", "continue_day": "discussion"})
-graph_builder.add_edge("discussion", "voting")
-graph_builder.add_edge("voting", "tally_votes")
-graph_builder.add_conditional_edges(
-    "tally_votes", check_execution,
-    {"execute_player": "announce_process_execution", "no_execution": "announce_no_execution"}
-)
-graph_builder.add_conditional_edges(
-    "announce_process_execution", check_game_over_final,
-    {"game_over_final": "set_winner_end", "continue_night": "start_night"}
-)
-graph_builder.add_conditional_edges(
-    "announce_no_execution", check_game_over_final,
-    {"game_over_final": "set_winner_end", "continue_night": "start_night"}
-)
-graph_builder.add_edge("set_winner_end", END)
-
-
-# --- Compile Graph ---
-try:
-    graph = graph_builder.compile()
-    print("\nGraph compiled successfully with 'investigator_action' node!")
-except Exception as e:
-    print(f"\nError compiling graph: {e}", exc_info=True); raise e
\ No newline at end of file
+# --- Topology ---
+# Shared by the LangGraph build and the native executor, so both run the same nodes and routing.
+# END below is langgraph.graph.END's value, spelled out so the native path never imports LangGraph.
+
+END = "__end__"
+ENTRY_POINT = "start_night"
+
+# Each node is wrapped in a tracing span (no-op unless --trace is given).
+NODES = {name: traced_node(name, fn) for name, fn in (
+    ("start_night", start_night_phase),
+    ("imp_action", imp_action),
+    ("investigator_action", investigator_action),
+    ("start_day_announce", start_day_announce),
+    ("discussion", discussion_phase),
+    ("voting", voting_phase),
+    ("tally_votes", tally_votes),
+    ("announce_process_execution", announce_process_execution),
+    ("announce_no_execution", announce_no_execution),
+    ("set_winner_end", set_winner_and_end),
+)}
+
+EDGES = {
+    "start_night": "imp_action",
+    "imp_action": "investigator_action",
+    "investigator_action": "start_day_announce",
+    "discussion": "voting",
+    "voting": "tally_votes",
+    "set_winner_end": END,
+}
+
+CONDITIONAL_EDGES = {
+    "start_day_announce": (check_game_over_after_night,
+                           {"game_over_early": "set_winner_end", "continue_day": "discussion"}),
+    "tally_votes": (check_execution,
+                    {"execute_player": "announce_process_execution", "no_execution": "announce_no_execution"}),
+    "announce_process_execution": (check_game_over_final,
+                                   {"game_over_final": "set_winner_end", "continue_night": "start_night"}),
+    "announce_no_execution": (check_game_over_final,
+                              {"game_over_final": "set_winner_end", "continue_night": "start_night"}),
+}
+
+EXECUTORS = ("langgraph", "native")
+
+
+# --- Graph Factory ---
+
+@functools.lru_cache(maxsize=1)
+def get_graph():
+    """Builds and compiles the game graph on first use; later calls return the same compiled graph."""
+    from langgraph.graph import StateGraph
+    from langgraph.graph import END as LANGGRAPH_END
+    assert LANGGRAPH_END == END
+
+    # --- Graph Builder ---
+    graph_builder = StateGraph(GraphState)
+    for name, node in NODES.items():
+        graph_builder.add_node(name, node)
+    graph_builder.set_entry_point(ENTRY_POINT)
+    for source, target in EDGES.items():
+        graph_builder.add_edge(source, target)
+    for source, (router, mapping) in CONDITIONAL_EDGES.items():
+        graph_builder.add_conditional_edges(source, router, mapping)
+
+    # --- Compile Graph ---
+    try:
+        compiled_graph = graph_builder.compile()
+        logging.info("Graph compiled successfully with 'investigator_action' node.")
+        return compiled_graph
+    except Exception as e:
+        logging.error(f"Error compiling graph: {e}", exc_info=True)
+        raise
+
+
+@functools.lru_cache(maxsize=1)
+def get_native_graph():
+    """Same topology run by the in-process executor (see native_executor.py); no LangGraph import."""
+    from .native_executor import NativeGraph
+    return NativeGraph(NODES, ENTRY_POINT, EDGES, CONDITIONAL_EDGES)
+
+
+def get_executor(name: str = "langgraph"):
+    """The graph to stream a game through: 'langgraph' (compiled StateGraph) or 'native'."""
+    if name == "langgraph": return get_graph()
+    if name == "native": return get_native_graph()
+    raise ValueError(f"Unknown executor '{name}'. Choose from: {', '.join(EXECUTORS)}")
+
+
+def __getattr__(name: str):
+    # Keeps `from src.graph_setup import graph` working; compiles lazily on first access.
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
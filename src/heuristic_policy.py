@@ -0,0 +1,156 @@
+# src/heuristic_policy.py
+"""
+Rule-based player policy: a third AI backend next to the LLM and the scripted stand-in.
+
+Every decision is made from public information (the suspicion matrix folded
+from the log) plus what the deciding player privately knows (their own role
+and, for an Investigator, their past results), never from other players'
+hidden roles. Per role:
+
+- Villager: accuses and votes for the alive player under the most pressure
+  (accusations and votes received, minus a little for defending themselves),
+  leaning towards players who accused them.
+- Investigator: accuses and votes for a player found Evil; otherwise acts like
+  a Villager but never targets players found Good, and investigates the most
+  suspected player not yet checked.
+- Imp: follows the crowd in votes and speech (never targeting itself), defends
+  itself when under pressure, and kills the least suspected player who has not
+  accused it, so the kill gives nothing away.
+
+Ties are broken with the policy's own RNG, seeded from the game seed: seeded
+games stay reproducible, and a replay (which skips the policy and feeds back
+the recorded decisions) consumes the game's `random` stream exactly as the
+recording did. A decision costs a few microseconds once the matrix is folded; no prompt is
+built and nothing is awaited.
+"""
+import re
+import random
+import logging
+from typing import Optional, Any, Dict, Iterable
+
+from .state import ActionContext
+from .suspicion_matrix import get_suspicion_matrix, SuspicionMatrix
+from .player_memory import get_player_memory
+
+# --- Scoring Weights ---
+ACCUSED_WEIGHT = 1.0 # Per accusation a player received
+VOTED_WEIGHT = 1.5 # Per vote a player received
+DEFENSE_WEIGHT = 0.5 # Subtracted per self-defense
+ACCUSED_ME_WEIGHT = 1.0 # Extra, per time the candidate accused the deciding player
+IMP_PRESSURE_TO_DEFEND = 3.0 # An Imp with at least this much pressure defends itself
+ACCUSE_THRESHOLD = 1.0 # Villagers only accuse someone whose pressure reaches this
+
+_ALIGNMENT_RE = re.compile(r"Player (\S+) is associated with the (Good|Evil) team")
+
+_rng = random.Random()
+
+
+def seed_heuristic_policy(seed: Optional[int]) -> None:
+    """Called at game start with the game seed (None: unseeded)."""
+    _rng.seed(seed)
+
+
+def _pressure(matrix: SuspicionMatrix, player: str) -> float:
+    accused, voted, defended = matrix.pressure(player)
+    return ACCUSED_WEIGHT * accused + VOTED_WEIGHT * voted - DEFENSE_WEIGHT * defended
+
+
+def known_alignments(player_id: str, game_state) -> Dict[str, str]:
+    """{player: 'Good'|'Evil'} from an Investigator's results so far (noted in their player memory)."""
+    memory = get_player_memory(game_state, player_id)
+    result = (game_state.get('pending_night_results') or {}).get(player_id, {}).get('investigation')
+    if result: memory.note_private(game_state.get('round_number', 0), result)
+    alignments = {}
+    for round_number in sorted(memory.private_notes):
+        for target, alignment in _ALIGNMENT_RE.findall(memory.private_notes[round_number]):
+            alignments[target] = alignment
+    return alignments
+
+
+def _best(candidates: Iterable[str], score) -> Optional[str]:
+    """Highest-scoring candidate; ties broken at random."""
+    best, best_key = None, None
+    for candidate in candidates:
+        key = (score(candidate), _rng.random())
+        if best_key is None or key > best_key: best, best_key = candidate, key
+    return best
+
+
+def _suspicion_scorer(player_id: str, role: Optional[str], matrix: SuspicionMatrix, alignments: Dict[str, str]):
+    def score(candidate: str) -> float:
+        alignment = alignments.get(candidate)
+        if alignment == 'Evil': return 1000.0
+        if alignment == 'Good': return -1000.0
+        value = _pressure(matrix, candidate)
+        if role != 'Imp': # An Imp knows its accusers are right; it does not retaliate in the open
+            value += ACCUSED_ME_WEIGHT * matrix.count(matrix.accusations, candidate, player_id)
+        return value
+    return score
+
+
+def _pick_option(options: Dict[str, str], score, player_id: str) -> Optional[str]:
+    """Option key whose player scores highest; the deciding player only if nobody else is offered."""
+    by_player = {player: key for key, player in options.items()}
+    chosen = _best((p for p in by_player if p != player_id), score) or _best(by_player, score)
+    return by_player.get(chosen)
+
+
+# --- Decisions ---
+
+def _speak(context: ActionContext, matrix: SuspicionMatrix, alignments: Dict[str, str]) -> Dict[str, Any]:
+    player_id, role = context['player_id'], context.get('player_role')
+    state = context['full_game_state']
+    others = [p for p in state.get('alive_players') or [] if p != player_id]
+    if role == 'Imp' and _pressure(matrix, player_id) >= IMP_PRESSURE_TO_DEFEND:
+        return {"speech_content": "I'm being piled on without evidence. Look at who started this instead.",
+                "intent": "defend_self", "target_player": None, "tone": "defensive"}
+    if role == 'Investigator':
+        found_evil = next((p for p, a in alignments.items() if a == 'Evil' and p in others), None)
+        if found_evil:
+            return {"speech_content": f"I am the Investigator. I checked {found_evil} and they are Evil. Vote them out.",
+                    "intent": "accuse", "target_player": found_evil, "tone": "urgent"}
+    scorer = _suspicion_scorer(player_id, role, matrix, alignments)
+    target = _best(others, scorer)
+    if target is not None and scorer(target) >= ACCUSE_THRESHOLD:
+        return {"speech_content": f"{target} keeps drawing suspicion and hasn't cleared it up. I think it's them.",
+                "intent": "accuse", "target_player": target, "tone": "suspicious"}
+    if role == 'Imp' and target is not None: # Nobody is under pressure yet: seed some on a random player
+        target = _rng.choice(others)
+        return {"speech_content": f"Something about {target}'s silence bothers me.",
+                "intent": "accuse", "target_player": target, "tone": "suspicious"}
+    return {"speech_content": "Nothing stands out to me yet. Let's hear from everyone before we vote.",
+            "intent": "general_statement", "target_player": None, "tone": "neutral"}
+
+
+def _imp_kill_scorer(player_id: str, matrix: SuspicionMatrix):
+    # Least suspected first (trusted voices are worth removing and nobody suspects a motive),
+    # and never someone who just accused the Imp.
+    def score(candidate: str) -> float:
+        return -_pressure(matrix, candidate) - 10.0 * matrix.count(matrix.accusations, candidate, player_id)
+    return score
+
+
+def heuristic_decision(context: ActionContext) -> Optional[Any]:
+    """Answers any AI decision from state alone. Same output shapes as the LLM backend."""
+    action_type = context['action_type']
+    player_id, role = context['player_id'], context.get('player_role')
+    options = context.get('options')
+    state = context['full_game_state']
+    matrix = get_suspicion_matrix(state)
+    alignments = known_alignments(player_id, state) if role == 'Investigator' else {}
+
+    if action_type == 'speak':
+        return _speak(context, matrix, alignments)
+    if not options:
+        logging.warning(f"Heuristic policy: no options for {player_id} ({action_type}).")
+        return None
+    if action_type == 'vote':
+        return _pick_option(options, _suspicion_scorer(player_id, role, matrix, alignments), player_id)
+    if action_type == 'imp_kill':
+        return _pick_option(options, _imp_kill_scorer(player_id, matrix), player_id)
+    if action_type == 'investigate':
+        # Most suspected player not checked yet; checked players only if nobody else is left.
+        scorer = _suspicion_scorer(player_id, role, matrix, {})
+        return _pick_option(options, lambda p: (p not in alignments, scorer(p)), player_id)
+    logging.warning(f"Heuristic policy: unknown action type '{action_type}'.")
+    return None
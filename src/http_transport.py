@@ -0,0 +1,83 @@
+# src/http_transport.py
+"""
+Metered httpx transport used by `LLMSession`.
+
+Kept in its own module so importing `llm_session` does not import httpx; the
+transport is built the first time a session actually needs its HTTP client.
+"""
+import logging
+from typing import Optional, List, Callable
+
+import httpx
+
+ResponseObserver = Callable[[httpx.Request, httpx.Response], None]
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """Wraps a response body so the request counts as in flight until the body is closed."""
+    def __init__(self, stream: httpx.AsyncByteStream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Delegates to a pooled AsyncHTTPTransport and counts in-flight requests,
+    so callers can see how close the pool is to saturation.
+    """
+    def __init__(self, max_connections: int, observers: List[ResponseObserver], **transport_kwargs):
+        self._transport = httpx.AsyncHTTPTransport(**transport_kwargs)
+        self._observers = observers
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.saturated_requests = 0 # Requests issued while every pool slot was busy
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.in_flight >= self.max_connections:
+            self.saturated_requests += 1
+        self.in_flight += 1
+        self.requests_total += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._release()
+            raise
+        for observer in self._observers:
+            try:
+                observer(request, response)
+            except Exception as e:
+                logging.warning(f"HTTP response observer failed: {e}")
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_MeteredStream(response.stream, self._release),
+            extensions=response.extensions,
+        )
+
+    def open_connections(self) -> Optional[int]:
+        # httpcore exposes the live connection list on its pool object.
+        pool = getattr(self._transport, '_pool', None)
+        connections = getattr(pool, 'connections', None)
+        return len(connections) if connections is not None else None
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,244 @@
+# src/latency_sim.py
+"""
+Latency simulation on a virtual clock: how long games take under a recorded LLM
+latency distribution and a given scheduling strategy, computed in seconds instead of hours.
+
+A simulated game is a real game: the real graph, nodes and decision plumbing
+(`gather_decisions` included). Only the players differ. Every AI decision is
+answered by the heuristic policy and delivered after an LLM latency drawn from a
+`LatencyModel`, which resamples latencies recorded in game traces (see game_trace.py)
+or a game archive (see game_archive.py). The game's event loop is a
+`VirtualClockLoop`: `asyncio.sleep` and timeouts run on a virtual clock, which
+jumps to the next timer whenever nothing is ready. So a 90 s game finishes in a
+few milliseconds, and concurrent waits overlap exactly as they would for real.
+
+`SchedulingSettings` names the strategies being compared:
+- decision_concurrency: how many gathered decisions (the votes) run at once
+  (see decision_handler.configure_decision_concurrency). None means all.
+- hedge_quantile: hedged requests. When a request has not answered by that
+  quantile of its action's latency, a duplicate is sent, and the first answer
+  wins. The provider has no hedging yet; this measures what it would buy.
+
+Every setting plays the same seeds, with the same decisions and the same latency
+draws (common random numbers): the answers are chosen when the request is made,
+not when it returns, and hedges draw from their own generator. Differences
+between settings therefore come from scheduling alone. Simulated time counts
+LLM waits only, not engine CPU time.
+"""
+import io
+import math
+import random
+import asyncio
+import logging
+import selectors
+import time
+from contextlib import redirect_stdout
+from statistics import NormalDist
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence
+
+from . import decision_handler
+from .graph_setup import get_executor
+from .nodes.utility_nodes import initialize_game
+from .decision_handler import register_ai_backend, set_player_backends, configure_decision_concurrency
+from .heuristic_policy import heuristic_decision, seed_heuristic_policy
+from .state import apply_state_update
+from .llm_session import llm_session
+from .tracing import NODE_PHASES
+
+SIMULATED_BACKEND = "simulated"
+# Placeholder latencies for when nothing was recorded: log-normal with these medians (not measurements)
+DEFAULT_MEDIAN_SECONDS = {'speak': 2.5, 'vote': 1.2, 'imp_kill': 1.2, 'investigate': 1.2}
+DEFAULT_SIGMA = 0.6 # Log-normal spread of the placeholders: p95 is about 2.7x the median
+MIN_SAMPLES = 20 # Recorded latencies an action needs before its own distribution is used
+
+
+# --- Virtual Clock ---
+
+class _VirtualSelector:
+    """Wraps the loop's selector: waiting for a timer advances the clock instead of blocking."""
+    def __init__(self, selector: selectors.BaseSelector, loop: "VirtualClockLoop"):
+        self._selector = selector
+        self._loop = loop
+
+    def select(self, timeout: Optional[float] = None):
+        events = self._selector.select(0) # Real I/O (threads finishing, the self-pipe) still wakes the loop
+        if events or timeout == 0: return events
+        if timeout is None: return self._selector.select(None) # No timer pending: only real I/O can make progress
+        self._loop.advance(timeout)
+        return []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._selector, name)
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """An event loop whose time() is virtual; pass it to llm_session(loop=...). `start` continues an earlier loop's clock."""
+    def __init__(self, start: float = 0.0):
+        self._virtual_now = start
+        super().__init__(selector=_VirtualSelector(selectors.DefaultSelector(), self))
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def advance(self, seconds: float) -> None:
+        self._virtual_now += max(0.0, seconds)
+
+
+# --- Latency Model ---
+
+class LatencyModel:
+    """
+    LLM latency per action. Recorded latencies are resampled. An action with fewer than MIN_SAMPLES
+    recordings uses all actions' recordings pooled. With no recordings at all, log-normal placeholders are used.
+    """
+    def __init__(self, samples: Optional[Mapping[str, Sequence[float]]] = None, source: str = "placeholder"):
+        self.samples = {action: sorted(values) for action, values in (samples or {}).items() if len(values)}
+        self.source = source
+        self._pooled = sorted(v for values in self.samples.values() for v in values)
+
+    def _recorded(self, action: str) -> Optional[List[float]]:
+        values = self.samples.get(action)
+        if values and len(values) >= MIN_SAMPLES: return values
+        return self._pooled if len(self._pooled) >= MIN_SAMPLES else None
+
+    def sample(self, action: str, rng: random.Random) -> float:
+        values = self._recorded(action)
+        if values: return values[rng.randrange(len(values))]
+        return DEFAULT_MEDIAN_SECONDS.get(action, 1.5) * math.exp(DEFAULT_SIGMA * rng.gauss(0.0, 1.0))
+
+    def quantile(self, action: str, q: float) -> float:
+        values = self._recorded(action)
+        if values: return values[min(len(values) - 1, int(q * len(values)))]
+        return DEFAULT_MEDIAN_SECONDS.get(action, 1.5) * math.exp(DEFAULT_SIGMA * NormalDist().inv_cdf(q))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        actions = sorted(set(self.samples) | set(DEFAULT_MEDIAN_SECONDS))
+        return {action: {"recorded": len(self.samples.get(action, ())), "p50": round(self.quantile(action, 0.5), 3),
+                         "p90": round(self.quantile(action, 0.9), 3), "p99": round(self.quantile(action, 0.99), 3)}
+                for action in actions}
+
+    @classmethod
+    def from_traces(cls, path: str) -> "LatencyModel":
+        """LLM time of every decision in a game-trace directory or part that made real requests (no cache hits)."""
+        from .game_trace import load_traces
+        d = load_traces(path, ["decisions"])["decisions"]
+        live = (d["llm_calls"] > 0) & (d["cache_hits"] == 0)
+        actions = d["action"][live]
+        seconds = d["llm_seconds"][live]
+        return cls({str(action): seconds[actions == action].tolist() for action in set(actions.tolist()) if action},
+                   source=f"traces:{path}")
+
+    @classmethod
+    def from_archive(cls, path: str) -> "LatencyModel":
+        from .game_archive import GameArchive
+        samples: Dict[str, List[float]] = {}
+        archive = GameArchive(path)
+        try:
+            for row in archive.query("SELECT action, llm_seconds FROM decisions WHERE llm_calls > 0 AND cache_hits = 0"):
+                samples.setdefault(row["action"], []).append(row["llm_seconds"])
+        finally:
+            archive.close()
+        return cls(samples, source=f"archive:{path}")
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "LatencyModel":
+        """From a trace directory / .npz part or an archive file; placeholders if `path` is None."""
+        if path is None: return cls()
+        import os
+        if os.path.isdir(path) or path.endswith(".npz"): return cls.from_traces(path)
+        return cls.from_archive(path)
+
+
+# --- Simulated Games ---
+
+class SchedulingSettings(NamedTuple):
+    name: str
+    decision_concurrency: Optional[int] = None # Gathered decisions at once; None = all, 1 = sequential
+    hedge_quantile: Optional[float] = None # Duplicate a request still pending at this latency quantile; None = never
+
+
+class _SimulatedProvider:
+    """AI backend for simulated games: the heuristic answer, delivered after a sampled LLM latency."""
+    def __init__(self, latency: LatencyModel, settings: SchedulingSettings, seed: int):
+        self.latency = latency
+        self.settings = settings
+        self.rng = random.Random(f"{seed}:latency")
+        self.hedge_rng = random.Random(f"{seed}:hedge")
+        self.requests = 0
+        self.hedges = 0
+
+    async def __call__(self, context) -> Any:
+        action = context['action_type']
+        decision = heuristic_decision(context) # Chosen now, so every setting makes the same choices
+        seconds = self.latency.sample(action, self.rng)
+        self.requests += 1
+        if self.settings.hedge_quantile is not None:
+            hedge_after = self.latency.quantile(action, self.settings.hedge_quantile)
+            if seconds > hedge_after:
+                self.hedges += 1
+                self.requests += 1
+                seconds = min(seconds, hedge_after + self.latency.sample(action, self.hedge_rng))
+        await asyncio.sleep(seconds)
+        return decision
+
+
+def simulate_game(seed: int, num_players: int, latency: LatencyModel, settings: SchedulingSettings,
+                  executor: str = "native") -> Dict[str, Any]:
+    """Plays one all-AI game on a virtual clock; returns its simulated seconds, per phase and in total."""
+    random.seed(seed)
+    seed_heuristic_policy(seed)
+    provider = _SimulatedProvider(latency, settings, seed)
+    register_ai_backend(SIMULATED_BACKEND, provider)
+    player_ids = [f"P{i:02d}" for i in range(num_players)]
+    previous_concurrency = decision_handler.DECISION_CONCURRENCY
+    configure_decision_concurrency(settings.decision_concurrency)
+    loop = VirtualClockLoop()
+    phases: Dict[str, float] = {}
+    state, last = None, 0.0
+    try:
+        with redirect_stdout(io.StringIO()): # Routing functions print() their decisions
+            state = initialize_game({"player_ids": player_ids, "human_player_id": None})
+            set_player_backends({p: SIMULATED_BACKEND for p in player_ids})
+            with llm_session(loop=loop):
+                for step_output in get_executor(executor).stream(state, {"recursion_limit": 20 * num_players + 100},
+                                                                 stream_mode="updates"):
+                    node_name, update = next(iter(step_output.items()))
+                    phase = NODE_PHASES.get(node_name, node_name)
+                    phases[phase] = phases.get(phase, 0.0) + loop.time() - last
+                    last = loop.time()
+                    if update: state = apply_state_update(state, update)
+    finally:
+        set_player_backends({})
+        configure_decision_concurrency(previous_concurrency)
+    return {"seed": seed, "winner": state.get('winner'), "rounds": state.get('round_number', 0), "seconds": last,
+            "phases": phases, "requests": provider.requests, "hedges": provider.hedges}
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))] if ordered else 0.0
+
+
+def simulate(settings: Sequence[SchedulingSettings], seeds: Sequence[int], num_players: int,
+             latency: LatencyModel, executor: str = "native") -> List[Dict[str, Any]]:
+    """Plays every seed under every setting; one summary per setting (simulated seconds per game and per phase)."""
+    summaries = []
+    for setting in settings:
+        started = time.perf_counter()
+        games = [simulate_game(seed, num_players, latency, setting, executor) for seed in seeds]
+        seconds = [g["seconds"] for g in games]
+        phase_names = sorted({phase for g in games for phase in g["phases"]})
+        requests = sum(g["requests"] for g in games)
+        summaries.append({
+            "setting": setting._asdict(), "games": len(games),
+            "mean_seconds": round(sum(seconds) / len(games), 3) if games else 0.0,
+            "p50_seconds": round(_percentile(seconds, 0.5), 3), "p95_seconds": round(_percentile(seconds, 0.95), 3),
+            "phase_mean_seconds": {phase: round(sum(g["phases"].get(phase, 0.0) for g in games) / len(games), 3)
+                                   for phase in phase_names},
+            "requests_per_game": round(requests / len(games), 2) if games else 0.0,
+            "hedged_share": round(sum(g["hedges"] for g in games) / requests, 4) if requests else 0.0,
+            "winners": {w: sum(1 for g in games if g["winner"] == w) for w in sorted({str(g["winner"]) for g in games})},
+            "wall_seconds": round(time.perf_counter() - started, 3),
+        })
+        logging.info(f"Latency simulation '{setting.name}': {len(games)} games, mean {summaries[-1]['mean_seconds']}s simulated.")
+    return summaries
@@ -3,9 +3,10 @@ import os
 import asyncio # Import asyncio
 import traceback
 # --- REMOVED httpx ---
-from typing import Optional, Dict, Any, Union
+import time
+import functools
+from typing import Optional, Dict, Any, Union, TYPE_CHECKING
 from pydantic import BaseModel
-from dotenv import load_dotenv
 import logging
 
 from rich.live import Live
@@ -17,17 +18,18 @@ except ImportError:
      from rich.console import Console
      console = Console()
 
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from pydantic_ai.providers.openai import OpenAIProvider
-from pydantic_ai.exceptions import UnexpectedModelBehavior, ModelHTTPError
-from pydantic_ai.messages import PartDeltaEvent, TextPartDelta, PartStartEvent
+from .llm_session import get_active_session, add_response_observer
+from .rate_limiter import get_request_governor, observe_http_response
+from .circuit_breaker import get_circuit_breaker
+from .tracing import span
+from .game_trace import note_llm_call, note_llm_tokens
+from .settings import get_primary_api_key, validate_llm_config, load_environment
 
-# ... (load_dotenv, api key check, model name, system prompt, base url) ...
-load_dotenv()
-openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
-if not openrouter_api_key:
-     raise EnvironmentError("ERROR: Missing environment variable: OPENROUTER_API_KEY.")
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+
+# pydantic-ai, its OpenAI provider and the openai SDK are imported on the first LLM call,
+# not here: they dominate import time and scripted/benchmark runs never need them.
 
 OPENROUTER_MODEL_NAME = "deepseek/deepseek-chat-v3-0324:free"
 DEFAULT_MODEL_PARAMS = {"temperature": 0.7}
@@ -35,24 +37,67 @@ DEFAULT_SYSTEM_PROMPT = "You are an AI player in a social deduction game."
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 # --- Define timeout constant ---
 LLM_CALL_TIMEOUT_SECONDS = 60.0
+# --- Rate-limit handling ---
+RATE_LIMIT_MAX_RETRIES = 3 # 429s retried through the request governor before giving up
+# --- Fallback model chain (each route has its own circuit breaker) ---
+# Override with a comma separated list in OPENROUTER_FALLBACK_MODELS (read on first use, .env included).
+FALLBACK_MODELS_ENV_VAR = "OPENROUTER_FALLBACK_MODELS"
+DEFAULT_FALLBACK_MODELS = "mistralai/mistral-7b-instruct:free,google/gemma-3-27b-it:free"
+LLM_TOTAL_DEADLINE_SECONDS = 75.0 # Upper bound for one decision across every route tried
 # -----------------------------
 
-_plain_text_agent: Optional[Agent] = None
+add_response_observer(observe_http_response) # Reads Retry-After off 429 responses
+
+_plain_text_agents: Dict[tuple, "Agent"] = {} # Used only outside an LLM session
+_response_cache = None # Optional cache with key(*parts) / get(key) / put(key, response, model); see set_response_cache
+_fault_injector = None # Optional chaos layer with wrap(call, model_name, system_prompt, user_prompt); see set_fault_injector
+
+
+def set_response_cache(cache) -> None:
+    """
+    Answers repeated identical requests from `cache` (e.g. tournament_store.ResponseCache, shared by
+    worker processes) instead of calling the model again. None turns caching off.
+    """
+    global _response_cache
+    _response_cache = cache
+
+def set_fault_injector(injector) -> None:
+    """
+    Routes every model call through `injector` (e.g. fault_injection.FaultInjector), which may replace
+    it with a timeout, an HTTP error or a corrupted answer, to exercise the recovery path. None turns it off.
+    """
+    global _fault_injector
+    _fault_injector = injector
 
-def _get_plain_text_agent() -> Optional[Agent]:
+def _get_plain_text_agent(api_key: Optional[str] = None, model_name: str = OPENROUTER_MODEL_NAME) -> Optional["Agent"]:
     """
-    Creates agent using simple provider config.
+    Creates agent using simple provider config, one per API key in the pool.
+    Inside an active LLM session the agent is built on the session's pooled
+    HTTP client and cached on the session, so it lives exactly as long as the pool.
+    The OpenAI client's own retries are disabled: 429s are handled by the request governor.
     """
-    global _plain_text_agent
-    if _plain_text_agent: return _plain_text_agent
-    if openrouter_api_key: logging.info("Found OPENROUTER_API_KEY env var.")
+    api_key = api_key or get_primary_api_key()
+    cache_key = ('plain_text_agent', model_name, api_key)
+    session = get_active_session()
+    in_session = session is not None and not session.closed
+    agent_cache = session.cache if in_session else _plain_text_agents
+    if cache_key in agent_cache: return agent_cache[cache_key]
+    if api_key: logging.info("Found OpenRouter API key for agent config.")
     else: logging.error("OPENROUTER_API_KEY missing during agent config!"); return None
-    logging.info(f"Configuring agent: {OPENROUTER_MODEL_NAME} via OpenRouter")
+    logging.info(f"Configuring agent: {model_name} via OpenRouter (pooled client: {in_session})")
     try:
-        provider = OpenAIProvider(api_key=openrouter_api_key, base_url=OPENROUTER_BASE_URL)
-        model = OpenAIModel(OPENROUTER_MODEL_NAME, provider=provider)
+        from openai import AsyncOpenAI
+        from pydantic_ai import Agent
+        from pydantic_ai.models.openai import OpenAIModel
+        from pydantic_ai.providers.openai import OpenAIProvider
+        openai_client = AsyncOpenAI(
+            base_url=OPENROUTER_BASE_URL, api_key=api_key, max_retries=0,
+            http_client=session.client if in_session else None,
+        )
+        provider = OpenAIProvider(openai_client=openai_client)
+        model = OpenAIModel(model_name, provider=provider)
         agent = Agent(model=model, system_prompt=DEFAULT_SYSTEM_PROMPT)
-        _plain_text_agent = agent
+        agent_cache[cache_key] = agent
         logging.info("Agent configured successfully.")
         return agent
     except Exception as e:
@@ -61,8 +106,15 @@ def _get_plain_text_agent() -> Optional[Agent]:
         return None
 
 # --- MODIFIED get_llm_response_string with asyncio.wait_for ---
-async def _actual_llm_call(agent_instance, user_prompt, enable_streaming, player_id):
-    """Helper async function containing the core LLM interaction."""
+async def _actual_llm_call(agent_instance, user_prompt, enable_streaming, player_id, system_prompt=None):
+    """
+    Helper async function containing the core LLM interaction.
+    `system_prompt` (the role prompt) replaces the agent's generic one: pydantic-ai only adds the
+    agent's own system prompt when no message history is given.
+    """
+    from pydantic_ai import Agent
+    from pydantic_ai.messages import PartDeltaEvent, TextPartDelta, PartStartEvent, ModelRequest, SystemPromptPart
+    message_history = [ModelRequest(parts=[SystemPromptPart(content=system_prompt)])] if system_prompt else None
     ai_response_str = ""
     color = "cyan"
     # This inner function contains the original logic for streaming/non-streaming
@@ -72,6 +124,7 @@ async def _actual_llm_call(agent_instance, user_prompt, enable_streaming, player
             with Live(live_display_content, console=console, auto_refresh=False, vertical_overflow="visible", transient=True) as live:
                 async with agent_instance.iter(
                     user_prompt,
+                    message_history=message_history,
                     model_settings=DEFAULT_MODEL_PARAMS
                     ) as run:
                     async for node in run:
@@ -87,6 +140,8 @@ async def _actual_llm_call(agent_instance, user_prompt, enable_streaming, player
                                     if delta_content:
                                         ai_response_str += delta_content
                                         live.update(f"[{color}]{player_id}: {escape(ai_response_str)}[/{color}]", refresh=True)
+                    usage = run.usage()
+                    note_llm_tokens(usage.request_tokens, usage.response_tokens)
         except Exception as live_err: # Catch Rich Live errors specifically
             logging.error(f"Error with Rich Live display for {player_id}: {live_err}", exc_info=True)
             console.print(f"[bold red]Error setting up Rich Live display: {live_err}[/bold red]")
@@ -94,6 +149,7 @@ async def _actual_llm_call(agent_instance, user_prompt, enable_streaming, player
     else: # Non-Streaming
          async with agent_instance.iter(
              user_prompt,
+             message_history=message_history,
              model_settings=DEFAULT_MODEL_PARAMS
              ) as run:
             async for node in run:
@@ -106,61 +162,165 @@ async def _actual_llm_call(agent_instance, user_prompt, enable_streaming, player
                             elif isinstance(event, PartStartEvent) and hasattr(event.part, 'content') and isinstance(event.part.content, str):
                                  if event.index == 0 and not ai_response_str:
                                       ai_response_str = event.part.content
+            usage = run.usage()
+            note_llm_tokens(usage.request_tokens, usage.response_tokens)
     return ai_response_str.strip()
 
 
+@functools.lru_cache(maxsize=8)
+def _model_routes(primary_model: str = OPENROUTER_MODEL_NAME) -> tuple[str, ...]:
+    load_environment()
+    fallbacks = [m.strip() for m in os.getenv(FALLBACK_MODELS_ENV_VAR, DEFAULT_FALLBACK_MODELS).split(",") if m.strip()]
+    return tuple(dict.fromkeys([primary_model] + fallbacks))
+
+
+def get_model_routes(primary_model: Optional[str] = None) -> list[str]:
+    """Primary model (default OPENROUTER_MODEL_NAME) first, then the configured fallbacks (deduplicated, order kept)."""
+    return list(_model_routes(primary_model or OPENROUTER_MODEL_NAME))
+
+
+def llm_routes_available(primary_model: Optional[str] = None) -> bool:
+    """False when every route's breaker is open, i.e. callers should use the local policy."""
+    return any(get_circuit_breaker(route).is_available() for route in get_model_routes(primary_model))
+
+
 async def get_llm_response_string(
-    system_prompt: str, # Keep for logging/context clarity maybe, though agent uses its own
+    system_prompt: str, # Role prompt, sent as the system message (the agent's generic one is the fallback)
     user_prompt: str,
     player_id: str,
-    enable_streaming: bool = False
+    enable_streaming: bool = False,
+    primary_model: Optional[str] = None,
 ) -> Optional[str]:
     """
-    Runs the plain text agent, using asyncio.wait_for for timeout control.
+    Tries each model route in the fallback chain, skipping routes whose circuit
+    breaker is open, within an overall deadline so latency stays bounded during
+    partial outages. Returns None only if every attempted route failed.
+    `primary_model` replaces the default first route (e.g. for a tournament policy).
     """
-    agent_instance = _get_plain_text_agent()
-    if not agent_instance:
-        logging.error(f"Cannot get LLM response for {player_id}: Agent instance not configured.")
-        return None
+    routes = get_model_routes(primary_model)
+    cache, cache_key = _response_cache, None
+    if cache is not None:
+        cache_key = cache.key(routes, DEFAULT_MODEL_PARAMS, system_prompt, user_prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"LLM response for {player_id} served from cache.")
+            note_llm_call(cached=True, model=routes[0]) # The cache does not keep which route answered
+            return cached
+
+    validate_llm_config() # First real need for an API key; raises EnvironmentError if none is set
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_TOTAL_DEADLINE_SECONDS
+
+    for model_name in routes:
+        if deadline - loop.time() <= 0: # Checked first: allow_request() may claim the half-open probe slot
+            logging.warning(f"LLM deadline of {LLM_TOTAL_DEADLINE_SECONDS}s exhausted for {player_id}; not trying {model_name}.")
+            break
+        breaker = get_circuit_breaker(model_name)
+        if not breaker.allow_request():
+            logging.info(f"Skipping route {model_name} for {player_id}: circuit {breaker.state}.")
+            continue
+        started = time.perf_counter()
+        try:
+            with span("llm_request", "llm", player_id=player_id, model=model_name):
+                final_string, failure_kind = await _call_model_route(
+                    model_name, user_prompt, player_id, enable_streaming, deadline=deadline, system_prompt=system_prompt
+                )
+        except asyncio.CancelledError:
+            breaker.release_probe() # Cancelled before an outcome: the route was not judged
+            raise
+        note_llm_call(time.perf_counter() - started, model=model_name if failure_kind is None else None)
+        if failure_kind is None:
+            breaker.record_success()
+            if cache_key is not None and final_string: cache.put(cache_key, final_string, model_name)
+            return final_string
+        if failure_kind == 'deadline': # Budget spent waiting for a request slot; no route has time left
+            breaker.release_probe()
+            logging.warning(f"LLM deadline of {LLM_TOTAL_DEADLINE_SECONDS}s exhausted for {player_id} on {model_name}.")
+            break
+        breaker.record_failure(failure_kind)
+        if model_name != routes[-1]:
+            logging.warning(f"Route {model_name} failed ({failure_kind}) for {player_id}; failing over to next model.")
+
+    return None
+
+
+async def _call_model_route(
+    model_name: str,
+    user_prompt: str,
+    player_id: str,
+    enable_streaming: bool,
+    deadline: float,
+    system_prompt: Optional[str] = None,
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    Runs the plain text agent for one model, using asyncio.wait_for for timeout control.
+    Each attempt first takes a slot (and an API key) from the shared request governor;
+    a 429 parks that key per Retry-After and the call is retried instead of forfeiting the turn.
+    Waiting for a slot and every attempt count against `deadline` (loop time); each attempt gets
+    at most LLM_CALL_TIMEOUT_SECONDS of what is left.
+    Returns (response, failure_kind); failure_kind is None on success, 'deadline' once the budget is spent.
+    """
+    from pydantic_ai.exceptions import UnexpectedModelBehavior, ModelHTTPError
+    primary_api_key = get_primary_api_key()
+    governor = get_request_governor(fallback_api_key=primary_api_key)
 
-    logging.info(f"--- Calling Agent ({OPENROUTER_MODEL_NAME} via OR) for {player_id} (Streaming: {enable_streaming}) ---")
+    logging.info(f"--- Calling Agent ({model_name} via OR) for {player_id} (Streaming: {enable_streaming}) ---")
     logging.debug(f"User Prompt (start): {user_prompt[:300]}...")
 
+    loop = asyncio.get_running_loop()
     final_string: Optional[str] = None
-    try:
-        # --- Use asyncio.wait_for to wrap the actual call ---
-        final_string = await asyncio.wait_for(
-            _actual_llm_call(agent_instance, user_prompt, enable_streaming, player_id),
-            timeout=LLM_CALL_TIMEOUT_SECONDS
-        )
-        # ----------------------------------------------------
-        logging.info(f"--- Agent call completed for {player_id}. ---")
-        if logging.getLogger().isEnabledFor(logging.DEBUG):
-             logging.debug(f"LLM String Result (Final): '{final_string}'")
-        else:
-             logging.info(f"LLM String Result (Final): '{final_string[:70]}...'")
-        if not final_string: # Check if empty after successful call
-             logging.warning(f"LLM returned an empty string for {player_id} after processing.")
-             console.print(f"[yellow]Warning: AI ({player_id}) returned an empty response.[/yellow]")
-
-    # --- Catch specific TimeoutError from asyncio.wait_for ---
-    except TimeoutError: # Note: This is asyncio.TimeoutError in newer Python, just TimeoutError often works
-        logging.error(f"LLM call TIMED OUT for {player_id} after {LLM_CALL_TIMEOUT_SECONDS}s (asyncio.wait_for).")
-        console.print(f"[bold red]Error: AI ({player_id}) call timed out.[/bold red]")
-        return None # Signal failure
-    # ------------------------------------------------------
-    except ModelHTTPError as http_err: # Catch API errors from pydantic-ai
-        logging.error(f"API Error during agent call for {player_id}: {http_err}", exc_info=True)
-        console.print(f"[bold red]API Error during AI call for {player_id}: {http_err}. See logs.[/bold red]")
-        return None
-    except UnexpectedModelBehavior as e: # Catch pydantic-ai specific errors
-         logging.error(f"ERROR (UnexpectedModelBehavior) during Agent interaction for {player_id}: {e}", exc_info=False)
-         console.print(f"[bold red]LLM Error ({player_id}): {e}[/bold red]")
-         return None
-    except Exception as e: # Catch any other errors during the call or processing
-        error_message = f"ERROR during Agent interaction or processing for {player_id}: {e.__class__.__name__}: {e}"
-        logging.error(error_message, exc_info=True)
-        console.print(f"[bold red]Agent Interaction Error ({player_id}): {e}. See logs.[/bold red]")
-        return None
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        if deadline - loop.time() <= 0: return None, 'deadline'
+        try:
+            api_key = await asyncio.wait_for(governor.acquire(), deadline - loop.time()) if governor else primary_api_key
+        except TimeoutError:
+            logging.warning(f"No request slot for {player_id} on {model_name} before the LLM deadline.")
+            return None, 'deadline'
+        timeout = min(LLM_CALL_TIMEOUT_SECONDS, deadline - loop.time())
+        if timeout <= 0: return None, 'deadline'
+        agent_instance = _get_plain_text_agent(api_key, model_name)
+        if not agent_instance:
+            logging.error(f"Cannot get LLM response for {player_id}: Agent instance not configured.")
+            return None, 'config'
+        try:
+            # --- Use asyncio.wait_for to wrap the actual call ---
+            call = _actual_llm_call(agent_instance, user_prompt, enable_streaming, player_id, system_prompt)
+            if _fault_injector is not None: call = _fault_injector.wrap(call, model_name, system_prompt, user_prompt)
+            final_string = await asyncio.wait_for(call, timeout=timeout)
+            # ----------------------------------------------------
+            logging.info(f"--- Agent call completed for {player_id}. ---")
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                 logging.debug(f"LLM String Result (Final): '{final_string}'")
+            else:
+                 logging.info(f"LLM String Result (Final): '{final_string[:70]}...'")
+            if not final_string: # Check if empty after successful call
+                 logging.warning(f"LLM returned an empty string for {player_id} after processing.")
+                 console.print(f"[yellow]Warning: AI ({player_id}) returned an empty response.[/yellow]")
+            return final_string, None
+
+        # --- Catch specific TimeoutError from asyncio.wait_for ---
+        except TimeoutError: # Note: This is asyncio.TimeoutError in newer Python, just TimeoutError often works
+            logging.error(f"LLM call TIMED OUT for {player_id} on {model_name} after {timeout:.0f}s (asyncio.wait_for).")
+            console.print(f"[bold red]Error: AI ({player_id}) call timed out.[/bold red]")
+            return None, 'timeout'
+        # ------------------------------------------------------
+        except ModelHTTPError as http_err: # Catch API errors from pydantic-ai
+            if http_err.status_code == 429 and governor and attempt < RATE_LIMIT_MAX_RETRIES:
+                blocked_for = governor.note_rate_limit_error(api_key)
+                logging.warning(f"Rate limited (429) for {player_id}; retry {attempt + 1}/{RATE_LIMIT_MAX_RETRIES} "
+                                f"after ~{blocked_for:.1f}s via request governor.")
+                continue
+            logging.error(f"API Error during agent call for {player_id}: {http_err}", exc_info=True)
+            console.print(f"[bold red]API Error during AI call for {player_id}: {http_err}. See logs.[/bold red]")
+            return None, f'http_{http_err.status_code}'
+        except UnexpectedModelBehavior as e: # Catch pydantic-ai specific errors
+             logging.error(f"ERROR (UnexpectedModelBehavior) during Agent interaction for {player_id}: {e}", exc_info=False)
+             console.print(f"[bold red]LLM Error ({player_id}): {e}[/bold red]")
+             return None, 'model_behavior'
+        except Exception as e: # Catch any other errors during the call or processing
+            error_message = f"ERROR during Agent interaction or processing for {player_id}: {e.__class__.__name__}: {e}"
+            logging.error(error_message, exc_info=True)
+            console.print(f"[bold red]Agent Interaction Error ({player_id}): {e}. See logs.[/bold red]")
+            return None, 'error'
 
-    return final_string # Return the result if successful
\ No newline at end of file
+    return None, 'rate_limited' # Retries exhausted
@@ -0,0 +1,252 @@
+# src/llm_session.py
+"""
+Managed, pooled HTTP session for all LLM traffic.
+
+Nodes used to drive every decision through a fresh `asyncio.run`, so the HTTP
+client underneath pydantic-ai was rebuilt per call and no connection was ever
+reused between turns. An `LLMSession` owns one long-lived event loop and one
+pooled `httpx.AsyncClient` (keep-alive, HTTP/2 when `h2` is installed, explicit
+proxy) for the lifetime of a game. Nodes submit their coroutines through
+`run_async`, so every request made during the game shares the same pool.
+The client (and httpx itself) is only created when the first request needs it.
+"""
+import os
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Coroutine, Iterator, List, Callable, TYPE_CHECKING
+
+from .settings import load_environment
+
+if TYPE_CHECKING:
+    import httpx
+    from .http_transport import MeteredTransport
+
+# --- Pool Tuning Constants ---
+HTTP_MAX_CONNECTIONS = 20
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+HTTP_KEEPALIVE_EXPIRY_SECONDS = 30.0
+HTTP_CONNECT_TIMEOUT_SECONDS = 10.0
+HTTP_READ_TIMEOUT_SECONDS = 60.0 # Matches LLM_CALL_TIMEOUT_SECONDS in llm_interface
+# Explicit proxy for LLM traffic. Falls back to HTTPS_PROXY/HTTP_PROXY if unset.
+# (See documentation/lessons.md section 4: env vars were not reliably picked up.)
+LLM_PROXY_ENV_VAR = "LLM_PROXY_URL"
+# -----------------------------
+
+_thread_state = threading.local()
+_response_observers: List[Callable[["httpx.Request", "httpx.Response"], None]] = []
+
+
+def add_response_observer(observer: Callable[["httpx.Request", "httpx.Response"], None]) -> None:
+    """Registers a callback run on every response (e.g. to read rate-limit headers)."""
+    if observer not in _response_observers:
+        _response_observers.append(observer)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _resolve_proxy() -> Optional[str]:
+    return (os.getenv(LLM_PROXY_ENV_VAR)
+            or os.getenv("HTTPS_PROXY") or os.getenv("https_proxy")
+            or os.getenv("HTTP_PROXY") or os.getenv("http_proxy")
+            or None)
+
+
+# --- Session ---
+
+class LLMSession:
+    """
+    One event loop plus one pooled AsyncClient, shared by every LLM call in a game.
+    Use via the `llm_session()` context manager so the pool is closed at game end.
+    """
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        proxy: Optional[str] = None,
+        http2: Optional[bool] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None, # e.g. latency_sim.VirtualClockLoop; closed with the session
+    ):
+        self.loop = loop or asyncio.new_event_loop()
+        load_environment() # .env may set LLM_PROXY_URL
+        self.proxy = (proxy if proxy is not None else _resolve_proxy()) or None # "" forces a direct connection
+        self.http2 = _http2_available() if http2 is None else http2
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.transport: Optional["MeteredTransport"] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        self.cache: Dict[Any, Any] = {} # Per-session objects built on this client (e.g. agents)
+        self.started_at = time.monotonic()
+        self.closed = False
+        logging.info(f"LLM session opened (max_connections={max_connections}, keepalive={max_keepalive_connections}, "
+                     f"http2={self.http2}, proxy={'set' if self.proxy else 'none'}).")
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The pooled client, built on first access (games without LLM calls never import httpx)."""
+        if self._client is None:
+            import httpx
+            from .http_transport import MeteredTransport
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            )
+            self.transport = MeteredTransport(
+                max_connections=self.max_connections, observers=_response_observers,
+                limits=limits, http2=self.http2, proxy=self.proxy, retries=0,
+            )
+            # trust_env=False: the proxy is resolved explicitly above, so the client
+            # must not silently pick up a different one from the environment.
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                timeout=httpx.Timeout(HTTP_READ_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+                trust_env=False,
+            )
+        return self._client
+
+    def run(self, coro: Coroutine) -> Any:
+        """Runs a coroutine to completion on the session loop."""
+        return self.loop.run_until_complete(coro)
+
+    def metrics(self) -> Dict[str, Any]:
+        t = self.transport
+        return {
+            "requests_total": t.requests_total if t else 0,
+            "in_flight": t.in_flight if t else 0,
+            "peak_in_flight": t.peak_in_flight if t else 0,
+            "max_connections": self.max_connections,
+            "saturated_requests": t.saturated_requests if t else 0,
+            "peak_utilization": (t.peak_in_flight / self.max_connections) if t and self.max_connections else 0.0,
+            "open_connections": t.open_connections() if t else 0,
+            "http2": self.http2,
+        }
+
+    def close(self) -> None:
+        if self.closed: return
+        self.closed = True
+        try:
+            if self._client is not None:
+                self.loop.run_until_complete(self._client.aclose())
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        except Exception as e:
+            logging.warning(f"Error while closing LLM session: {e}")
+        finally:
+            self.loop.close()
+        logging.info(f"LLM session closed. Pool metrics: {self.metrics()}")
+
+
+def get_active_session() -> Optional[LLMSession]:
+    """Returns the session bound to the current thread, if any."""
+    return getattr(_thread_state, 'session', None)
+
+
+@contextmanager
+def llm_session(**session_kwargs) -> Iterator[LLMSession]:
+    """Opens a session for the current thread (one game) and closes its pool on exit."""
+    previous = get_active_session()
+    session = LLMSession(**session_kwargs)
+    _thread_state.session = session
+    try:
+        yield session
+    finally:
+        _thread_state.session = previous
+        session.close()
+
+
+def run_async(coro: Coroutine) -> Any:
+    """
+    Drop-in replacement for `asyncio.run` inside sync graph nodes.
+    Uses the active session's loop so pooled connections survive between turns.
+    """
+    session = get_active_session()
+    if session is None or session.closed:
+        return asyncio.run(coro)
+    return session.run(coro)
+
+
+def loop_time() -> float:
+    """
+    The running event loop's clock: time.monotonic() on a normal loop, virtual in a latency
+    simulation (see latency_sim.VirtualClockLoop). time.monotonic() outside a loop.
+    """
+    try:
+        return asyncio.get_running_loop().time()
+    except RuntimeError:
+        return time.monotonic()
+
+
+# --- Verification Against a Local Stub Server ---
+
+def check_against_stub_server(num_requests: int = 20, concurrency: int = 5) -> Dict[str, Any]:
+    """
+    Fires requests through a fresh session at a local HTTP/1.1 stub server and
+    reports how many TCP connections the server actually saw. With keep-alive
+    working, connections_seen stays well below num_requests.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    client_ports = set()
+    ports_lock = threading.Lock()
+
+    class _StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Required for keep-alive
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            self.rfile.read(length)
+            with ports_lock:
+                client_ports.add(self.client_address[1])
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass # Keep the stub quiet
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+    try:
+        with llm_session(max_connections=concurrency, max_keepalive_connections=concurrency, proxy="", http2=False) as session:
+            async def _fire_all():
+                semaphore = asyncio.Semaphore(concurrency)
+                async def _one():
+                    async with semaphore:
+                        response = await session.client.post(url, json={"ping": 1})
+                        response.raise_for_status()
+                await asyncio.gather(*[_one() for _ in range(num_requests)])
+
+            started = time.perf_counter()
+            # Two batches via run_async, mimicking two separate turns in a game.
+            run_async(_fire_all())
+            run_async(_fire_all())
+            elapsed = time.perf_counter() - started
+            metrics = session.metrics()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "requests_sent": num_requests * 2,
+        "connections_seen": len(client_ports),
+        "elapsed_seconds": round(elapsed, 4),
+        "pool": metrics,
+    }
+
+
+if __name__ == "__main__":
+    print(check_against_stub_server())
@@ -0,0 +1,137 @@
+# src/log_index.py
+"""
+Inverted index over the public log, for relevance-ranked retrieval.
+
+Prompts always show the last few log lines, whether or not they concern the
+deciding player. The index maps each player to the log positions where they
+were accused, addressed, mentioned, voted against or spoke, and each speech
+intent and round to its positions. Posting lists are appended in log order, so
+they stay sorted; a query weights a handful of posting lists for the deciding
+player (and, for an Investigator, the players they investigated), takes at
+most `k` positions from the end of each list below the cutoff by bisection,
+and keeps the best `k` by weight and recency. The cost is
+O(lists * (log n + k log k)) for a log of n entries, never a scan of the log.
+The index is shared by all players of a game and folded incrementally, like
+the suspicion matrix.
+"""
+import re
+import heapq
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple, Iterable
+
+from .game_log import IncrementalLogReader, LogEvent, SUSPICION_INTENTS, log_readers
+
+RELEVANT_EVENT_COUNT = 4 # k: most relevant earlier events per prompt
+RELEVANT_TOKEN_BUDGET = 120 # Approximate tokens for the rendered block
+
+# Posting-list weights for the deciding player, and for players they investigated
+PLAYER_WEIGHTS = {'accused': 5.0, 'addressed': 3.0, 'mentioned': 2.0, 'voted_against': 1.0}
+INVESTIGATED_WEIGHTS = {'accused': 2.0, 'spoke': 1.5, 'mentioned': 1.5}
+
+_WORD_RE = re.compile(r"\w+")
+_INVESTIGATED_RE = re.compile(r"Player (\S+) is associated with")
+
+IndexKey = Tuple[str, str] # (relation, player id or intent)
+
+
+class LogIndex(IncrementalLogReader):
+    """Posting lists of public log positions by player relation, intent and round."""
+    def __init__(self, player_ids: Sequence[str]):
+        self.player_ids: Tuple[str, ...] = tuple(player_ids)
+        self._players = frozenset(self.player_ids)
+        super().__init__()
+
+    def _reset_summary(self) -> None:
+        self.postings: Dict[IndexKey, List[int]] = {}
+        self.entry_rounds = array('H') # Round of each folded entry, by log position
+        self.round_starts: Dict[int, int] = {} # Round -> first log position folded in it
+
+    # --- Folding ---
+    def _fold_event(self, event: LogEvent) -> None:
+        position = len(self.entry_rounds)
+        self.entry_rounds.append(min(self.round_number, 0xFFFF))
+        self.round_starts.setdefault(self.round_number, position)
+        keys = set()
+        if event.kind == 'speech':
+            keys.add(('spoke', event.actor))
+            if event.intent: keys.add(('intent', event.intent))
+            if event.target and event.target != event.actor:
+                keys.add(('accused' if event.intent in SUSPICION_INTENTS else 'addressed', event.target))
+            for word in _WORD_RE.findall(event.text):
+                if word in self._players and word != event.actor: keys.add(('mentioned', word))
+        elif event.kind == 'vote_reveal':
+            keys.add(('voted_against', event.target))
+        for key in keys:
+            self.postings.setdefault(key, []).append(position)
+
+    # --- Queries ---
+    def positions(self, key: IndexKey) -> Sequence[int]:
+        """All log positions for `key`, oldest first."""
+        return self.postings.get(key, ())
+
+    def round_span(self, round_number: int) -> range:
+        """Log positions folded during `round_number` (empty if none)."""
+        start = self.round_starts.get(round_number)
+        if start is None: return range(0)
+        later = [p for r, p in self.round_starts.items() if r > round_number]
+        return range(start, min(later) if later else len(self.entry_rounds))
+
+    def top_k(self, weights: Dict[IndexKey, float], k: int, before: int, current_round: int) -> List[int]:
+        """
+        The `k` most relevant positions below `before`, oldest first. An entry's score is the sum of
+        the weights of the lists it appears in, discounted by how many rounds ago it happened.
+        """
+        if k <= 0 or before <= 0: return []
+        scores: Dict[int, float] = {}
+        for key, weight in weights.items():
+            postings = self.postings.get(key)
+            if not postings: continue
+            cut = bisect_left(postings, before)
+            for position in postings[max(0, cut - k):cut]:
+                scores[position] = scores.get(position, 0.0) + weight
+        rounds = self.entry_rounds
+        best = heapq.nlargest(k, scores.items(),
+                              key=lambda kv: (kv[1] / (1 + max(0, current_round - rounds[kv[0]])), kv[0]))
+        return sorted(position for position, _ in best)
+
+
+def investigation_targets(private_notes: Iterable[str]) -> List[str]:
+    """Player IDs named in an Investigator's private results."""
+    targets = []
+    for note in private_notes:
+        for target in _INVESTIGATED_RE.findall(note):
+            if target not in targets: targets.append(target)
+    return targets
+
+
+def relevance_weights(player_id: str, investigated: Iterable[str] = ()) -> Dict[IndexKey, float]:
+    weights: Dict[IndexKey, float] = {}
+    for relation, weight in PLAYER_WEIGHTS.items():
+        weights[(relation, player_id)] = weight
+    for target in investigated:
+        if target == player_id: continue
+        for relation, weight in INVESTIGATED_WEIGHTS.items():
+            key = (relation, target)
+            weights[key] = weights.get(key, 0.0) + weight
+    return weights
+
+
+# --- Per-Game Index ---
+
+def get_log_index(game_state) -> LogIndex:
+    """The game's index (kept in its log readers), folded up to the end of `game_state`'s public log."""
+    player_ids = tuple(p['id'] for p in game_state.get('players') or [])
+    index = log_readers(game_state).get('log_index', lambda: LogIndex(player_ids))
+    folded = index.fold(game_state.get('public_log') or [])
+    if folded: logging.debug(f"Log index: folded {folded} new entries ({index.folded_count} total, {len(index.postings)} posting lists).")
+    return index
+
+
+def relevant_log_positions(game_state, player_id: str, investigated: Iterable[str] = (), exclude_recent: int = 0,
+                           k: int = RELEVANT_EVENT_COUNT) -> List[int]:
+    """Positions of the `k` earlier log entries most relevant to `player_id`, skipping the last `exclude_recent`."""
+    index = get_log_index(game_state)
+    before = index.folded_count - exclude_recent
+    return index.top_k(relevance_weights(player_id, investigated), k, before, game_state.get('round_number') or 0)
@@ -0,0 +1,82 @@
+# src/native_executor.py
+"""
+In-process state-machine executor for the game graph.
+
+The game's graph is a single chain of nodes with routing functions at the
+branch points, so for headless runs LangGraph's per-step machinery (channel
+writes and versioning, task scheduling, recursion tracking, stream
+serialization) buys nothing. `NativeGraph` runs the same node functions and
+the same routing functions (see graph_setup's topology tables) in a plain
+loop, merging each update with the GraphState reducers.
+
+It mirrors what the compiled graph does where callers can see it:
+- `stream(..., stream_mode="updates")` yields `{node: update}`; the update is
+  None when the node changed nothing.
+- Unknown keys in an update are dropped.
+- The input passes through the reducers.
+- `recursion_limit` raises after the same number of steps LangGraph allows.
+benchmarks/executor_equivalence.py checks that both executors produce the same
+updates and final state.
+"""
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple, get_type_hints
+
+from .state import GraphState, StateUpdate, apply_state_update
+
+END = "__end__" # Same value as langgraph.graph.END (and graph_setup.END)
+DEFAULT_RECURSION_LIMIT = 25 # LangGraph's default
+
+Router = Callable[[GraphState], str]
+_STATE_KEYS = frozenset(get_type_hints(GraphState))
+
+
+class StepLimitExceeded(RuntimeError):
+    """Raised when a run reaches `recursion_limit` steps (LangGraph raises GraphRecursionError there)."""
+
+
+class NativeGraph:
+    """Runs nodes and routers in a loop; exposes the subset of the compiled graph's API the game uses."""
+    def __init__(self, nodes: Mapping[str, Callable[[GraphState], Optional[StateUpdate]]], entry_point: str,
+                 edges: Mapping[str, str], conditional_edges: Mapping[str, Tuple[Router, Mapping[str, str]]]):
+        for source in set(edges) | set(conditional_edges):
+            if source not in nodes: raise ValueError(f"Edge from unknown node '{source}'.")
+        targets = set(edges.values()) | {t for _, mapping in conditional_edges.values() for t in mapping.values()}
+        unknown = targets - set(nodes) - {END}
+        if unknown: raise ValueError(f"Edges to unknown nodes: {sorted(unknown)}")
+        self.nodes = dict(nodes)
+        self.entry_point = entry_point
+        self.edges = dict(edges)
+        self.conditional_edges = dict(conditional_edges)
+
+    def _next_node(self, node: str, state: GraphState) -> str:
+        if node in self.conditional_edges:
+            router, mapping = self.conditional_edges[node]
+            route = router(state)
+            if route not in mapping: raise ValueError(f"Router for '{node}' returned unknown route '{route}'.")
+            return mapping[route]
+        if node in self.edges: return self.edges[node]
+        raise ValueError(f"Node '{node}' has no outgoing edge.")
+
+    def stream(self, input_state: Mapping[str, Any], config: Optional[Dict[str, Any]] = None,
+               stream_mode: str = "updates") -> Iterator[Dict[str, Optional[StateUpdate]]]:
+        if stream_mode != "updates":
+            raise ValueError(f"NativeGraph only supports stream_mode='updates', not {stream_mode!r}.")
+        limit = (config or {}).get("recursion_limit", DEFAULT_RECURSION_LIMIT)
+        state: GraphState = apply_state_update({}, {k: v for k, v in input_state.items() if k in _STATE_KEYS})
+        node, steps = self.entry_point, 0
+        while node != END:
+            update = self.nodes[node](state)
+            if update: update = {k: v for k, v in update.items() if k in _STATE_KEYS}
+            yield {node: update or None}
+            if update: state = apply_state_update(state, update)
+            steps += 1
+            if steps >= limit:
+                raise StepLimitExceeded(f"Recursion limit of {limit} reached without hitting a stop condition.")
+            node = self._next_node(node, state)
+
+    def invoke(self, input_state: Mapping[str, Any], config: Optional[Dict[str, Any]] = None) -> GraphState:
+        """Runs to the end and returns the final state."""
+        state: GraphState = apply_state_update({}, {k: v for k, v in input_state.items() if k in _STATE_KEYS})
+        for step_output in self.stream(input_state, config):
+            update = next(iter(step_output.values()))
+            if update: state = apply_state_update(state, update)
+        return state
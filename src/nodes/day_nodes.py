@@ -1,5 +1,4 @@
 # src/nodes/day_nodes.py
-import asyncio
 import logging
 import json # To format log entries
 from typing import Dict, Any, Optional, Counter as TypingCounter, List, Union
@@ -7,10 +6,12 @@ from collections import Counter, deque
 
 # Import state types and validation
 from pydantic import ValidationError
-from src.state import GraphState, PlayerState, ActionContext
+from src.state import GraphState, PlayerState, ActionContext, StateUpdate
 
 # Import decision handling and utilities
-from src.decision_handler import get_decision
+from src.decision_handler import get_decision, gather_decisions
+from src.llm_session import run_async # Reuses the game's pooled loop instead of asyncio.run
+from src.game_log import as_log_view, state_snapshot # Shared, append-only public log
 
 # --- ADDED Imports ---
 from src.narrator_utils import (
@@ -18,6 +19,7 @@ from src.narrator_utils import (
     narrate_vote_results, narrate_execution, narrate_no_execution
 )
 from src.gm_utils import handle_agent_decision_failure # Import the modified handler
+from src.day_digest import summarize_discussion, summarize_votes # One shared digest per day
 from src.ai_schemas import SpeechOutput
 
 try:
@@ -29,7 +31,7 @@ except ImportError:
 # --- Day Phase Nodes ---
 
 # start_day_announce remains the same...
-def start_day_announce(state: GraphState) -> GraphState:
+def start_day_announce(state: GraphState) -> StateUpdate:
     # ... (Implementation is correct and synchronous) ...
     console.print("\n[dim blue]--- Entering Day Announcement Phase ---[/dim blue]")
 
@@ -39,6 +41,7 @@ def start_day_announce(state: GraphState) -> GraphState:
     player_killed_id = None
     round_num = state.get('round_number', '?')
     alive_player_ids = list(state.get('alive_players', [])) # Copy to modify
+    updates: StateUpdate = {}
 
     # --- Process Kill Logic ---
     if target_id:
@@ -76,19 +79,17 @@ def start_day_announce(state: GraphState) -> GraphState:
              if not updated_players_list: # If loop didn't run or failed entirely
                  updated_players_list = list(current_players) # Revert to original
 
-        state["players"] = updated_players_list
-        state["alive_players"] = alive_player_ids # Use the potentially modified list
+        updates["players"] = updated_players_list
+        updates["alive_players"] = alive_player_ids # Use the potentially modified list
 
     else:
-        logging.info("No night target specified in 'target_of_night_action'.")
-        state["players"] = current_players # Ensure players list is passed through
-        state["alive_players"] = alive_player_ids # Pass original list if no target
+        logging.info("No night target specified in 'target_of_night_action'.") # players/alive_players unchanged
     # ---------------------------------------------
 
     # Set 'last_victim' state field
-    state['last_victim'] = player_killed_id
-    logging.info(f"Set 'last_victim' state to: {state['last_victim']}")
-    state['target_of_night_action'] = None # Clear processed target
+    updates['last_victim'] = player_killed_id
+    logging.info(f"Set 'last_victim' state to: {player_killed_id}")
+    updates['target_of_night_action'] = None # Clear processed target
     logging.info("Cleared 'target_of_night_action' state.")
 
     # --- Generate Announcement using Narrator ---
@@ -110,25 +111,24 @@ def start_day_announce(state: GraphState) -> GraphState:
     # ------------------------
 
     # Update other state fields
-    state["current_phase"] = "Discussion" # Transition to next phase
-    if 'public_log' not in state or state['public_log'] is None: state['public_log'] = []
-    state['public_log'].append(log_entry) # Append the new log entry
+    updates["current_phase"] = "Discussion" # Transition to next phase
+    updates['public_log'] = [log_entry] # Appended by the public_log reducer
 
     logging.info("start_day_announce complete using narrator.")
-    return state
+    return updates
 
 
 # --- SYNC discussion_phase, wraps async calls ---
-def discussion_phase(state: GraphState) -> GraphState:
+def discussion_phase(state: GraphState) -> StateUpdate:
     """
     Handles the discussion phase (Sync). Players speak in turns (round-robin).
     AI players return SpeechOutput JSON. Handles failures via GM.
-    Returns the full updated state.
+    Returns only the changed keys (new log entries and the next phase).
     """
     console.print("\n[dim blue]--- Entering Discussion Phase ---[/dim blue]")
     round_num = state.get('round_number', '?')
     alive_player_ids = state.get('alive_players', [])
-    current_log_snapshot = state.get('public_log', [])
+    current_log_snapshot = as_log_view(state.get('public_log'))
     discussion_logs_this_phase = []
 
     player_objects: Dict[str, PlayerState] = {}
@@ -165,13 +165,13 @@ def discussion_phase(state: GraphState) -> GraphState:
             "action_type": 'speak', "player_id": current_player_id,
             "is_human": player.is_human, "options": None,
             "prompt_message": f"{current_player_id}, it's your turn to speak. Consider the discussion so far.",
-            "full_game_state": {**state, "public_log": current_log_snapshot + discussion_logs_this_phase},
+            "full_game_state": state_snapshot(state, current_log_snapshot + discussion_logs_this_phase),
             "player_role": player.role
         }
 
         decision_result: Union[Optional[Dict], Dict] = None # Expect dict (speech or failure)
         try:
-            decision_result = asyncio.run(get_decision(action_context)) # Wrap async call
+            decision_result = run_async(get_decision(action_context)) # Wrap async call
         except Exception as e:
             logging.error(f"Unexpected Error calling get_decision in discussion_phase for {current_player_id}: {e}", exc_info=True)
             decision_result = {
@@ -182,12 +182,11 @@ def discussion_phase(state: GraphState) -> GraphState:
         if isinstance(decision_result, dict) and 'status' in decision_result:
             logging.warning(f"Decision failure detected for {current_player_id} (speak). Handing off to GM.")
             try:
-                # Wrap async GM handler call
-                gm_result = asyncio.run(handle_agent_decision_failure(
+                gm_result = handle_agent_decision_failure(
                     {**state, "public_log": current_log_snapshot + discussion_logs_this_phase},
                     current_player_id,
                     decision_result
-                ))
+                )
                 # Process GM result dictionary
                 discussion_logs_this_phase.extend(gm_result.get("logs_added", []))
                 # No specific state recovery needed for failed 'speak' beyond GM narration/logs
@@ -224,11 +223,11 @@ def discussion_phase(state: GraphState) -> GraphState:
                      'error': str(e)
                  }
                  try:
-                     gm_result = asyncio.run(handle_agent_decision_failure(
+                     gm_result = handle_agent_decision_failure(
                          {**state, "public_log": current_log_snapshot + discussion_logs_this_phase},
                          current_player_id,
                          failure_dict
-                     ))
+                     )
                      discussion_logs_this_phase.extend(gm_result.get("logs_added", []))
                  except Exception as ge:
                     logging.error(f"Error calling/processing GM handler after validation error: {ge}", exc_info=True)
@@ -254,22 +253,23 @@ def discussion_phase(state: GraphState) -> GraphState:
     discussion_logs_this_phase.append(log_entry_end)
     console.print(f"[italic grey50]{log_entry_end.replace('SYS: ', '')}[/italic grey50]")
 
-    state["public_log"] = current_log_snapshot + discussion_logs_this_phase
-    state["current_phase"] = "Voting"
+    # --- Day Digest (computed once, shared by every player's next prompt) ---
+    day_digest = summarize_discussion(discussion_logs_this_phase)
 
     logging.info(f"discussion_phase complete. {turns_taken_this_phase} turns taken.")
-    return state
+    return {"public_log": discussion_logs_this_phase, "current_phase": "Voting",
+            "day_digests": {str(round_num): day_digest}}
 
 
 # --- SYNC voting_phase, wraps async calls ---
-def voting_phase(state: GraphState) -> GraphState:
+def voting_phase(state: GraphState) -> StateUpdate:
     """
     Each alive player attempts to vote (Sync), GM handles failures potentially with
-    interactive clarification. Returns the full updated state.
+    interactive clarification. Returns only the changed keys.
     """
     console.print("\n[dim blue]--- Entering Voting Phase ---[/dim blue]")
     alive_player_ids = state.get('alive_players', [])
-    current_log = state.get('public_log', [])
+    current_log = as_log_view(state.get('public_log'))
     logs_added_this_node = []
     player_objects = {}
     for p_dict in state.get('players', []):
@@ -289,6 +289,8 @@ def voting_phase(state: GraphState) -> GraphState:
 
     votes_cast: Dict[str, str] = {}
 
+    # --- Build every voter's request first; votes are private, so no voter needs another's result ---
+    vote_requests: List[tuple] = [] # (player, options_dict, action_context)
     for player_id in alive_player_ids:
         player = player_objects.get(player_id)
         if not player:
@@ -313,18 +315,25 @@ def voting_phase(state: GraphState) -> GraphState:
             "action_type": 'vote', "player_id": player_id,
             "is_human": player.is_human, "options": options_dict,
             "prompt_message": prompt_msg,
-            "full_game_state": {**state, "public_log": current_log + logs_added_this_node},
+            "full_game_state": state_snapshot(state, current_log + logs_added_this_node),
             "player_role": player.role
         }
-
-        decision_result: Union[Optional[str], Dict] = None
-        try:
-            decision_result = asyncio.run(get_decision(action_context)) # Wrap async call
-        except Exception as e:
-            logging.error(f"Unexpected Error calling get_decision in voting_phase for {player_id}: {e}", exc_info=True)
+        vote_requests.append((player, options_dict, action_context))
+
+    # --- Collect all votes concurrently (human input runs in a thread alongside AI calls) ---
+    try:
+        gathered_results = run_async(gather_decisions([ctx for _, _, ctx in vote_requests]))
+    except Exception as e:
+        logging.error(f"Unexpected Error gathering decisions in voting_phase: {e}", exc_info=True)
+        gathered_results = [e] * len(vote_requests)
+
+    for (player, options_dict, action_context), decision_result in zip(vote_requests, gathered_results):
+        player_id = player.id
+        if isinstance(decision_result, BaseException):
+            logging.error(f"Unexpected Error calling get_decision in voting_phase for {player_id}: {decision_result}", exc_info=decision_result)
             decision_result = {
                  'status': 'exception', 'raw_output': None, 'intended_action': 'vote',
-                 'options': options_dict, 'player_id': player_id, 'error': str(e)
+                 'options': options_dict, 'player_id': player_id, 'error': str(decision_result)
              }
 
         color = "green" if player.is_human else "cyan"
@@ -333,11 +342,11 @@ def voting_phase(state: GraphState) -> GraphState:
         if isinstance(decision_result, dict) and 'status' in decision_result:
             logging.warning(f"Decision failure detected for {player_id} (vote). Handing off to GM.")
             try:
-                gm_result = asyncio.run(handle_agent_decision_failure( # Wrap async call
+                gm_result = handle_agent_decision_failure(
                     {**state, "public_log": current_log + logs_added_this_node},
                     player_id,
                     decision_result
-                ))
+                )
                 logs_added_this_node.extend(gm_result.get("logs_added", []))
                 if gm_result.get("status") == "recovered":
                      final_key = gm_result.get("recovered_key")
@@ -362,11 +371,11 @@ def voting_phase(state: GraphState) -> GraphState:
                 'error_details': 'Invalid key or None received directly.'
             }
             try:
-                gm_result = asyncio.run(handle_agent_decision_failure( # Wrap async call
+                gm_result = handle_agent_decision_failure(
                     {**state, "public_log": current_log + logs_added_this_node},
                     player_id,
                     invalid_input_failure
-                ))
+                )
                 logs_added_this_node.extend(gm_result.get("logs_added", []))
                 if gm_result.get("status") == "recovered":
                     final_key = gm_result.get("recovered_key")
@@ -396,28 +405,24 @@ def voting_phase(state: GraphState) -> GraphState:
     logs_added_this_node.append(log_entry_end)
     console.print(f"[italic grey50]{log_entry_end.replace('SYS: ', '')}[/italic grey50]")
 
-    state["votes"] = votes_cast
-    state["public_log"] = current_log + logs_added_this_node
-    state["current_phase"] = "Tallying"
-
     logging.info("voting_phase complete.")
-    return state
+    return {"votes": votes_cast, "public_log": logs_added_this_node, "current_phase": "Tallying"}
 
 # --- tally_votes, announce_process_execution, announce_no_execution remain synchronous ---
 # ... (Keep existing synchronous implementations for these) ...
-def tally_votes(state: GraphState) -> GraphState:
+def tally_votes(state: GraphState) -> StateUpdate:
     # ... (No changes needed) ...
     console.print("\n[dim blue]--- Entering Vote Tally Phase ---[/dim blue]")
     votes_cast = state.get('votes', {}) # Reads votes collected in previous step
-    current_log = state.get('public_log', [])
     tally_logs = [] # Collect logs for this phase
+    updates: StateUpdate = {}
 
     execution_target_id: Optional[str] = None
     tied_players: List[str] = []
     vote_counts: TypingCounter[str] = Counter()
 
-    state['previous_round_votes'] = votes_cast.copy() # Store for context
-    logging.info(f"Stored previous round votes: {state['previous_round_votes']}")
+    updates['previous_round_votes'] = votes_cast.copy() # Store for context
+    logging.info(f"Stored previous round votes: {updates['previous_round_votes']}")
 
     # --- Tally Logic (Internal) ---
     if votes_cast:
@@ -480,27 +485,33 @@ def tally_votes(state: GraphState) -> GraphState:
     tally_logs.append(f"NARRATOR: Vote Results - {outcome_summary}")
     # --- End Narrator Announcement ---
 
+    # --- Append the vote breakdown to today's digest ---
+    round_key = str(state.get('round_number', '?'))
+    discussion_digest = (state.get('day_digests') or {}).get(round_key)
+    vote_digest = summarize_votes(votes_cast, execution_target_id, tied_players)
+    updates["day_digests"] = {round_key: f"{discussion_digest}\n{vote_digest}" if discussion_digest else vote_digest}
+
     # --- Update State ---
-    state["execution_target"] = execution_target_id # This determines the next edge
-    state["votes"] = {} # Clear votes map for the next round
-    state["public_log"] = current_log + tally_logs # Append tally logs
-    state["current_phase"] = "Execution" # Transition phase
+    updates["execution_target"] = execution_target_id # This determines the next edge
+    updates["votes"] = {} # Clear votes map for the next round
+    updates["public_log"] = tally_logs # Append tally logs
+    updates["current_phase"] = "Execution" # Transition phase
 
     # Set last_executed marker string based on outcome for context/history
     if execution_target_id:
-        state["last_executed"] = None # Will be set to player ID by execution node
+        updates["last_executed"] = None # Will be set to player ID by execution node
     elif tied_players:
-        state["last_executed"] = "None (Tie)"
+        updates["last_executed"] = "None (Tie)"
     elif not votes_cast or not vote_counts: # Handles no votes or only invalid votes
-        state["last_executed"] = "None (No Votes/Majority)"
+        updates["last_executed"] = "None (No Votes/Majority)"
     else: # Catch-all for no execution without tie (e.g. multiple ppl got 1 vote each, less than majority?) - refine if needed
-        state["last_executed"] = "None (No Majority)"
+        updates["last_executed"] = "None (No Majority)"
 
-    logging.info(f"tally_votes complete. execution_target set to: {execution_target_id}. last_executed marker set to: {state['last_executed']}")
-    return state
+    logging.info(f"tally_votes complete. execution_target set to: {execution_target_id}. last_executed marker set to: {updates['last_executed']}")
+    return updates
 
 
-def announce_process_execution(state: GraphState) -> GraphState:
+def announce_process_execution(state: GraphState) -> StateUpdate:
     # ... (No changes needed) ...
     console.print("\n[dim blue]--- Entering Execution Phase (Processing) ---[/dim blue]")
     target_id = state.get("execution_target") # Read target from state
@@ -514,9 +525,7 @@ def announce_process_execution(state: GraphState) -> GraphState:
          logging.error("announce_process_execution node reached unexpectedly without target_id")
          log_message = f"SYS: Day {state.get('round_number', '?')}: ERROR - Execution node reached without target."
          console.print("[bold red]Error: Execution node reached without a target![/bold red]")
-         state["last_executed"] = "Error" # Set error state
-         state["public_log"] = state.get("public_log", []) + [log_message]
-         return state
+         return {"last_executed": "Error", "public_log": [log_message]} # Set error state
 
     # --- Announce Execution using Narrator ---
     narrative_text = narrate_execution(target_id)
@@ -550,31 +559,30 @@ def announce_process_execution(state: GraphState) -> GraphState:
             if isinstance(p_dict, dict): updated_players_list.append(p_dict)
     # --- End Processing Logic ---
 
-    state["players"] = updated_players_list
-    state["alive_players"] = alive_player_ids
+    updates: StateUpdate = {"players": updated_players_list, "alive_players": alive_player_ids}
 
     # --- Set State and Log ---
     log_entry = ""
     if found_and_executed and player_executed_id:
-        state["last_executed"] = player_executed_id # Store the actual executed player ID
+        updates["last_executed"] = player_executed_id # Store the actual executed player ID
         log_entry = f"NARRATOR: Player {player_executed_id} was executed by vote."
         logging.info(f"Set 'last_executed' state to: {player_executed_id}")
     else:
         # Execution target was set, but player wasn't found/alive - reflects inconsistency
-        state["last_executed"] = f"Failed Target ({target_id})" # Indicate failed attempt
+        updates["last_executed"] = f"Failed Target ({target_id})" # Indicate failed attempt
         log_entry = f"SYS: Attempted execution of {target_id} failed (player not found or already dead)."
         console.print(f"[dim yellow]WARN: Attempted to execute {target_id}, but they could not be processed.[/dim yellow]")
         logging.warning(f"Attempted to execute {target_id}, but processing failed.")
 
-    state["execution_target"] = None # Clear the execution target for next round
-    state["public_log"] = state.get("public_log", []) + [log_entry]
+    updates["execution_target"] = None # Clear the execution target for next round
+    updates["public_log"] = [log_entry]
     # Phase will be updated by conditional edge logic after check_game_over_final
 
     logging.info("announce_process_execution complete.")
-    return state
+    return updates
 
 
-def announce_no_execution(state: GraphState) -> GraphState:
+def announce_no_execution(state: GraphState) -> StateUpdate:
     # ... (No changes needed) ...
     console.print("\n[dim blue]--- Entering Execution Phase (No Execution) ---[/dim blue]")
 
@@ -599,9 +607,6 @@ def announce_no_execution(state: GraphState) -> GraphState:
     # console.print(narrative_text)
 
     # --- Final State Updates ---
-    state["execution_target"] = None # Ensure target is None
-    state["public_log"] = state.get("public_log", []) + [log_message]
     # Phase will be updated by conditional edge logic
-
     logging.info("announce_no_execution node confirmed state.")
-    return state
\ No newline at end of file
+    return {"execution_target": None, "public_log": [log_message]} # Ensure target is None
\ No newline at end of file
@@ -1,12 +1,13 @@
 # src/nodes/night_nodes.py
-import asyncio
 import logging
 from typing import Dict, Any, Optional, List, Union, Literal
 
 # Import state types and validation
 from pydantic import ValidationError
-from src.state import GraphState, PlayerState, ActionContext # Was: from ..state import ...
+from src.state import GraphState, PlayerState, ActionContext, StateUpdate # Was: from ..state import ...
 from src.decision_handler import get_decision             # Was: from ..decision_handler import ...
+from src.llm_session import run_async # Reuses the game's pooled loop instead of asyncio.run
+from src.game_log import as_log_view, state_snapshot # Shared, append-only public log
 from src.utils import get_actor_and_targets               # Was: from ..utils import ...
 from src.narrator_utils import narrate_night_begins       # Was: from ..narrator_utils import ...
 from src.gm_utils import handle_agent_decision_failure    # Was: from ..gm_utils 
@@ -19,36 +20,32 @@ except ImportError:
 
 # --- Night Phase Nodes ---
 
-def start_night_phase(state: GraphState) -> GraphState:
-    """Node for the start of the Night phase. Clears pending results. Returns the full updated state."""
+def start_night_phase(state: GraphState) -> StateUpdate:
+    """Node for the start of the Night phase. Clears pending results. Returns only the changed keys."""
     round_num_display = state.get('round_number', 0) + 1
     new_round_number = round_num_display
 
     narrative_text = narrate_night_begins(new_round_number)
     console.print(narrative_text)
 
-    state['current_phase'] = "Night"
-    state['round_number'] = new_round_number
-    state['last_victim'] = None # Reset last victim for the new night
-    state['pending_night_results'] = {} # Clear pending results
-    logging.info("Cleared pending_night_results for the new night.")
-
-    if 'public_log' not in state or state['public_log'] is None:
-        state['public_log'] = []
-
     log_entry = f"SYS: Round {new_round_number}: Night phase begins."
-    state['public_log'].append(log_entry)
-
+    logging.info("Cleared pending_night_results for the new night.")
     logging.info(f"Updating phase to Night, Round to {new_round_number}. Reset last_victim and pending_night_results.")
-    return state
+    return {
+        'current_phase': "Night",
+        'round_number': new_round_number,
+        'last_victim': None, # Reset last victim for the new night
+        'pending_night_results': {}, # Clear pending results
+        'public_log': [log_entry],
+    }
 
 
 # --- SYNC imp_action, wraps async calls ---
-def imp_action(state: GraphState) -> GraphState:
+def imp_action(state: GraphState) -> StateUpdate:
     """
     Impostor action node (Sync). Attempts get target, handles failure via GM
     (potentially with interactive clarification), sets 'target_of_night_action'
-    on success or recovery. Returns the full updated state.
+    on success or recovery. Returns only the changed keys.
     """
     console.print("[dim blue]--- Entering Impostor Action Phase ---[/dim blue]")
     imp_player_obj: Optional[PlayerState]
@@ -56,8 +53,7 @@ def imp_action(state: GraphState) -> GraphState:
     imp_player_obj, potential_targets_objs = get_actor_and_targets(state, 'Imp')
 
     target_id: Optional[str] = None
-    state['target_of_night_action'] = None
-    current_log = state.get('public_log', [])
+    current_log = as_log_view(state.get('public_log'))
     logs_added_this_node = []
     round_num = state.get('round_number', '?')
     player_id_for_log = "Impostor (Unknown)" # Default
@@ -83,13 +79,13 @@ def imp_action(state: GraphState) -> GraphState:
             "action_type": 'imp_kill', "player_id": imp_player_obj.id,
             "is_human": imp_player_obj.is_human, "options": options_dict,
             "prompt_message": prompt_msg,
-            "full_game_state": {**state, "public_log": current_log + logs_added_this_node},
+            "full_game_state": state_snapshot(state, current_log + logs_added_this_node),
             "player_role": imp_player_obj.role
         }
 
         decision_result: Union[Optional[str], Dict] = None
         try:
-            decision_result = asyncio.run(get_decision(action_context))
+            decision_result = run_async(get_decision(action_context))
         except Exception as e:
              logging.error(f"Unexpected Error calling get_decision in imp_action: {e}", exc_info=True)
              decision_result = {
@@ -101,11 +97,11 @@ def imp_action(state: GraphState) -> GraphState:
         if isinstance(decision_result, dict) and 'status' in decision_result:
             logging.warning(f"Decision failure detected for Impostor {imp_player_obj.id}. Handing off to GM.")
             try:
-                gm_result = asyncio.run(handle_agent_decision_failure(
+                gm_result = handle_agent_decision_failure(
                     {**state, "public_log": current_log + logs_added_this_node},
                     imp_player_obj.id,
                     decision_result
-                ))
+                )
                 logs_added_this_node.extend(gm_result.get("logs_added", []))
                 if gm_result.get("status") == "recovered":
                      final_key = gm_result.get("recovered_key")
@@ -130,11 +126,11 @@ def imp_action(state: GraphState) -> GraphState:
                 'error_details': 'Invalid key or None received directly.'
             }
             try:
-                gm_result = asyncio.run(handle_agent_decision_failure(
+                gm_result = handle_agent_decision_failure(
                     {**state, "public_log": current_log + logs_added_this_node},
                     imp_player_obj.id,
                     invalid_input_failure
-                ))
+                )
                 logs_added_this_node.extend(gm_result.get("logs_added", []))
                 if gm_result.get("status") == "recovered":
                     final_key = gm_result.get("recovered_key")
@@ -148,32 +144,27 @@ def imp_action(state: GraphState) -> GraphState:
         # --- Apply Final Result ---
         if final_key and final_key in options_dict:
              target_id = options_dict[final_key]
-             state['target_of_night_action'] = target_id
              log_message = f"SYS: Night {round_num}: A shadow moves..."
              logs_added_this_node.append(log_message)
              logging.info(f"Final target for {imp_player_obj.id}: {target_id} (Key: {final_key}). Stored in 'target_of_night_action'.")
         else:
-             state['target_of_night_action'] = None
              log_message = f"SYS: Night {round_num}: The Impostor's ({player_id_for_log}) action resulted in no target."
              # Check logs added by GM to avoid redundancy
              if not any("action ultimately failed" in log or "intention is unclear" in log or "action cannot proceed" in log for log in logs_added_this_node if log.startswith("GM:")):
                  logs_added_this_node.append(log_message)
              logging.info(f"Impostor {imp_player_obj.id} action ultimately resulted in no target.")
 
-    # Update the main state log
-    state['public_log'] = current_log + logs_added_this_node
-
     logging.info("imp_action complete. 'target_of_night_action' reflects final outcome.")
-    return state
+    return {'target_of_night_action': target_id, 'public_log': logs_added_this_node}
 
 
 # --- SYNC investigator_action, wraps async calls ---
-def investigator_action(state: GraphState) -> GraphState:
+def investigator_action(state: GraphState) -> StateUpdate:
     """
     Investigator action node (Sync). Attempts get target, handles failure via GM
     (potentially with interactive clarification), stores investigation result
     (or failure message) in pending_night_results, and prints result immediately
-    for Human Investigator. Returns the full updated state.
+    for Human Investigator. Returns only the changed keys.
     """
     console.print("[dim blue]--- Entering Investigator Action Phase ---[/dim blue]")
     investigator_player_obj: Optional[PlayerState]
@@ -181,14 +172,16 @@ def investigator_action(state: GraphState) -> GraphState:
     investigator_player_obj, potential_targets_objs = get_actor_and_targets(state, 'Investigator')
 
     round_num = state.get('round_number', '?')
-    current_log = state.get('public_log', [])
+    current_log = as_log_view(state.get('public_log'))
     logs_added_this_node = []
     investigation_target_key: Optional[str] = None
     options_dict: Dict[str, str] = {} # Define options_dict early for broader scope
+    # Copied so neither this node nor the GM handler mutates the graph's stored value
+    pending_results = {pid: dict(results) for pid, results in (state.get('pending_night_results') or {}).items()}
 
     if not investigator_player_obj:
         logging.info(f"Night {round_num}: No alive Investigator found for action.")
-        return state # Return state unmodified if no investigator
+        return {} # Nothing changes if no investigator
     elif not potential_targets_objs:
         investigator_id = investigator_player_obj.id
         log_message = f"SYS: Night {round_num}: Investigator ({investigator_id}) finds no valid targets."
@@ -208,13 +201,13 @@ def investigator_action(state: GraphState) -> GraphState:
             "action_type": 'investigate', "player_id": investigator_id,
             "is_human": investigator_player_obj.is_human, "options": options_dict,
             "prompt_message": prompt_msg,
-            "full_game_state": {**state, "public_log": current_log + logs_added_this_node},
+            "full_game_state": state_snapshot(state, current_log + logs_added_this_node),
             "player_role": investigator_player_obj.role
         }
 
         decision_result: Union[Optional[str], Dict] = None
         try:
-            decision_result = asyncio.run(get_decision(action_context))
+            decision_result = run_async(get_decision(action_context))
         except Exception as e:
             logging.error(f"Unexpected Error calling get_decision in investigator_action for {investigator_id}: {e}", exc_info=True)
             decision_result = {
@@ -225,11 +218,11 @@ def investigator_action(state: GraphState) -> GraphState:
         if isinstance(decision_result, dict) and 'status' in decision_result:
             logging.warning(f"Decision failure detected for Investigator {investigator_id}. Handing off to GM.")
             try:
-                gm_result = asyncio.run(handle_agent_decision_failure(
-                    {**state, "public_log": current_log + logs_added_this_node},
+                gm_result = handle_agent_decision_failure(
+                    {**state, "public_log": current_log + logs_added_this_node, "pending_night_results": pending_results},
                     investigator_id,
                     decision_result
-                ))
+                )
                 logs_added_this_node.extend(gm_result.get("logs_added", []))
                 if gm_result.get("status") == "recovered":
                      investigation_target_key = gm_result.get("recovered_key")
@@ -238,7 +231,7 @@ def investigator_action(state: GraphState) -> GraphState:
                      logging.info(f"GM handling resulted in final failure for {investigator_id}.")
                      investigation_target_key = None
                      if gm_result.get("updated_pending_results") is not None:
-                          state['pending_night_results'] = gm_result["updated_pending_results"]
+                          pending_results = gm_result["updated_pending_results"]
             except Exception as e:
                  logging.error(f"Error calling/processing GM handler in investigator_action: {e}", exc_info=True)
                  logs_added_this_node.append(f"SYS: Error during GM handling for {investigator_id}. Action fails.")
@@ -256,18 +249,18 @@ def investigator_action(state: GraphState) -> GraphState:
                 'error_details': 'Invalid key or None received directly.'
              }
              try:
-                 gm_result = asyncio.run(handle_agent_decision_failure(
-                     {**state, "public_log": current_log + logs_added_this_node},
+                 gm_result = handle_agent_decision_failure(
+                     {**state, "public_log": current_log + logs_added_this_node, "pending_night_results": pending_results},
                      investigator_id,
                      invalid_input_failure
-                 ))
+                 )
                  logs_added_this_node.extend(gm_result.get("logs_added", []))
                  if gm_result.get("status") == "recovered":
                       investigation_target_key = gm_result.get("recovered_key")
                  else:
                       investigation_target_key = None
                       if gm_result.get("updated_pending_results") is not None:
-                           state['pending_night_results'] = gm_result["updated_pending_results"]
+                           pending_results = gm_result["updated_pending_results"]
              except Exception as e:
                  logging.error(f"Error calling/processing GM handler for invalid input in investigator_action: {e}", exc_info=True)
                  logs_added_this_node.append(f"SYS: Error during GM handling for {investigator_id}. Action fails.")
@@ -296,25 +289,22 @@ def investigator_action(state: GraphState) -> GraphState:
         investigation_result_str = temp_result_str
 
         # Ensure structure exists and store result
-        if 'pending_night_results' not in state or state['pending_night_results'] is None: state['pending_night_results'] = {}
-        if investigator_id not in state['pending_night_results']: state['pending_night_results'][investigator_id] = {}
-        state['pending_night_results'][investigator_id]['investigation'] = investigation_result_str
+        pending_results.setdefault(investigator_id, {})['investigation'] = investigation_result_str
         logging.info(f"Stored successful investigation result for {investigator_id} in pending_night_results.")
 
     # --- Handle Final Failure Case (Ensure message exists) ---
     elif investigator_player_obj: # Check investigator exists before accessing ID
          investigator_id = investigator_player_obj.id
          # Ensure structure exists
-         if 'pending_night_results' not in state or state['pending_night_results'] is None: state['pending_night_results'] = {}
-         if investigator_id not in state['pending_night_results']: state['pending_night_results'][investigator_id] = {}
+         investigator_results = pending_results.setdefault(investigator_id, {})
          # Only set failure message if GM handler didn't already set one
-         if 'investigation' not in state['pending_night_results'][investigator_id]:
+         if 'investigation' not in investigator_results:
              investigation_result_str = "You did not receive an investigation result this night due to unclear instructions or failure to act."
-             state['pending_night_results'][investigator_id]['investigation'] = investigation_result_str
+             investigator_results['investigation'] = investigation_result_str
              logging.info(f"Stored generic failure message for Investigator {investigator_id} because action failed.")
          else:
              # Retrieve the message already set (likely by GM handler)
-             investigation_result_str = state['pending_night_results'][investigator_id]['investigation']
+             investigation_result_str = investigator_results['investigation']
 
     # --- IMMEDIATE DELIVERY TO HUMAN INVESTIGATOR ---
     if investigator_player_obj and investigator_player_obj.is_human and investigation_result_str is not None:
@@ -326,8 +316,5 @@ def investigator_action(state: GraphState) -> GraphState:
         log_message = f"SYS: Night {round_num}: Eyes watch in the darkness..."
         logs_added_this_node.append(log_message)
 
-    # Update the main state log
-    state['public_log'] = current_log + logs_added_this_node
-
     logging.info("investigator_action complete.")
-    return state
\ No newline at end of file
+    return {'pending_night_results': pending_results, 'public_log': logs_added_this_node}
\ No newline at end of file
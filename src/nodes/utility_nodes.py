@@ -12,7 +12,8 @@ except ImportError:
      console = Console() # Fallback
 
 # Use the updated state definition
-from ..state import PlayerState, GraphState
+from ..state import PlayerState, GraphState, StateUpdate
+from ..game_log import LogView, LogReaders
 
 # initialize_game remains the same
 def initialize_game(config: Dict[str, Any]) -> GraphState:
@@ -25,7 +26,7 @@ def initialize_game(config: Dict[str, Any]) -> GraphState:
     num_players = len(player_ids)
     if num_players < 3:
         raise ValueError(f"Insufficient players provided for game setup: {player_ids}. Need at least 3.")
-    if human_player_id not in player_ids:
+    if human_player_id and human_player_id not in player_ids: # Empty/None = all-AI game
          raise ValueError(f"Human player ID '{human_player_id}' not found in player list: {player_ids}")
 
     # --- Role Counts (Example Logic) ---
@@ -62,7 +63,7 @@ def initialize_game(config: Dict[str, Any]) -> GraphState:
         else:
             role = 'Villager'
 
-        is_human = (p_id == human_player_id)
+        is_human = bool(human_player_id) and (p_id == human_player_id)
         try:
             player_state = PlayerState(id=p_id, role=role, is_human=is_human, status='alive')
             player_states.append(player_state)
@@ -86,19 +87,21 @@ def initialize_game(config: Dict[str, Any]) -> GraphState:
         "execution_target": None,
         "game_over": False,
         "winner": None,
-        "public_log": [f"SYS: Game Initialized with players: {', '.join(player_ids)}"],
+        "public_log": LogView.from_entries([f"SYS: Game Initialized with players: {', '.join(player_ids)}"]),
         "previous_round_votes": {},
         "target_of_night_action": None,
         "last_victim": None,
         "last_executed": None,
         "pending_night_results": {},
+        "day_digests": {},
+        "log_readers": LogReaders(), # Suspicion matrix, player memories, log index: this game's only
     }
     console.print("[dim green]--- Initialization Complete ---[/dim green]")
     return initial_graph_state
 
 
 # --- Game End Node (MODIFIED) ---
-def set_winner_and_end(state: GraphState) -> GraphState: # Return GraphState
+def set_winner_and_end(state: GraphState) -> StateUpdate: # Returns only the changed keys
     """Determines the winner based on current alive players, reveals roles, and sets game over state."""
     console.print("\n[dim blue]--- Entering Game Over Check ---[/dim blue]")
     # --- Calculate CURRENT alive counts ---
@@ -178,11 +181,10 @@ def set_winner_and_end(state: GraphState) -> GraphState: # Return GraphState
     console.print(f"\n[bold {winner_color}]GAME OVER! The {winner} team wins![/bold {winner_color}]")
 
     # --- Update Final State ---
-    state["game_over"] = True
-    state["winner"] = winner
-    # Append final log entry
-    state["public_log"] = state.get('public_log', []) + [log_entry]
-    state["current_phase"] = "GameOver"
-
     logging.info("set_winner_and_end complete.")
-    return state
\ No newline at end of file
+    return {
+        "game_over": True,
+        "winner": winner,
+        "public_log": [log_entry], # Append final log entry
+        "current_phase": "GameOver",
+    }
\ No newline at end of file
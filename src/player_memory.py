@@ -0,0 +1,128 @@
+# src/player_memory.py
+"""
+Rolling per-player memory for AI prompts.
+
+Prompts show only the last few public log lines. Everything older is folded,
+once, into a small structured memory per player: deaths, vote breakdowns per
+day, and the player's own private results (e.g. past investigations, which
+`pending_night_results` only holds for one night). Who accused or defended
+against whom is covered by the shared suspicion table (suspicion_matrix.py).
+Folding is deterministic extraction from the log, with no
+model call, and incremental: each call only processes the entries that left the
+recent tail since the last call. The rendered summary is trimmed to a token
+budget, dropping the oldest or least repeated lines of each section first, so
+prompt size stays flat no matter how long the game runs.
+"""
+import heapq
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple, Iterable
+
+from .game_log import IncrementalLogReader, LogEvent, strip_markup, log_readers
+
+MEMORY_TOKEN_BUDGET = 220 # Approximate tokens for the rendered memory block
+CHARS_PER_TOKEN = 4 # Rough average for English text with player IDs
+MIN_LINE_TOKENS = 6 # No rendered line is shorter, so budget // MIN_LINE_TOKENS bounds the lines worth building
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class PlayerMemory(IncrementalLogReader):
+    """What one player remembers of the log before the recent tail."""
+    def __init__(self, player_id: str):
+        self.player_id = player_id
+        super().__init__()
+
+    def _reset_summary(self) -> None:
+        self.deaths: List[str] = []
+        self.votes_by_round: Dict[int, Dict[str, List[str]]] = {} # round -> target -> voters
+        self.private_notes: Dict[int, str] = {} # round -> private result
+
+    # --- Folding ---
+    def _fold_event(self, event: LogEvent) -> None:
+        if event.kind == 'death':
+            self.deaths.append(f"{event.target} (killed night {event.round_number})")
+        elif event.kind == 'execution':
+            self.deaths.append(f"{event.target} (executed day {self.round_number})")
+        elif event.kind == 'vote_reveal':
+            self.votes_by_round.setdefault(self.round_number, {}).setdefault(event.target, []).append(event.actor)
+
+    def note_private(self, round_number: int, text: str) -> None:
+        self.private_notes[round_number] = strip_markup(text)
+
+    # --- Rendering ---
+    def render(self, token_budget: int = MEMORY_TOKEN_BUDGET, current_round: Optional[int] = None,
+               digested_round: Optional[int] = None, skip_vote_rounds: Iterable[int] = ()) -> str:
+        """
+        The memory as prompt text, at most `token_budget` (estimated) tokens; empty if nothing is remembered.
+        Left out because the prompt shows them separately: private notes for `current_round`, votes of
+        `digested_round` (shared day digest) and of `skip_vote_rounds`.
+        """
+        skip_votes = {digested_round, *skip_vote_rounds}
+        sections: List[Tuple[str, List[str]]] = [] # In priority order; lines within a section too
+        max_lines = max(1, token_budget // MIN_LINE_TOKENS)
+        notes = sorted(((r, n) for r, n in self.private_notes.items() if r != current_round), reverse=True)[:max_lines]
+        if notes:
+            sections.append(("Your private results", [f"Round {r}: {note}" for r, note in notes]))
+        if self.deaths:
+            sections.append(("Deaths", self.deaths[:-max_lines - 1:-1])) # Most recent first
+        if self.votes_by_round:
+            vote_lines = []
+            for r in heapq.nlargest(max_lines, (r for r in self.votes_by_round if r not in skip_votes)):
+                by_target = sorted(self.votes_by_round[r].items(), key=lambda kv: len(kv[1]), reverse=True)
+                vote_lines.append(f"Day {r} votes: " + "; ".join(f"{t} <- {', '.join(v)}" for t, v in by_target))
+            if vote_lines: sections.append(("Votes", vote_lines))
+        if not sections: return ""
+
+        # Takes lines round-robin across sections so one long section cannot crowd out
+        # the others; a section stops at its first line that no longer fits.
+        header, footer = "\n--- Your Memory (earlier events, summarized) ---\n", "--- End Memory ---\n"
+        used = estimate_tokens(header + footer)
+        kept: List[List[str]] = [[] for _ in sections]
+        open_sections = list(range(len(sections)))
+        while open_sections:
+            for index in list(open_sections):
+                title, lines = sections[index]
+                position = len(kept[index])
+                if position == len(lines):
+                    open_sections.remove(index); continue
+                cost = estimate_tokens(f"{title}: {lines[position]}\n" if position == 0 else f"  - {lines[position]}\n")
+                if used + cost > token_budget:
+                    open_sections.remove(index); continue
+                used += cost
+                kept[index].append(lines[position])
+        body = ""
+        for (title, _), lines in zip(sections, kept):
+            if lines: body += f"{title}: {lines[0]}\n" + "".join(f"  - {line}\n" for line in lines[1:])
+        omitted = (len(notes) + len(self.deaths) + sum(1 for r in self.votes_by_round if r not in skip_votes)
+                   - sum(len(lines) for lines in kept))
+        if omitted: body += f"({omitted} older details omitted)\n"
+        return header + body + footer
+
+
+# --- Per-Game Memories ---
+
+def get_player_memory(game_state, player_id: str) -> PlayerMemory:
+    """The player's memory in this game (kept in the game's log readers)."""
+    return log_readers(game_state).get(('player_memory', player_id), lambda: PlayerMemory(player_id))
+
+
+def memory_context(game_state, player_id: str, player_role: Optional[str], recent_count: int,
+                   token_budget: int = MEMORY_TOKEN_BUDGET, digested_round: Optional[int] = None) -> str:
+    """
+    Folds everything but the last `recent_count` log entries into the player's memory and renders it,
+    leaving out the votes of `digested_round` (covered by that day's shared digest) and of the
+    previous round (the prompt always shows those).
+    """
+    memory = get_player_memory(game_state, player_id)
+    public_log = game_state.get('public_log') or []
+    folded = memory.fold(public_log, max(0, len(public_log) - recent_count))
+    if player_role == 'Investigator':
+        result = (game_state.get('pending_night_results') or {}).get(player_id, {}).get('investigation')
+        if result: memory.note_private(game_state.get('round_number', 0), result)
+    current_round = game_state.get('round_number') or 0
+    rendered = memory.render(token_budget, current_round=current_round, digested_round=digested_round,
+                             skip_vote_rounds=(current_round - 1,))
+    logging.debug(f"Memory for {player_id}: folded {folded} new entries ({memory.folded_count} total), ~{estimate_tokens(rendered)} tokens.")
+    return rendered
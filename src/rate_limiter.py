@@ -0,0 +1,269 @@
+# src/rate_limiter.py
+"""
+Process-wide request governor for LLM calls.
+
+Free-tier OpenRouter models rate-limit hard, and a 429 used to forfeit the
+player's turn. The governor hands out request slots from a token bucket per
+API key (a pool of keys is supported, each with its own limit). Slots are
+reserved in arrival order, so waiters are served fairly across every game
+running in the process. A 429 with `Retry-After` blocks that key until the
+server says it is safe again, and the call is retried instead of failing.
+"""
+import os
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, List, Any
+
+from .settings import load_environment
+from .llm_session import loop_time # time.monotonic() on a normal loop; virtual in latency simulations
+
+# --- Governor Constants ---
+API_KEYS_ENV_VAR = "OPENROUTER_API_KEYS"      # Comma separated; optional ':rpm' suffix per key
+RPM_PER_KEY_ENV_VAR = "OPENROUTER_RPM_PER_KEY"
+DEFAULT_REQUESTS_PER_MINUTE = 20              # OpenRouter free-tier limit per key
+DEFAULT_BURST = 2                             # Requests a key may send back-to-back
+DEFAULT_RETRY_AFTER_SECONDS = 5.0             # Backoff when a 429 carries no usable header
+MAX_RETRY_AFTER_SECONDS = 60.0                # Never park a key longer than this
+# --------------------------
+
+
+def _key_label(api_key: str) -> str:
+    """Short, non-secret label for logs and metrics."""
+    return f"...{api_key[-4:]}" if api_key else "<none>"
+
+
+class _Reservation:
+    """One reserved slot on a bucket, with the bucket's `tat` from before it was taken."""
+    __slots__ = ("bucket", "start", "prev_tat", "released")
+
+    def __init__(self, bucket: "_KeyBucket", start: float, prev_tat: float):
+        self.bucket = bucket
+        self.start = start
+        self.prev_tat = prev_tat
+        self.released = False
+
+
+class _KeyBucket:
+    """
+    Token bucket for one API key, kept as a 'theoretical arrival time' (GCRA).
+    Reservations not yet used are kept in order, so a waiter that gives up can hand its slot back.
+    """
+    def __init__(self, api_key: str, requests_per_minute: float, burst: int):
+        self.api_key = api_key
+        self.interval = 60.0 / max(requests_per_minute, 0.001)
+        self.burst_window = self.interval * max(burst - 1, 0)
+        self.tat = 0.0            # Time at which the bucket would be completely refilled
+        self.blocked_until = 0.0  # Set from Retry-After on a 429
+        self.rate_limited_count = 0
+        self.released_count = 0
+        self._open: List[_Reservation] = [] # Reserved and not yet used, oldest first
+
+    def earliest_start(self, now: float) -> float:
+        return max(now, self.blocked_until, self.tat - self.burst_window)
+
+    def reserve(self, now: float) -> _Reservation:
+        start = self.earliest_start(now)
+        reservation = _Reservation(self, start, self.tat)
+        self.tat = max(self.tat, start) + self.interval
+        self._open.append(reservation)
+        return reservation
+
+    def use(self, reservation: _Reservation) -> None:
+        """The slot was used: it and every older reservation can no longer be given back."""
+        if reservation in self._open:
+            del self._open[:self._open.index(reservation) + 1]
+
+    def release(self, reservation: _Reservation) -> None:
+        """
+        Gives an unused slot back. `tat` only moves back over the newest reservations, all
+        released; an older one released while newer ones wait is returned once those go too.
+        """
+        if reservation.released or reservation not in self._open: return
+        reservation.released = True
+        self.released_count += 1
+        while self._open and self._open[-1].released:
+            self.tat = self._open.pop().prev_tat
+
+
+class RequestGovernor:
+    """
+    Fair, thread-safe token-bucket governor over a pool of API keys.
+    Safe to share between games running in different threads and event loops,
+    provided every loop's time() is the same clock: slot reservation happens under
+    a lock against loop_time(), and waiting is a plain asyncio.sleep on whichever
+    loop the caller runs in. A VirtualClockLoop and a real loop must never use the
+    governor at once (their times would be mixed in one bucket); consecutive
+    virtual loops continue each other's clock (VirtualClockLoop(start=...)).
+    """
+    def __init__(self, key_limits: Dict[str, float], burst: int = DEFAULT_BURST):
+        if not key_limits:
+            raise ValueError("RequestGovernor needs at least one API key.")
+        self._buckets: List[_KeyBucket] = [_KeyBucket(k, rpm, burst) for k, rpm in key_limits.items()]
+        self._by_key: Dict[str, _KeyBucket] = {b.api_key: b for b in self._buckets}
+        self._lock = threading.Lock()
+        # --- Metrics ---
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.requests_granted = 0
+        self.requeues = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _reserve(self) -> _Reservation:
+        with self._lock:
+            now = loop_time()
+            bucket = min(self._buckets, key=lambda b: b.earliest_start(now))
+            return bucket.reserve(now)
+
+    def _release(self, reservation: _Reservation) -> None:
+        with self._lock: reservation.bucket.release(reservation)
+
+    async def acquire(self) -> str:
+        """Waits for a free slot and returns the API key the request must use."""
+        enqueued_at = loop_time()
+        with self._lock:
+            self.queue_depth += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        try:
+            while True:
+                reservation = self._reserve()
+                bucket = reservation.bucket
+                delay = reservation.start - loop_time()
+                if delay > 0:
+                    try:
+                        await asyncio.sleep(delay)
+                    except asyncio.CancelledError: # Deadline or gather cancel: the slot goes unused
+                        self._release(reservation)
+                        raise
+                # A 429 on this key while we slept invalidates the reservation.
+                with self._lock:
+                    if bucket.blocked_until <= loop_time():
+                        bucket.use(reservation)
+                        break
+                    bucket.release(reservation)
+                    self.requeues += 1
+        finally:
+            with self._lock: self.queue_depth -= 1
+        # Counted only when granted: a cancelled wait (deadline, gather cancel) is not a grant
+        waited = loop_time() - enqueued_at
+        with self._lock:
+            self.requests_granted += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited > 0.5:
+            logging.info(f"Request governor: waited {waited:.2f}s for a slot on key {_key_label(bucket.api_key)}.")
+        return bucket.api_key
+
+    def report_rate_limited(self, api_key: str, retry_after_seconds: Optional[float] = None) -> float:
+        """Parks a key after a 429. Returns the effective block duration."""
+        bucket = self._by_key.get(api_key)
+        if bucket is None: return 0.0
+        block_for = min(retry_after_seconds if retry_after_seconds is not None else DEFAULT_RETRY_AFTER_SECONDS,
+                        MAX_RETRY_AFTER_SECONDS)
+        with self._lock:
+            bucket.blocked_until = max(bucket.blocked_until, loop_time() + block_for)
+            bucket.rate_limited_count += 1
+        logging.warning(f"Request governor: key {_key_label(api_key)} rate limited; blocked for {block_for:.1f}s.")
+        return block_for
+
+    def note_rate_limit_error(self, api_key: str) -> float:
+        """
+        Called when a 429 surfaces as an exception. Keeps the Retry-After block already
+        set by `observe_http_response`; otherwise falls back to the default backoff.
+        """
+        bucket = self._by_key.get(api_key)
+        if bucket is None: return 0.0
+        remaining = bucket.blocked_until - loop_time()
+        if remaining > 0: return remaining
+        return self.report_rate_limited(api_key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "peak_queue_depth": self.peak_queue_depth,
+                "requests_granted": self.requests_granted,
+                "requeues_after_429": self.requeues,
+                "mean_wait_seconds": (self.total_wait_seconds / self.requests_granted) if self.requests_granted else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "keys": {
+                    _key_label(b.api_key): {"rpm": round(60.0 / b.interval, 2), "rate_limited": b.rate_limited_count,
+                                            "released": b.released_count}
+                    for b in self._buckets
+                },
+            }
+
+
+# --- Retry-After Parsing ---
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Seconds to wait, from `Retry-After` (seconds or HTTP date) or OpenRouter's `X-RateLimit-Reset` (epoch ms)."""
+    value = headers.get('retry-after')
+    if value:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    reset_ms = headers.get('x-ratelimit-reset')
+    if reset_ms:
+        try:
+            return max(float(reset_ms) / 1000.0 - time.time(), 0.0)
+        except ValueError:
+            pass
+    return None
+
+
+def observe_http_response(request, response) -> None:
+    """
+    Response observer for the pooled HTTP session: turns 429 headers into key blocks.
+    pydantic-ai's ModelHTTPError does not carry headers, so this is where Retry-After is read.
+    """
+    if response.status_code != 429 or _governor is None: return
+    auth = request.headers.get('authorization', '')
+    api_key = auth[len('Bearer '):] if auth.startswith('Bearer ') else ''
+    _governor.report_rate_limited(api_key, parse_retry_after(response.headers))
+
+
+# --- Process-wide Singleton ---
+
+_governor: Optional[RequestGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def _load_key_limits(fallback_api_key: Optional[str]) -> Dict[str, float]:
+    load_environment()
+    default_rpm = float(os.getenv(RPM_PER_KEY_ENV_VAR, DEFAULT_REQUESTS_PER_MINUTE))
+    key_limits: Dict[str, float] = {}
+    for entry in os.getenv(API_KEYS_ENV_VAR, "").split(","):
+        entry = entry.strip()
+        if not entry: continue
+        key, _, rpm = entry.rpartition(":")
+        if key and rpm.replace(".", "", 1).isdigit():
+            key_limits[key] = float(rpm)
+        else:
+            key_limits[entry] = default_rpm
+    if not key_limits and fallback_api_key:
+        key_limits[fallback_api_key] = default_rpm
+    return key_limits
+
+
+def get_request_governor(fallback_api_key: Optional[str] = None) -> Optional[RequestGovernor]:
+    """Returns the governor shared by every game in this process, creating it on first use."""
+    global _governor
+    if _governor is not None: return _governor
+    with _governor_lock:
+        if _governor is None:
+            key_limits = _load_key_limits(fallback_api_key)
+            if not key_limits:
+                logging.error("Request governor: no API keys configured.")
+                return None
+            _governor = RequestGovernor(key_limits)
+            logging.info(f"Request governor configured with {len(key_limits)} key(s): "
+                         f"{ {_key_label(k): v for k, v in key_limits.items()} } rpm.")
+    return _governor
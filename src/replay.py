@@ -0,0 +1,176 @@
+# src/replay.py
+"""
+Deterministic record/replay for whole games.
+
+A seeded game (`random.seed` before `initialize_game`) is deterministic except
+for what players decide. Recording stores, for every `get_decision` call in
+call order, a short hash of the decision's inputs (action, player, options,
+prompt and the full game state) plus the decision's output. Replaying feeds the
+recorded outputs back in order, with no LLM calls and no human input, and stops
+at the first call whose input hash differs from the recording: that is the
+first point where the code under test behaves differently.
+"""
+import copy
+import json
+import time
+import hashlib
+import logging
+from typing import Optional, Any, Dict, List, Literal, Callable, Awaitable
+
+from .state import ActionContext
+from .game_log import json_default
+
+RECORD_FORMAT_VERSION = 1
+
+ReplayMode = Literal['record', 'replay']
+
+
+class ReplayDivergence(RuntimeError):
+    """Raised in replay mode at the first decision that does not match the recording."""
+    def __init__(self, seq: int, reason: str, expected: Optional[Dict[str, Any]], context: Optional[ActionContext]):
+        self.seq = seq
+        self.reason = reason
+        self.expected = expected
+        self.actual = _decision_summary(context) if context is not None else None
+        round_number = (context or {}).get('full_game_state', {}).get('round_number', '?')
+        super().__init__(
+            f"Replay diverged at decision #{seq} (round {round_number}): {reason}. "
+            f"Expected {_short(expected)}, got {_short(self.actual)}."
+        )
+
+
+class ReplayedDecisionError(RuntimeError):
+    """Re-raises a decision that raised while being recorded."""
+
+
+def _short(summary: Optional[Dict[str, Any]]) -> str:
+    if not summary: return "nothing"
+    return f"{summary.get('player')} {summary.get('action')} (input {summary.get('input')})"
+
+
+def decision_input_hash(context: ActionContext) -> str:
+    """Stable hash of everything a decision can depend on."""
+    payload = {
+        "action_type": context.get('action_type'),
+        "player_id": context.get('player_id'),
+        "player_role": context.get('player_role'),
+        "is_human": context.get('is_human'),
+        "options": context.get('options'),
+        "prompt_message": context.get('prompt_message'),
+        "state": {k: v for k, v in (context.get('full_game_state') or {}).items() if k != 'log_readers'}, # Derived from the log
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=json_default)
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _decision_summary(context: ActionContext) -> Dict[str, Any]:
+    return {"player": context.get('player_id'), "action": context.get('action_type'), "input": decision_input_hash(context)}
+
+
+class ReplaySession:
+    """Records or replays the decisions of one game."""
+    def __init__(self, mode: ReplayMode, header: Dict[str, Any], decisions: Optional[List[Dict[str, Any]]] = None):
+        self.mode = mode
+        self.header = header
+        self.decisions: List[Dict[str, Any]] = decisions if decisions is not None else []
+        self._next_seq = 0
+        self.divergence: Optional[ReplayDivergence] = None
+
+    async def handle(self, context: ActionContext, live_decision: Callable[[ActionContext], Awaitable[Any]]) -> Any:
+        # The sequence number is taken before any await, so concurrent (gathered)
+        # decisions are numbered in the order they were requested.
+        seq = self._next_seq
+        self._next_seq += 1
+        if self.mode == 'record':
+            return await self._record(seq, context, live_decision)
+        return self._replay(seq, context)
+
+    async def _record(self, seq: int, context: ActionContext, live_decision) -> Any:
+        entry = {"seq": seq, **_decision_summary(context)}
+        self.decisions.append(entry)
+        try:
+            output = await live_decision(context)
+        except Exception as e:
+            entry["raised"] = f"{e.__class__.__name__}: {e}"
+            raise
+        entry["output"] = copy.deepcopy(output)
+        return output
+
+    def _replay(self, seq: int, context: ActionContext) -> Any:
+        if self.divergence is not None:
+            raise self.divergence
+        if seq >= len(self.decisions):
+            self._diverge(seq, f"the recording has only {len(self.decisions)} decisions", None, context)
+        expected = self.decisions[seq]
+        actual_hash = decision_input_hash(context)
+        if (expected.get("player"), expected.get("action")) != (context.get('player_id'), context.get('action_type')):
+            self._diverge(seq, "a different player/action was asked to decide", expected, context)
+        if expected.get("input") != actual_hash:
+            self._diverge(seq, "decision inputs (game state, options or prompt) differ", expected, context)
+        if "raised" in expected:
+            raise ReplayedDecisionError(expected["raised"])
+        return copy.deepcopy(expected.get("output"))
+
+    def _diverge(self, seq: int, reason: str, expected, context) -> None:
+        self.divergence = ReplayDivergence(seq, reason, expected, context)
+        logging.error(str(self.divergence))
+        raise self.divergence
+
+    def finish(self, winner: Optional[str]) -> Optional[str]:
+        """Called at game end. In replay mode, returns a problem description if the game ended differently."""
+        if self.mode == 'record':
+            self.header["winner"] = winner
+            self.header["finished_at"] = time.time()
+            return None
+        if self.divergence is not None:
+            return str(self.divergence)
+        if self._next_seq < len(self.decisions):
+            return f"Replay ended after {self._next_seq} of {len(self.decisions)} recorded decisions."
+        if self.header.get("winner") != winner:
+            return f"Replay winner {winner!r} differs from recorded winner {self.header.get('winner')!r}."
+        return None
+
+    def save(self, path: str) -> None:
+        record = {"version": RECORD_FORMAT_VERSION, **self.header, "decisions": self.decisions}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, separators=(',', ':'), default=str)
+        logging.info(f"Saved decision record with {len(self.decisions)} decisions to {path}")
+
+
+def load_record(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        record = json.load(f)
+    if record.get("version") != RECORD_FORMAT_VERSION:
+        raise ValueError(f"Unsupported decision record version {record.get('version')!r} in {path}.")
+    return record
+
+
+# --- Active Session (process-wide, one game at a time) ---
+
+_active_session: Optional[ReplaySession] = None
+
+
+def start_recording(seed: int, player_ids: List[str], human_player_id: Optional[str], ai_backend: str) -> ReplaySession:
+    global _active_session
+    _active_session = ReplaySession('record', {
+        "seed": seed, "player_ids": list(player_ids), "human_player_id": human_player_id,
+        "ai_backend": ai_backend, "created_at": time.time(),
+    })
+    return _active_session
+
+
+def start_replay(record: Dict[str, Any]) -> ReplaySession:
+    global _active_session
+    header = {k: v for k, v in record.items() if k not in ("decisions", "version")}
+    _active_session = ReplaySession('replay', header, record.get("decisions", []))
+    return _active_session
+
+
+def stop_session() -> Optional[ReplaySession]:
+    global _active_session
+    session, _active_session = _active_session, None
+    return session
+
+
+def get_replay_session() -> Optional[ReplaySession]:
+    return _active_session
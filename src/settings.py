@@ -0,0 +1,44 @@
+# src/settings.py
+"""
+Environment configuration, loaded on first need instead of at import time.
+
+`.env` is read once, the first time something asks for configuration (an LLM
+call, a session's proxy, the request governor). Games that never reach the
+LLM (scripted/heuristic backends, benchmarks, batch workers) never pay for it
+and do not need an API key.
+"""
+import os
+import logging
+import threading
+from typing import Optional
+
+API_KEY_ENV_VAR = "OPENROUTER_API_KEY"
+API_KEYS_ENV_VAR = "OPENROUTER_API_KEYS" # Key pool, see rate_limiter.py
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_environment() -> None:
+    """Loads `.env` into os.environ once. Existing variables are not overridden."""
+    global _env_loaded
+    if _env_loaded: return
+    with _env_lock:
+        if _env_loaded: return
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+        logging.debug("Environment loaded from .env (if present).")
+
+
+def get_primary_api_key() -> Optional[str]:
+    """The single OPENROUTER_API_KEY, or None when only a key pool is configured."""
+    load_environment()
+    return os.getenv(API_KEY_ENV_VAR)
+
+
+def validate_llm_config() -> None:
+    """Raises EnvironmentError if no OpenRouter key (single or pool) is configured."""
+    load_environment()
+    if not os.getenv(API_KEY_ENV_VAR) and not os.getenv(API_KEYS_ENV_VAR):
+        raise EnvironmentError(f"ERROR: Missing environment variable: {API_KEY_ENV_VAR} (or {API_KEYS_ENV_VAR}).")
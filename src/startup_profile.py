@@ -0,0 +1,98 @@
+# src/startup_profile.py
+"""
+Support for `main.py --startup-profile`.
+
+Records wall-clock marks for each startup phase of this process (argument
+parsing, game imports, graph compile, ...) and breaks import time down by
+top-level package using the interpreter's own `-X importtime`, run in a child
+process so modules already cached in this process don't hide their cost.
+"""
+import os
+import sys
+import time
+import logging
+import subprocess
+from collections import defaultdict
+from typing import List, Tuple, Dict, Callable, Any, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Where `src` is importable from
+
+
+class StartupProfile:
+    def __init__(self, process_started: float):
+        self.process_started = process_started
+        self.marks: List[Tuple[str, float]] = []
+        self._last = process_started
+
+    def mark(self, label: str) -> None:
+        """Records the time since the previous mark under `label`."""
+        now = time.perf_counter()
+        self.marks.append((label, now - self._last))
+        self._last = now
+
+    def measure(self, label: str, fn: Callable[[], Any]) -> Any:
+        self._last = time.perf_counter()
+        result = fn()
+        self.mark(label)
+        return result
+
+    def total_seconds(self) -> float:
+        return sum(seconds for _, seconds in self.marks)
+
+
+def import_time_by_package(module: str, timeout: float = 60.0) -> Optional[Dict[str, Any]]:
+    """
+    Imports `module` in a fresh interpreter under `-X importtime` and sums each
+    module's self time by top-level package. The child runs from the project root,
+    so `src` imports from any working directory. Returns None if the child fails.
+    """
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, timeout=timeout, cwd=PROJECT_ROOT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logging.warning(f"Import-time child for {module} did not run: {e}")
+        return None
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        logging.warning(f"Import-time child could not import {module} (exit {completed.returncode}): {' | '.join(errors[-3:])}")
+        return None
+    by_package: Dict[str, float] = defaultdict(float)
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line: continue
+        try:
+            _, self_us, cumulative_us, raw_name = line.replace("import time:", "|", 1).split("|")
+            self_us_int = int(self_us)
+        except ValueError:
+            continue
+        name = raw_name.strip()
+        by_package[name.split(".")[0]] += self_us_int / 1000.0
+        # Nested imports are indented two spaces per level after the separator's single space
+        if name == module and len(raw_name) - len(raw_name.lstrip()) <= 1:
+            total_us = int(cumulative_us)
+    return {"module": module, "total_ms": total_us / 1000.0,
+            "by_package_ms": dict(sorted(by_package.items(), key=lambda kv: kv[1], reverse=True))}
+
+
+def print_startup_report(profile: StartupProfile, console, module: str = "src.game_runner", top: int = 10) -> None:
+    from rich.table import Table
+    phases = Table(title="Startup Phases")
+    phases.add_column("Phase")
+    phases.add_column("ms", justify="right")
+    for label, seconds in profile.marks:
+        phases.add_row(label, f"{seconds * 1000:.1f}")
+    phases.add_row("[bold]total[/bold]", f"[bold]{profile.total_seconds() * 1000:.1f}[/bold]")
+    console.print(phases)
+
+    breakdown = import_time_by_package(module)
+    if breakdown is None:
+        console.print(f"[yellow]Could not measure import time of {module} in a child process.[/yellow]")
+        return
+    packages = Table(title=f"Cold import of {module}: {breakdown['total_ms']:.1f} ms (self time by package)")
+    packages.add_column("Package")
+    packages.add_column("ms", justify="right")
+    for package, ms in list(breakdown["by_package_ms"].items())[:top]:
+        packages.add_row(package, f"{ms:.1f}")
+    console.print(packages)
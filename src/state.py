@@ -1,7 +1,10 @@
 # src/state.py
-from typing import Optional, List, Dict, Any, TypedDict, Literal
+from typing import Optional, List, Dict, Any, TypedDict, Literal, Annotated, Sequence, Mapping, get_type_hints
 from pydantic import BaseModel, Field
 
+from .game_log import append_log_entries, LogReaders
+from .day_digest import merge_day_digests
+
 # --- Pydantic Models (Reference/Internal Validation) ---
 
 class PlayerState(BaseModel):
@@ -39,13 +42,19 @@ class GameState(BaseModel): # Pydantic model for reference/internal validation
     # Example: {'Investigator1': {'investigation': 'Alice is Villager'}}
     pending_night_results: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
     # -----------------------------------------------------------
+    # Public digest of each day, keyed by round number as a string (see day_digest.py)
+    day_digests: Dict[str, str] = Field(default_factory=dict)
     class Config: validate_assignment = True
 
 
 # --- TypedDicts for Graph State ---
 
 class GraphState(TypedDict):
-    """Matches GameState structure for LangGraph."""
+    """
+    Matches GameState structure for LangGraph.
+    Nodes return only the keys they change. `public_log` is append-only: a node
+    returns just its new entries and the reducer appends them to the shared log.
+    """
     players: List[Dict]
     current_phase: str
     round_number: int
@@ -54,7 +63,7 @@ class GraphState(TypedDict):
     execution_target: Optional[str]
     game_over: bool
     winner: Optional[str]
-    public_log: List[str]
+    public_log: Annotated[Sequence[str], append_log_entries]
     previous_round_votes: Dict[str, str]
     target_of_night_action: Optional[str] # Keep for Imp kill specifically? Or make generic? Let's keep for now.
     last_victim: Optional[str]
@@ -62,6 +71,28 @@ class GraphState(TypedDict):
     # --- Field for Pending Night Results ---
     pending_night_results: Dict[str, Dict[str, Any]] # e.g., {'Investigator1': {'investigation': 'Alice is Villager'}}
     # -------------------------------------
+    day_digests: Annotated[Dict[str, str], merge_day_digests] # {'2': 'Accusations: ...'}, written once per day
+    log_readers: LogReaders # This game's incremental log readers; set once by initialize_game, never returned by nodes
+
+
+# A node's return value: only the GraphState keys it changed (public_log: new entries only).
+StateUpdate = Dict[str, Any]
+
+# Reducers declared with Annotated[...] on GraphState, keyed by field name.
+STATE_REDUCERS = {
+    key: hint.__metadata__[0]
+    for key, hint in get_type_hints(GraphState, include_extras=True).items()
+    if getattr(hint, "__metadata__", None)
+}
+
+
+def apply_state_update(state: Mapping[str, Any], update: StateUpdate) -> GraphState:
+    """Merges a node's update into `state` the way the graph does (reducers for annotated keys). Returns a new dict."""
+    merged = dict(state)
+    for key, value in update.items():
+        reducer = STATE_REDUCERS.get(key)
+        merged[key] = reducer(merged.get(key), value) if reducer else value
+    return merged
 
 
 class ActionContext(TypedDict):
@@ -0,0 +1,157 @@
+# src/suspicion_matrix.py
+"""
+Incremental who-suspects-whom matrix for the whole game.
+
+The day digest covers one day and each player's memory covers deaths and
+votes; neither says, at a glance, who has been under pressure all game. The
+matrix counts, for every pair of players, how often one accused the other in
+discussion and voted against them, plus how often each player defended
+themselves. It is shared by all players (everything in it is public), folded
+from the public log one entry at a time as speeches and vote reveals arrive,
+and stored in flat `array('H')` buffers (n*n counters for n players) rather
+than nested dicts. Prompts show it as a short table of the most suspected
+alive players; at game end it feeds the accusation/vote accuracy analytics.
+"""
+import logging
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+
+from .game_log import IncrementalLogReader, LogEvent, SUSPICION_INTENTS, log_readers
+
+TABLE_MAX_ROWS = 8 # Most suspected alive players shown in prompts
+_COUNTER_MAX = 0xFFFF # array('H') counters saturate instead of overflowing
+
+
+class SuspicionMatrix(IncrementalLogReader):
+    """Accusation and vote counts between the players of one game."""
+    def __init__(self, player_ids: Sequence[str]):
+        self.player_ids: Tuple[str, ...] = tuple(player_ids)
+        self._index: Dict[str, int] = {p: i for i, p in enumerate(self.player_ids)}
+        self._table_cache: Optional[Tuple[Any, str]] = None
+        super().__init__()
+
+    def _reset_summary(self) -> None:
+        n = len(self.player_ids)
+        self.accusations = array('H', bytes(2 * n * n)) # [accuser * n + target]
+        self.votes = array('H', bytes(2 * n * n)) # [voter * n + target]
+        self.defenses = array('H', bytes(2 * n)) # [player]
+        self.times_accused = array('H', bytes(2 * n)) # [target], column sums of `accusations`
+        self.votes_received = array('H', bytes(2 * n)) # [target], column sums of `votes`
+        self._table_cache = None
+
+    # --- Folding ---
+    def _fold_event(self, event: LogEvent) -> None:
+        if event.kind == 'vote_reveal':
+            self._bump(self.votes, self.votes_received, event.actor, event.target)
+        elif event.kind == 'speech' and event.target and event.target != event.actor:
+            if event.intent in SUSPICION_INTENTS:
+                self._bump(self.accusations, self.times_accused, event.actor, event.target)
+        if event.kind == 'speech' and event.intent == 'defend_self':
+            i = self._index.get(event.actor)
+            if i is not None and self.defenses[i] < _COUNTER_MAX: self.defenses[i] += 1
+
+    def _bump(self, counters: array, totals: array, source: Optional[str], target: Optional[str]) -> None:
+        i, j = self._index.get(source), self._index.get(target)
+        if i is None or j is None: return # Not a player of this game (e.g. malformed line)
+        cell = i * len(self.player_ids) + j
+        if counters[cell] < _COUNTER_MAX: counters[cell] += 1
+        if totals[j] < _COUNTER_MAX: totals[j] += 1
+
+    # --- Queries ---
+    def count(self, counters: array, source: str, target: str) -> int:
+        """Cell of `counters` (e.g. `self.accusations`) for a pair of players; 0 for unknown players."""
+        i, j = self._index.get(source), self._index.get(target)
+        if i is None or j is None: return 0
+        return counters[i * len(self.player_ids) + j]
+
+    def pressure(self, player: str) -> Tuple[int, int, int]:
+        """(times accused, votes received, self-defenses) for one player over the whole game."""
+        j = self._index.get(player)
+        if j is None: return (0, 0, 0)
+        return (self.times_accused[j], self.votes_received[j], self.defenses[j])
+
+    def _column(self, counters: array, target: int) -> List[int]:
+        n = len(self.player_ids)
+        return [counters[i * n + target] for i in range(n)]
+
+    def _row(self, counters: array, source: int) -> List[int]:
+        n = len(self.player_ids)
+        return list(counters[source * n:(source + 1) * n])
+
+    # --- Rendering ---
+    def render_table(self, alive_players: Sequence[str], max_rows: int = TABLE_MAX_ROWS) -> str:
+        """
+        The most suspected alive players as prompt text (empty before anyone was accused or voted for).
+        Every prompt of a phase sees the same log and alive set, so the text is built once and reused.
+        """
+        cache_key = (self.folded_count, tuple(sorted(alive_players)), max_rows)
+        if self._table_cache is not None and self._table_cache[0] == cache_key:
+            return self._table_cache[1]
+        rows = []
+        for player in cache_key[1]:
+            j = self._index.get(player)
+            if j is None: continue
+            accused, voted = self.times_accused[j], self.votes_received[j]
+            if not accused and not voted: continue
+            accusers = sum(1 for c in self._column(self.accusations, j) if c)
+            own = self._row(self.accusations, j)
+            top = max(range(len(own)), key=own.__getitem__)
+            rows.append((accused + voted, player, accused, accusers, voted, self.defenses[j],
+                         self.player_ids[top] if own[top] else "-"))
+        if not rows:
+            text = ""
+        else:
+            rows.sort(key=lambda row: (-row[0], row[1]))
+            lines = [f"{p} | {a} by {n} | {v} | {d} | {t}" for _, p, a, n, v, d, t in rows[:max_rows]]
+            if len(rows) > max_rows: lines.append(f"(+{len(rows) - max_rows} more with fewer accusations/votes)")
+            text = ("\n--- Suspicion Table (whole game, alive players) ---\n"
+                    "Player | Accused (times by players) | Votes received | Defended self | Accuses most\n"
+                    + "\n".join(lines) + "\n")
+        self._table_cache = (cache_key, text)
+        return text
+
+    # --- Analytics ---
+    def analytics(self, roles: Dict[str, str], evil_roles: Sequence[str] = ('Imp',)) -> Dict[str, Any]:
+        """
+        How well suspicion tracked the truth: for each player, how many accusations and votes they
+        cast and how many of those hit an evil player; plus the same shares for the whole game.
+        """
+        n = len(self.player_ids)
+        evil = [roles.get(p) in evil_roles for p in self.player_ids]
+        per_player: Dict[str, Dict[str, Any]] = {}
+        totals = {"accusations": 0, "accusations_on_evil": 0, "votes": 0, "votes_on_evil": 0}
+        for i, player in enumerate(self.player_ids):
+            accused, voted = self._row(self.accusations, i), self._row(self.votes, i)
+            stats = {
+                "role": roles.get(player),
+                "accusations": sum(accused),
+                "accusations_on_evil": sum(c for c, e in zip(accused, evil) if e),
+                "votes": sum(voted),
+                "votes_on_evil": sum(c for c, e in zip(voted, evil) if e),
+                "times_accused": self.times_accused[i],
+                "defenses": self.defenses[i],
+            }
+            per_player[player] = stats
+            if not evil[i]: # Accuracy is only meaningful for players who did not know the answer
+                for key in totals: totals[key] += stats[key]
+        good_accusation_accuracy = totals["accusations_on_evil"] / totals["accusations"] if totals["accusations"] else None
+        good_vote_accuracy = totals["votes_on_evil"] / totals["votes"] if totals["votes"] else None
+        return {"players": per_player, "good_team": totals,
+                "good_accusation_accuracy": good_accusation_accuracy, "good_vote_accuracy": good_vote_accuracy,
+                "evil_share": sum(evil) / n if n else None}
+
+
+# --- Per-Game Matrix ---
+
+def get_suspicion_matrix(game_state) -> SuspicionMatrix:
+    """The game's matrix (kept in its log readers), folded up to the end of `game_state`'s public log."""
+    player_ids = tuple(p['id'] for p in game_state.get('players') or [])
+    matrix = log_readers(game_state).get('suspicion_matrix', lambda: SuspicionMatrix(player_ids))
+    folded = matrix.fold(game_state.get('public_log') or [])
+    if folded: logging.debug(f"Suspicion matrix: folded {folded} new entries ({matrix.folded_count} total).")
+    return matrix
+
+
+def suspicion_context(game_state, max_rows: int = TABLE_MAX_ROWS) -> str:
+    """Prompt block with the suspicion table for the alive players."""
+    return get_suspicion_matrix(game_state).render_table(game_state.get('alive_players') or [], max_rows)
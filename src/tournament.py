@@ -0,0 +1,645 @@
+# src/tournament.py
+"""
+Tournaments between player policies, with ratings and sequential significance tests.
+
+A policy is an AI backend plus its settings: the LLM with a prompt directory
+or model of its own, the heuristic bots, or the scripted stand-in (see
+`parse_policy`). Games are headless all-AI games.
+
+Seating: every deal (a game seed, which fixes the role deal) is played once
+per (Good-side policy, Evil-side policy) pairing drawn from the two side
+pools. Each policy therefore plays every role of the same deal against every
+opponent, and two policies on one side can be compared pair by pair on
+identical deals and opponents, which removes most of the role-luck variance. To test
+a new `impostor.txt` cheaply, put both prompt variants in the Evil pool and the
+heuristic bots alone in the Good pool.
+
+Statistics, updated after every game:
+- Elo per (policy, role). The Good and Evil teams are rated as seat-weighted
+  means, and each member's rating moves by its share of the team's update.
+  Bootstrap intervals come from resampling games.
+- Win rate per (policy, side), with Wilson intervals.
+- For every pair of policies in a side's pool: the mean paired difference in
+  win rate, its z statistic and a confidence interval.
+
+The tournament checks the comparisons at fixed interim points. It stops once
+all of them are decided: |z| beats a Bonferroni boundary over the planned
+number of looks, so stopping early does not inflate the false-positive rate
+beyond `alpha`. A comparison needs MIN_DECISION_PAIRS pairs first, and when
+every pair differs the same way (no variance) an exact sign test stands in
+for the z test.
+
+Games run in worker processes: the policy RNG and the backend assignment are
+module globals, so two games must never share a process at the same time.
+With a store (see tournament_store.py), each batch is split into one shard per
+worker. Shards share an on-disk results table and LLM response cache, and an
+interrupted run resumes where it stopped. Aggregation is incremental either way.
+"""
+import io
+import json
+import asyncio
+import math
+import time
+import random
+import logging
+import functools
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, wait
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple, Any, NamedTuple, Callable, Iterable
+
+from .graph_setup import get_executor
+from .nodes.utility_nodes import initialize_game
+from .decision_handler import AI_DECISION_BACKENDS, register_ai_backend, set_player_backends
+from .ai_player import get_ai_decision_logic
+from .state import apply_state_update
+from .llm_session import llm_session
+from .llm_interface import set_response_cache
+from .tournament_store import ResultStore, ResponseCache
+from .heuristic_policy import seed_heuristic_policy
+from .game_trace import start_game_trace, stop_game_trace, trace_writer, flush_trace_writers, TraceWriter
+from .game_archive import GameArchive, open_archive
+
+# --- Defaults ---
+INITIAL_RATING = 1500.0
+ELO_K = 24.0
+ALPHA = 0.05 # Overall false-positive rate across all interim looks
+MIN_DECISION_PAIRS = 10 # Paired deals a comparison needs before it can be decided
+BOOTSTRAP_SAMPLES = 200
+SIDES = ('Good', 'Evil')
+POLICY_BACKENDS = ('llm', 'heuristic', 'scripted')
+POLICY_OPTIONS = ('prompts', 'model') # LLM policies only
+
+
+def side_of(role: Optional[str]) -> str:
+    return 'Evil' if role == 'Imp' else 'Good'
+
+
+# --- Policies ---
+
+class Policy(NamedTuple):
+    name: str
+    backend: str # One of POLICY_BACKENDS
+    prompt_dir: Optional[str] = None # Role prompts override src/prompts where this directory has them
+    model: Optional[str] = None # Primary model; the fallback chain is unchanged
+
+    @property
+    def backend_name(self) -> str:
+        """Name this policy is registered under in decision_handler.AI_DECISION_BACKENDS."""
+        return f"policy:{self.name}"
+
+
+def parse_policy(spec: str) -> Policy:
+    """
+    'NAME=BACKEND[:key=value,...]' or just 'BACKEND', e.g.
+    'heuristic', 'imp_v2=llm:prompts=experiments/imp_v2', 'big=llm:model=openai/gpt-4o'.
+    """
+    name, _, definition = spec.partition('=') if '=' in spec.split(':', 1)[0] else (spec, '', spec)
+    backend, _, option_text = definition.partition(':')
+    if backend not in POLICY_BACKENDS:
+        raise ValueError(f"Policy '{spec}': unknown backend '{backend}'. Choose from: {', '.join(POLICY_BACKENDS)}")
+    options: Dict[str, str] = {}
+    for item in filter(None, option_text.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep or key not in POLICY_OPTIONS:
+            raise ValueError(f"Policy '{spec}': bad option '{item}'. Options: {', '.join(POLICY_OPTIONS)} (as key=value).")
+        options[key] = value
+    if options and backend != 'llm':
+        raise ValueError(f"Policy '{spec}': options only apply to the llm backend.")
+    return Policy(name=name, backend=backend, prompt_dir=options.get('prompts'), model=options.get('model'))
+
+
+def register_policies(policies: Iterable[Policy]) -> None:
+    """Makes every policy selectable per player (see decision_handler.set_player_backends)."""
+    for policy in policies:
+        if policy.backend == 'llm':
+            backend = functools.partial(get_ai_decision_logic, prompt_dir=policy.prompt_dir, model=policy.model)
+        else:
+            backend = AI_DECISION_BACKENDS[policy.backend]
+        register_ai_backend(policy.backend_name, backend)
+
+
+# --- Scheduling ---
+
+class GameSpec(NamedTuple):
+    deal: int # Index of the deal; the game seed is base_seed + deal
+    seed: int
+    good_policy: str
+    evil_policy: str
+
+
+class GameResult(NamedTuple):
+    spec: GameSpec
+    roles: Tuple[str, ...] # Role per seat
+    winner: Optional[str] # 'Good' / 'Evil'; None if the game failed
+    rounds: int
+    seconds: float
+    error: Optional[str] = None
+
+
+def deal_games(deal: int, base_seed: int, good_pool: Sequence[str], evil_pool: Sequence[str]) -> List[GameSpec]:
+    """All pairings for one deal, in a fixed order."""
+    return [GameSpec(deal, base_seed + deal, good, evil) for good in good_pool for evil in evil_pool]
+
+
+def checkpoints(min_deals: int, max_deals: int, check_every: int) -> List[int]:
+    """Deal counts at which the comparisons are tested; the last one is the budget."""
+    points = list(range(max(1, min_deals), max_deals, max(1, check_every)))
+    return points + [max_deals] if not points or points[-1] != max_deals else points
+
+
+def play_game(spec: GameSpec, policies: Sequence[Policy], num_players: int, executor: str = "native",
+              traces: Optional[TraceWriter] = None, archive: Optional[GameArchive] = None,
+              loop: Optional[asyncio.AbstractEventLoop] = None) -> GameResult:
+    """
+    One headless game, reset and seeded as run_game_sync does. Safe to run in a worker process.
+    With `traces`, the game's events, decisions and outcome are added to that writer (see game_trace.py);
+    with `archive`, the game is added to that game archive (see game_archive.py).
+    `loop` is the event loop the game's LLM session runs on (e.g. a latency_sim.VirtualClockLoop).
+    """
+    started = time.perf_counter()
+    register_policies(policies)
+    by_name = {p.name: p for p in policies}
+    random.seed(spec.seed)
+    seed_heuristic_policy(spec.seed)
+    player_ids = [f"P{i:02d}" for i in range(num_players)]
+    roles: Tuple[str, ...] = ()
+    seats: Dict[str, str] = {}
+    state = None
+    winner, rounds = None, 0
+    game_trace = start_game_trace(spec.seed, f"{spec.good_policy} vs {spec.evil_policy}") if traces or archive else None
+    try:
+        with redirect_stdout(io.StringIO()): # Routing functions print() their decisions
+            state = initialize_game({"player_ids": player_ids, "human_player_id": None})
+            role_by_id = {p['id']: p['role'] for p in state['players']}
+            roles = tuple(role_by_id[p] for p in player_ids)
+            seats = {p: by_name[spec.evil_policy if role_by_id[p] == 'Imp' else spec.good_policy].backend_name
+                     for p in player_ids}
+            set_player_backends(seats)
+            run_config = {"recursion_limit": 20 * num_players + 100}
+            with llm_session(loop=loop):
+                for step_output in get_executor(executor).stream(state, run_config, stream_mode="updates"):
+                    node_name, update = next(iter(step_output.items()))
+                    if update: state = apply_state_update(state, update)
+                    if game_trace: game_trace.observe(node_name, update or {}, state)
+        winner, rounds = state.get('winner'), state.get('round_number', 0)
+        error = None if winner in SIDES else f"game ended without a winner ({winner!r})"
+    except Exception as e:
+        logging.error(f"Tournament game {spec} failed: {e}", exc_info=True)
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        set_player_backends({})
+        stop_game_trace()
+    if game_trace:
+        game_trace.finish(state, seats, error)
+        if traces: traces.add(game_trace)
+        if archive: archive.add(game_trace)
+    return GameResult(spec, roles, winner if error is None else None, rounds, time.perf_counter() - started, error)
+
+
+# --- Ratings ---
+
+def team_shares(result: GameResult) -> Dict[str, Dict[Tuple[str, str], float]]:
+    """{side: {(policy, role): share of that side's seats}} for one game."""
+    shares: Dict[str, Dict[Tuple[str, str], float]] = {side: {} for side in SIDES}
+    for role in result.roles:
+        side = side_of(role)
+        policy = result.spec.evil_policy if side == 'Evil' else result.spec.good_policy
+        shares[side][(policy, role)] = shares[side].get((policy, role), 0) + 1
+    for members in shares.values():
+        total = sum(members.values())
+        for key in members: members[key] /= total
+    return shares
+
+
+def apply_elo(ratings: Dict[Tuple[str, str], float], result: GameResult, k: float = ELO_K) -> None:
+    """One Good-team vs Evil-team Elo update of the (policy, role) ratings in place."""
+    shares = team_shares(result)
+    team = {side: sum(ratings.get(key, INITIAL_RATING) * w for key, w in members.items())
+            for side, members in shares.items()}
+    expected_good = 1.0 / (1.0 + 10 ** ((team['Evil'] - team['Good']) / 400.0))
+    delta = k * ((1.0 if result.winner == 'Good' else 0.0) - expected_good)
+    for side, sign in (('Good', 1.0), ('Evil', -1.0)):
+        for key, w in shares[side].items():
+            ratings[key] = ratings.get(key, INITIAL_RATING) + sign * delta * w
+
+
+def elo_ratings(results: Iterable[GameResult], k: float = ELO_K) -> Dict[Tuple[str, str], float]:
+    """Elo per (policy, role), applied in the given order."""
+    ratings: Dict[Tuple[str, str], float] = {}
+    for result in results:
+        if result.winner is not None: apply_elo(ratings, result, k)
+    return ratings
+
+
+def bootstrap_elo(results: Sequence[GameResult], samples: int = BOOTSTRAP_SAMPLES, level: float = 0.95,
+                  seed: int = 0) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """Percentile intervals for elo_ratings, resampling games with replacement (which also shuffles the order)."""
+    finished = [r for r in results if r.winner is not None]
+    if not finished: return {}
+    rng = random.Random(seed)
+    draws: Dict[Tuple[str, str], List[float]] = {}
+    for _ in range(samples):
+        for key, rating in elo_ratings(rng.choices(finished, k=len(finished))).items():
+            draws.setdefault(key, []).append(rating)
+    tail = (1.0 - level) / 2
+    intervals = {}
+    for key, values in draws.items():
+        values.sort()
+        intervals[key] = (values[int(tail * (len(values) - 1))], values[int((1 - tail) * (len(values) - 1))])
+    return intervals
+
+
+# --- Statistics ---
+
+def wilson_interval(wins: float, games: float, z: float = 1.96) -> Tuple[Optional[float], Optional[float]]:
+    if games <= 0: return (None, None)
+    p = wins / games
+    denominator = 1 + z * z / games
+    centre = (p + z * z / (2 * games)) / denominator
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return (max(0.0, centre - half), min(1.0, centre + half))
+
+
+def boundary_z(alpha: float, looks: int) -> float:
+    """Two-sided critical |z| per look, Bonferroni-corrected over `looks` interim analyses."""
+    return NormalDist().inv_cdf(1 - alpha / (2 * max(1, looks)))
+
+
+def _compare(side: str, a: str, b: str, n: int, total: float, squares: float, z_crit: float) -> Dict[str, Any]:
+    mean = total / n if n else 0.0
+    se = math.sqrt(max(0.0, squares - n * mean * mean) / (n - 1) / n) if n > 1 else 0.0
+    if se > 0: z = mean / se
+    elif mean == 0 or n < 2: z = 0.0
+    else:
+        # Every pair differs the same way: no variance to estimate, so use the exact sign test
+        # (two-sided p = 2 * 0.5^n), expressed as the z with the same p for the same boundary.
+        z = math.copysign(-NormalDist().inv_cdf(max(0.5 ** n, 1e-300)), mean)
+    decided = n >= MIN_DECISION_PAIRS and abs(z) >= z_crit
+    return {
+        "side": side, "policy_a": a, "policy_b": b, "pairs": n,
+        "win_rate_difference": mean, # a minus b
+        "interval": (mean - z_crit * se, mean + z_crit * se) if n > 1 else (None, None),
+        "z": z, "z_critical": z_crit, "decided": decided,
+        "better": (a if mean > 0 else b) if decided else None,
+    }
+
+
+# --- Incremental Aggregation ---
+
+class TournamentTally:
+    """
+    Everything the report needs, updated one result at a time; results may arrive in any order
+    (shards finish independently, resumed games come from the store). Win counts and paired
+    differences do not depend on order. Elo does, so results are applied to it in schedule order
+    as the completed prefix of the schedule grows: the ratings are the same for any worker count.
+    """
+    def __init__(self, good_pool: Sequence[str], evil_pool: Sequence[str], k: float = ELO_K):
+        self.good_pool, self.evil_pool = list(good_pool), list(evil_pool)
+        self.k = k
+        self.results: Dict[Tuple[int, str, str], GameResult] = {}
+        self.counts: Dict[Tuple[str, str], List[int]] = {} # (policy, role) -> [games, wins]
+        self.pairs: Dict[Tuple[str, str, str], List[float]] = {} # (side, a, b) -> [pairs, sum, sum of squares]
+        self.ratings: Dict[Tuple[str, str], float] = {}
+        self._pairings = [(good, evil) for good in self.good_pool for evil in self.evil_pool]
+        self._elo_position = 0 # Schedule position of the next game Elo needs
+        self._final_position = 0 # Positions below this will not receive (more) results
+
+    @property
+    def failed(self) -> List[GameResult]:
+        return [r for r in self.results.values() if r.winner is None]
+
+    def add(self, result: GameResult) -> None:
+        """Adds a result; a failed game is replaced by its successful retry, a finished one is kept."""
+        spec = result.spec
+        key = (spec.deal, spec.good_policy, spec.evil_policy)
+        previous = self.results.get(key)
+        if previous is not None and (previous.winner is not None or result.winner is None): return
+        self.results[key] = result
+        if result.winner is None: return
+        for members in team_shares(result).values():
+            for policy_role in members:
+                games_wins = self.counts.setdefault(policy_role, [0, 0])
+                games_wins[0] += 1
+                games_wins[1] += int(side_of(policy_role[1]) == result.winner)
+        self._add_pairs(spec.deal, spec.good_policy, spec.evil_policy, result.winner)
+        self._advance_elo()
+
+    def _add_pairs(self, deal: int, good: str, evil: str, winner: str) -> None:
+        # Pair the new game with every game of the same deal that differs only in one side's policy.
+        for side, pool, mine in (('Good', self.good_pool, good), ('Evil', self.evil_pool, evil)):
+            won = float(winner == side)
+            for other in pool:
+                if other == mine: continue
+                twin = self.results.get((deal, other, evil) if side == 'Good' else (deal, good, other))
+                if twin is None or twin.winner is None: continue
+                diff = won - float(twin.winner == side)
+                a, b = (mine, other) if pool.index(mine) < pool.index(other) else (other, mine)
+                if a != mine: diff = -diff
+                sums = self.pairs.setdefault((side, a, b), [0, 0.0, 0.0])
+                sums[0] += 1
+                sums[1] += diff
+                sums[2] += diff * diff
+
+    def _spec_key(self, position: int) -> Tuple[int, str, str]:
+        good, evil = self._pairings[position % len(self._pairings)]
+        return (position // len(self._pairings), good, evil)
+
+    def _advance_elo(self) -> None:
+        while True:
+            result = self.results.get(self._spec_key(self._elo_position))
+            if result is not None and result.winner is not None:
+                apply_elo(self.ratings, result, self.k)
+            elif self._elo_position >= self._final_position:
+                break # Not played yet (or failed and may still be retried)
+            self._elo_position += 1
+
+    def finalize(self, deals: int) -> None:
+        """Marks deals below `deals` as complete: Elo moves past their failed or missing games."""
+        self._final_position = max(self._final_position, deals * len(self._pairings))
+        self._advance_elo()
+
+    def ordered_results(self) -> List[GameResult]:
+        return [self.results[key] for key in sorted(self.results, key=self._schedule_position)]
+
+    def _schedule_position(self, key: Tuple[int, str, str]) -> int:
+        return key[0] * len(self._pairings) + self._pairings.index(key[1:])
+
+    def comparisons(self, z_crit: float) -> List[Dict[str, Any]]:
+        """For each side and each pair of that side's policies: the mean paired difference in win rate."""
+        comparisons = []
+        for side, pool in (('Good', self.good_pool), ('Evil', self.evil_pool)):
+            for i, a in enumerate(pool):
+                for b in pool[i + 1:]:
+                    comparisons.append(_compare(side, a, b, *self.pairs.get((side, a, b), (0, 0.0, 0.0)), z_crit))
+        return comparisons
+
+    def table(self, intervals: Dict[Tuple[str, str], Tuple[float, float]]) -> List[Dict[str, Any]]:
+        """Per (policy, role): games, wins, win rate with Wilson interval, Elo with bootstrap interval."""
+        rows = []
+        for (policy, role), (games, wins) in sorted(self.counts.items()):
+            rows.append({"policy": policy, "role": role, "side": side_of(role), "games": games, "wins": wins,
+                         "win_rate": wins / games, "win_rate_interval": wilson_interval(wins, games),
+                         "elo": self.ratings.get((policy, role), INITIAL_RATING),
+                         "elo_interval": intervals.get((policy, role), (None, None))})
+        return rows
+
+
+# --- Sharded Execution ---
+
+STORE_POLL_SECONDS = 1.0 # How often the coordinator folds rows written by the shards
+
+
+def run_shard(store_path: str, specs: Sequence[GameSpec], policies: Sequence[Policy], num_players: int,
+              executor: str = "native", trace_dir: Optional[str] = None, archive_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Plays `specs` one after another in this process, writing each result to the shared store as
+    soon as it is known, with LLM responses served from / added to the store's cache.
+    Game traces (with `trace_dir`) are written when the shard ends; archived games (with
+    `archive_path`) as each game ends.
+    Returns this shard's response-cache hits and misses.
+    """
+    store, cache = ResultStore(store_path), ResponseCache(store_path)
+    set_response_cache(cache)
+    try:
+        for spec in specs:
+            if (spec.deal, spec.good_policy, spec.evil_policy) in store.completed(spec.deal, spec.deal + 1):
+                continue # Finished by another run on the same store since this shard was planned
+            store.add(play_game(spec, policies, num_players, executor, trace_writer(trace_dir) if trace_dir else None,
+                                open_archive(archive_path) if archive_path else None))
+    finally:
+        set_response_cache(None)
+        store.close()
+        cache.close()
+        flush_trace_writers()
+    return cache.metrics()
+
+
+def play_pool_game(spec: GameSpec, policies: Sequence[Policy], num_players: int, executor: str,
+                   trace_dir: Optional[str], archive_path: Optional[str] = None) -> GameResult:
+    """play_game for process pools: traces go to the worker's own writer for `trace_dir`, games to its archive connection."""
+    return play_game(spec, policies, num_players, executor, trace_writer(trace_dir) if trace_dir else None,
+                     open_archive(archive_path) if archive_path else None)
+
+
+def result_to_row(result: GameResult) -> List[Any]:
+    """Flat, JSON-friendly form of a result (the tournament store's column order)."""
+    spec = result.spec
+    return [spec.deal, spec.seed, spec.good_policy, spec.evil_policy, json.dumps(result.roles), result.winner,
+            result.rounds, result.seconds, result.error]
+
+
+def result_from_row(row: Sequence[Any]) -> GameResult:
+    deal, seed, good, evil, roles, winner, rounds, seconds, error = row
+    return GameResult(GameSpec(deal, seed, good, evil), tuple(json.loads(roles)), winner, rounds, seconds, error)
+
+
+def tournament_config(policies: Sequence[Policy], good_pool: Sequence[str], evil_pool: Sequence[str],
+                      num_players: int, base_seed: int, executor: str) -> Dict[str, Any]:
+    """What must match for two sets of results to be pooled (budgets and alpha may differ)."""
+    return {"policies": [p._asdict() for p in policies], "good_pool": list(good_pool), "evil_pool": list(evil_pool),
+            "players": num_players, "base_seed": base_seed, "executor": executor}
+
+
+# --- Runner ---
+
+class Tournament:
+    """
+    Plays deals in batches until every comparison is decided or the deal budget is spent.
+    With `store_path`, each batch is split into one shard per worker. Shards write their games
+    to the shared SQLite store, which the coordinator folds into the tally as they arrive.
+    A rerun on the same store skips finished games and makes the same stopping decisions.
+    """
+    def __init__(self, policies: Sequence[Policy], num_players: int = 5,
+                 good_pool: Optional[Sequence[str]] = None, evil_pool: Optional[Sequence[str]] = None,
+                 max_deals: int = 200, min_deals: int = 20, check_every: int = 10, alpha: float = ALPHA,
+                 workers: int = 1, executor: str = "native", base_seed: int = 0, store_path: Optional[str] = None,
+                 trace_dir: Optional[str] = None, archive_path: Optional[str] = None):
+        names = [p.name for p in policies]
+        if len(set(names)) != len(names): raise ValueError(f"Duplicate policy names: {names}")
+        self.policies = list(policies)
+        self.good_pool = list(good_pool or names)
+        self.evil_pool = list(evil_pool or names)
+        unknown = (set(self.good_pool) | set(self.evil_pool)) - set(names)
+        if unknown: raise ValueError(f"Side pools name unknown policies: {sorted(unknown)}")
+        if len(self.good_pool) < 2 and len(self.evil_pool) < 2:
+            raise ValueError("Nothing to compare: at least one side needs two or more policies.")
+        self.num_players = num_players
+        self.max_deals = max_deals
+        self.checkpoints = checkpoints(min_deals, max_deals, check_every)
+        self.z_crit = boundary_z(alpha, len(self.checkpoints))
+        self.alpha = alpha
+        self.workers = workers
+        self.executor = executor
+        self.base_seed = base_seed
+        self.store_path = store_path
+        self.trace_dir = trace_dir # Not part of config(): traces do not change results
+        self.archive_path = archive_path # Same
+        self.store = ResultStore(store_path) if store_path else None
+        if self.store: self.store.bind(self.config())
+        self.tally = TournamentTally(self.good_pool, self.evil_pool)
+        self.resumed_games = 0
+        self.cache_metrics = {"hits": 0, "misses": 0}
+        self.stop_reason: Optional[str] = None
+
+    def config(self) -> Dict[str, Any]:
+        return tournament_config(self.policies, self.good_pool, self.evil_pool, self.num_players, self.base_seed, self.executor)
+
+    def _play_batch(self, deal_from: int, deal_to: int, pool: Optional[ProcessPoolExecutor]) -> None:
+        specs = [spec for deal in range(deal_from, deal_to)
+                 for spec in deal_games(deal, self.base_seed, self.good_pool, self.evil_pool)]
+        if self.store is None:
+            if pool is None:
+                results = [play_pool_game(spec, self.policies, self.num_players, self.executor, self.trace_dir, self.archive_path)
+                           for spec in specs]
+            else:
+                results = pool.map(play_pool_game, specs, [self.policies] * len(specs), [self.num_players] * len(specs),
+                                   [self.executor] * len(specs), [self.trace_dir] * len(specs), [self.archive_path] * len(specs))
+            for result in results: self.tally.add(result)
+            return
+
+        done = self.store.completed(deal_from, deal_to)
+        self.resumed_games += len(done)
+        todo = [spec for spec in specs if (spec.deal, spec.good_policy, spec.evil_policy) not in done]
+        cursor = self._fold(0, deal_from, deal_to) # Games finished by an earlier run
+        shards = [todo[i::self.workers] for i in range(self.workers) if todo[i::self.workers]]
+        if pool is None:
+            for shard in shards:
+                self._merge_cache_metrics(run_shard(self.store_path, shard, self.policies, self.num_players, self.executor,
+                                                    self.trace_dir, self.archive_path))
+        elif shards:
+            futures = [pool.submit(run_shard, self.store_path, shard, self.policies, self.num_players, self.executor,
+                                   self.trace_dir, self.archive_path)
+                       for shard in shards]
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=STORE_POLL_SECONDS)
+                cursor = self._fold(cursor, deal_from, deal_to)
+                logging.info(f"Tournament: {len(self.tally.results)} games folded, {len(pending)} shards running.")
+            for future in futures: self._merge_cache_metrics(future.result())
+        self._fold(cursor, deal_from, deal_to)
+
+    def _fold(self, cursor: int, deal_from: int, deal_to: int) -> int:
+        for row_id, row in self.store.rows_since(cursor, deal_from, deal_to):
+            self.tally.add(result_from_row(row))
+            cursor = row_id
+        return cursor
+
+    def _merge_cache_metrics(self, metrics: Dict[str, int]) -> None:
+        for key, value in metrics.items(): self.cache_metrics[key] += value
+
+    def run(self, on_checkpoint: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        pool = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        started, deals_done = time.perf_counter(), 0
+        try:
+            for point in self.checkpoints:
+                self._play_batch(deals_done, point, pool)
+                self.tally.finalize(point)
+                deals_done = point
+                report = self.report(time.perf_counter() - started, deals_done, with_intervals=False)
+                if on_checkpoint: on_checkpoint(report)
+                if report["comparisons"] and all(c["decided"] for c in report["comparisons"]):
+                    self.stop_reason = f"all comparisons decided after {deals_done} deals"
+                    break
+            else:
+                self.stop_reason = f"deal budget of {self.max_deals} spent"
+        finally:
+            if pool is not None: pool.shutdown() # Workers write their buffered game traces as they exit
+            if self.store is not None: self.store.close()
+            if self.trace_dir: flush_trace_writers()
+        return self.report(time.perf_counter() - started, deals_done)
+
+    def report(self, elapsed: float, deals: int, with_intervals: bool = True) -> Dict[str, Any]:
+        intervals = bootstrap_elo(self.tally.ordered_results()) if with_intervals else {}
+        failed = self.tally.failed
+        return {
+            "players": self.num_players, "deals": deals, "games": len(self.tally.results), "failed_games": len(failed),
+            "errors": sorted({r.error for r in failed if r.error})[:5],
+            "elapsed_seconds": round(elapsed, 3), "stop_reason": self.stop_reason,
+            "alpha": self.alpha, "looks_planned": len(self.checkpoints),
+            "good_pool": self.good_pool, "evil_pool": self.evil_pool,
+            "policies": {p.name: p._asdict() for p in self.policies},
+            "store": self.store_path, "resumed_games": self.resumed_games, "response_cache": dict(self.cache_metrics),
+            "trace_dir": self.trace_dir, "archive": self.archive_path,
+            "table": self.tally.table(intervals),
+            "comparisons": self.tally.comparisons(self.z_crit),
+        }
+
+
+# --- Sweeps on a Work Queue ---
+# Fixed-budget grids (policies x player counts) split into deal batches that any number of hosts
+# pull from a shared work_queue.WorkQueue directory. No early stopping: every cell is played in full.
+
+SWEEP_JOB_KIND = "tournament_games"
+
+
+def sweep_jobs(policies: Sequence[Policy], player_counts: Sequence[int], deals: int, batch_deals: int,
+               good_pool: Optional[Sequence[str]] = None, evil_pool: Optional[Sequence[str]] = None,
+               base_seed: int = 0, executor: str = "native") -> List[Tuple[str, Dict[str, Any]]]:
+    """(job id, payload) for every player count and batch of `batch_deals` deals."""
+    names = [p.name for p in policies]
+    jobs = []
+    for num_players in player_counts:
+        config = tournament_config(policies, good_pool or names, evil_pool or names, num_players, base_seed, executor)
+        config_id = ResponseCache.key(config)[:10] # Different sweeps can share one queue directory
+        for start in range(0, deals, batch_deals):
+            specs = [list(spec) for deal in range(start, min(deals, start + batch_deals))
+                     for spec in deal_games(deal, base_seed, config["good_pool"], config["evil_pool"])]
+            jobs.append((f"{config_id}-p{num_players:03d}-d{start:06d}", {"kind": SWEEP_JOB_KIND, "config": config, "specs": specs}))
+    return jobs
+
+
+def run_sweep_job(payload: Dict[str, Any], response_cache_path: Optional[str] = None,
+                  trace_dir: Optional[str] = None, archive_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Work-queue handler: plays one batch of games and returns their rows. With `trace_dir`, the batch's
+    game traces are written as one part named after the job, so a job that is reclaimed and played
+    again replaces its part instead of duplicating the games. With `archive_path`, each game is added
+    to that game archive as it ends.
+    """
+    if payload.get("kind") != SWEEP_JOB_KIND: raise ValueError(f"Not a sweep job: {payload.get('kind')!r}")
+    config = payload["config"]
+    policies = [Policy(**p) for p in config["policies"]]
+    cache = ResponseCache(response_cache_path) if response_cache_path else None
+    set_response_cache(cache)
+    job_traces = TraceWriter(trace_dir, games_per_part=len(payload["specs"]) + 1) if trace_dir else None
+    try:
+        archive = open_archive(archive_path) if archive_path else None
+        rows = [result_to_row(play_game(GameSpec(*spec), policies, config["players"], config["executor"], job_traces, archive))
+                for spec in payload["specs"]]
+        if job_traces: job_traces.flush(part_name=f"job-{ResponseCache.key(payload)[:16]}")
+    finally:
+        set_response_cache(None)
+        if cache: cache.close()
+    return {"config": config, "rows": rows, "cache": cache.metrics() if cache else None}
+
+
+def aggregate_sweep(job_results: Iterable[Dict[str, Any]], alpha: float = ALPHA) -> List[Dict[str, Any]]:
+    """One report per sweep cell (configuration) from completed job results, in any order."""
+    cells: Dict[str, Tuple[Dict[str, Any], TournamentTally, List[int]]] = {}
+    given_up = 0
+    for job in job_results:
+        if "config" not in job: # A job the queue gave up on
+            given_up += 1
+            continue
+        cell_key = json.dumps(job["config"], sort_keys=True)
+        if cell_key not in cells:
+            cells[cell_key] = (job["config"], TournamentTally(job["config"]["good_pool"], job["config"]["evil_pool"]), [0])
+        _, tally, deals = cells[cell_key]
+        for row in job["rows"]:
+            tally.add(result_from_row(row))
+            deals[0] = max(deals[0], row[0] + 1)
+    z_crit = boundary_z(alpha, 1) # One look at a fixed budget
+    reports = []
+    for config, tally, deals in sorted(cells.values(), key=lambda cell: (cell[0]["players"], json.dumps(cell[0], sort_keys=True))):
+        tally.finalize(deals[0])
+        failed = tally.failed
+        reports.append({
+            "players": config["players"], "deals": deals[0], "games": len(tally.results), "failed_games": len(failed),
+            "errors": sorted({r.error for r in failed if r.error})[:5], "jobs_given_up": given_up, "alpha": alpha,
+            "good_pool": config["good_pool"], "evil_pool": config["evil_pool"],
+            "policies": {p["name"]: p for p in config["policies"]},
+            "table": tally.table(bootstrap_elo(tally.ordered_results())),
+            "comparisons": tally.comparisons(z_crit),
+        })
+    return reports
@@ -0,0 +1,164 @@
+# src/tournament_store.py
+"""
+On-disk store shared by tournament worker processes: finished games and an LLM response cache.
+
+One SQLite file holds both tables. Every process opens its own connection
+(lazily, so nothing opened before a fork is reused in a child). The file runs
+in WAL mode, so readers never block the writer. Writes are short
+`BEGIN IMMEDIATE` transactions, and other processes wait for the lock up to
+`BUSY_TIMEOUT_SECONDS` rather than failing.
+
+- games: one row per finished game, unique per (deal, Good policy, Evil policy).
+  A worker writes its row as soon as the game ends, so a killed run loses at
+  most the games in flight; a resumed run skips every game that has a winner
+  and retries failed ones.
+- meta: the tournament configuration the file belongs to, so a resume with
+  different policies or seeds is refused instead of mixing results.
+- llm_responses: successful LLM responses keyed by a hash of the request
+  (model route chain, sampling parameters, system and user prompt). An
+  identical prompt in any worker (e.g. the same night-1 prompt in every
+  pairing of a deal) is answered from the cache. Two workers that miss at
+  the same moment both call the model; the first answer stored wins.
+"""
+import os
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+BUSY_TIMEOUT_SECONDS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, -- Never reused, so readers can follow new rows by id
+    deal INTEGER NOT NULL, good_policy TEXT NOT NULL, evil_policy TEXT NOT NULL,
+    seed INTEGER NOT NULL, roles TEXT NOT NULL, winner TEXT, rounds INTEGER NOT NULL,
+    seconds REAL NOT NULL, error TEXT, worker TEXT, finished_at REAL NOT NULL,
+    UNIQUE (deal, good_policy, evil_policy)
+);
+CREATE INDEX IF NOT EXISTS games_by_deal ON games (deal);
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY, response TEXT NOT NULL, model TEXT, created_at REAL NOT NULL
+);
+"""
+
+
+def worker_label() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class _Database:
+    """A per-process connection to the shared file (reopened after a fork)."""
+    SCHEMA = _SCHEMA # Created on connect; subclasses that keep other tables replace it
+    FILE_PRAGMAS: Tuple[str, ...] = () # Run before WAL mode is set, e.g. auto_vacuum (a new WAL file cannot change it)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None) # Explicit transactions
+            for pragma in self.FILE_PRAGMAS: conn.execute(f"PRAGMA {pragma}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL") # Durable at checkpoints; a crash loses at most the last commits
+            conn.executescript(self.SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def write(self, *statements: Tuple[str, Sequence[Any]]) -> None:
+        """Runs (sql, params) statements in one transaction."""
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE") # Take the write lock up front instead of upgrading mid-transaction
+        try:
+            for sql, params in statements:
+                conn.execute(sql, params)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid(): self._conn.close()
+        self._conn = None
+
+
+# --- LLM Response Cache ---
+
+class ResponseCache(_Database):
+    """Successful LLM responses by request key; install with llm_interface.set_response_cache."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*request_parts: Any) -> str:
+        return hashlib.sha256(json.dumps(request_parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        if row is None: self.misses += 1
+        else: self.hits += 1
+        return row[0] if row else None
+
+    def put(self, key: str, response: str, model: Optional[str] = None) -> None:
+        try:
+            self.write(("INSERT OR IGNORE INTO llm_responses (key, response, model, created_at) VALUES (?, ?, ?, ?)",
+                        (key, response, model, time.time())))
+        except sqlite3.Error as e: # A cache that cannot be written must not fail the decision
+            logging.warning(f"Could not store LLM response in cache {self.path}: {e}")
+
+    def metrics(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+# --- Game Results ---
+
+class ResultStore(_Database):
+    """Finished tournament games, bound to one tournament configuration."""
+    def bind(self, config: Dict[str, Any]) -> None:
+        """Records `config` in a new file, or checks it matches the one already there."""
+        value = json.dumps(config, sort_keys=True)
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'tournament'").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO meta (key, value) VALUES ('tournament', ?)", (value,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is not None and row[0] != value:
+            raise ValueError(f"{self.path} belongs to a different tournament: {row[0]}")
+
+    def completed(self, deal_from: int, deal_to: int) -> Set[Tuple[int, str, str]]:
+        """(deal, good, evil) of games in [deal_from, deal_to) that finished with a winner."""
+        rows = self.conn.execute("SELECT deal, good_policy, evil_policy FROM games WHERE deal >= ? AND deal < ? "
+                                 "AND winner IS NOT NULL", (deal_from, deal_to))
+        return {tuple(row) for row in rows}
+
+    def add(self, result) -> None:
+        """Stores a GameResult; a finished game is never overwritten, a failed one is replaced by a retry."""
+        spec = result.spec
+        key = (spec.deal, spec.good_policy, spec.evil_policy)
+        self.write(
+            # The retry gets a new id, so readers following ids see it
+            ("DELETE FROM games WHERE deal = ? AND good_policy = ? AND evil_policy = ? AND winner IS NULL", key),
+            ("INSERT OR IGNORE INTO games (deal, good_policy, evil_policy, seed, roles, winner, rounds, seconds, error, "
+             "worker, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+             key + (spec.seed, json.dumps(result.roles), result.winner, result.rounds, result.seconds, result.error,
+                    worker_label(), time.time())))
+
+    def rows_since(self, row_id: int, deal_from: int, deal_to: int) -> List[Tuple[int, Tuple]]:
+        """(id, row) for games in [deal_from, deal_to) written after `row_id`, oldest first."""
+        return [(row[0], row[1:]) for row in self.conn.execute(
+            "SELECT id, deal, seed, good_policy, evil_policy, roles, winner, rounds, seconds, error FROM games "
+            "WHERE id > ? AND deal >= ? AND deal < ? ORDER BY id", (row_id, deal_from, deal_to))]
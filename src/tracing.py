@@ -0,0 +1,194 @@
+# src/tracing.py
+"""
+Lightweight span tracing for whole games.
+
+Graph nodes, `get_decision` calls, prompt builds, LLM requests and GM recovery
+are wrapped in spans. When tracing is off (the default) a span costs one
+global lookup. When on, spans are kept in memory, exported as Chrome trace /
+Perfetto JSON (open in https://ui.perfetto.dev or chrome://tracing) and
+summarized per game phase at game end.
+"""
+import os
+import json
+import time
+import heapq
+import asyncio
+import logging
+import functools
+import threading
+import contextvars
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Callable, Iterator
+
+# Graph node name -> game phase used in the end-of-game summary.
+NODE_PHASES: Dict[str, str] = {
+    "start_night": "Night",
+    "imp_action": "Night",
+    "investigator_action": "Night",
+    "start_day_announce": "Day_Announce",
+    "discussion": "Discussion",
+    "voting": "Voting",
+    "tally_votes": "Voting",
+    "announce_process_execution": "Execution",
+    "announce_no_execution": "Execution",
+    "set_winner_end": "GameOver",
+}
+
+_current_phase: contextvars.ContextVar[str] = contextvars.ContextVar("trace_phase", default="Setup")
+
+
+class Tracer:
+    """Collects completed spans. Async spans get their own lanes so concurrent decisions don't overlap."""
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self.started_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._task_lanes: "weakref.WeakKeyDictionary[asyncio.Task, List[int]]" = weakref.WeakKeyDictionary()
+        self._free_lanes: List[int] = []
+        self._next_lane = 1
+        self._lane_names: Dict[int, str] = {}
+
+    # --- Lanes (Chrome trace 'tid') ---
+    def _enter_lane(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            lane = threading.get_native_id()
+            self._lane_names.setdefault(lane, threading.current_thread().name)
+            return lane
+        with self._lock:
+            entry = self._task_lanes.get(task)
+            if entry is None:
+                lane = heapq.heappop(self._free_lanes) if self._free_lanes else self._next_lane
+                if lane == self._next_lane: self._next_lane += 1
+                self._lane_names.setdefault(lane, f"async lane {lane}")
+                entry = self._task_lanes[task] = [lane, 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _exit_lane(self) -> None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            return
+        if task is None: return
+        with self._lock:
+            entry = self._task_lanes.get(task)
+            if entry is None: return
+            entry[1] -= 1
+            if entry[1] == 0:
+                heapq.heappush(self._free_lanes, entry[0])
+                del self._task_lanes[task]
+
+    def record(self, name: str, cat: str, start_ns: int, end_ns: int, lane: int, args: Dict[str, Any]) -> None:
+        event = {
+            "name": name, "cat": cat, "ph": "X",
+            "ts": (start_ns - self.started_ns) / 1000.0,
+            "dur": (end_ns - start_ns) / 1000.0,
+            "pid": self.pid, "tid": lane, "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    # --- Export ---
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": lane, "args": {"name": name}}
+            for lane, name in self._lane_names.items()
+        ]
+        return {"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+        logging.info(f"Wrote {len(self.events)} trace spans to {path}")
+
+    def summarize_by_phase(self) -> Dict[str, Dict[str, Any]]:
+        """Per phase: node wall time plus time spent in each span category inside it."""
+        summary: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"wall_ms": 0.0, "steps": 0, "by_category_ms": defaultdict(float), "counts": defaultdict(int)})
+        for event in list(self.events):
+            phase = event["args"].get("phase", "Setup")
+            bucket = summary[phase]
+            if event["cat"] == "node":
+                bucket["wall_ms"] += event["dur"] / 1000.0
+                bucket["steps"] += 1
+            else:
+                bucket["by_category_ms"][event["cat"]] += event["dur"] / 1000.0
+                bucket["counts"][event["cat"]] += 1
+        return {
+            phase: {"wall_ms": round(b["wall_ms"], 2), "steps": b["steps"],
+                    "by_category_ms": {k: round(v, 2) for k, v in b["by_category_ms"].items()},
+                    "counts": dict(b["counts"])}
+            for phase, b in summary.items()
+        }
+
+
+_tracer: Optional[Tracer] = None
+
+
+def start_tracing() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+@contextmanager
+def span(name: str, cat: str = "span", **args) -> Iterator[None]:
+    """Times the enclosed block. No-op unless tracing has been started."""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    phase_token = None
+    if cat == "node":
+        phase_token = _current_phase.set(NODE_PHASES.get(name, name))
+    args["phase"] = _current_phase.get()
+    lane = tracer._enter_lane()
+    start_ns = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        tracer.record(name, cat, start_ns, time.perf_counter_ns(), lane, args)
+        tracer._exit_lane()
+        if phase_token is not None:
+            _current_phase.reset(phase_token)
+
+
+def traced(name: str, cat: str = "span") -> Callable:
+    """Decorator form of `span` for sync and async functions."""
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*a, **kw):
+                if _tracer is None: return await fn(*a, **kw)
+                with span(name, cat):
+                    return await fn(*a, **kw)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if _tracer is None: return fn(*a, **kw)
+            with span(name, cat):
+                return fn(*a, **kw)
+        return wrapper
+    return decorator
+
+
+def traced_node(node_name: str, node_fn: Callable) -> Callable:
+    """Wraps a graph node so its span carries the node name and sets the current phase."""
+    return traced(node_name, "node")(node_fn)
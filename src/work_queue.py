@@ -0,0 +1,213 @@
+# src/work_queue.py
+"""
+Lease-based work queue on a shared directory, with no broker process.
+
+Any number of hosts that mount the same directory (a local directory works as
+well) can enqueue jobs, claim them and write results back:
+
+    ROOT/jobs/<job>.json        the job payload, written once
+    ROOT/leases/<job>.<n>       claim number n: worker and expiry time
+    ROOT/done/<job>.json        the result, written once
+
+Every step relies on one atomic filesystem operation. Creating a name with
+link(2) fails if the name exists, and replacing a file with rename(2) is
+atomic; both are atomic on local filesystems and on NFS. The steps:
+- Enqueue and completion write a temporary file and link it into place. The
+  first writer wins, and a duplicate result from a worker whose lease was
+  reclaimed is dropped.
+- A claim creates lease n+1, and only when there is no lease yet or lease n
+  has expired. Two hosts racing for the same job race to create the same
+  name, so exactly one wins. The claimer then re-reads lease n and backs off
+  (removes n+1) if the holder renewed it in the meantime. A renewal that lands
+  after that re-read still loses the lease, but the holder finishes the job
+  anyway, so the job can run twice; the first result written to done/ is
+  kept and the other is dropped.
+- The holder renews its lease (rewrites the expiry) while it works. If the
+  holder dies, the lease expires and the next claim reclaims the job.
+- A job claimed `MAX_ATTEMPTS` times without a result is completed with an
+  error, so one job that crashes every worker cannot stall the queue.
+
+Expiry times are compared with each host's clock, so hosts need clocks that
+agree to well within `LEASE_SECONDS`.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+LEASE_SECONDS = 120.0 # A worker that has not renewed for this long is presumed dead
+MAX_ATTEMPTS = 5 # Claims per job before it is given up with an error result
+POLL_SECONDS = 2.0 # Wait between claim attempts while other workers hold every remaining job
+
+
+class Lease(NamedTuple):
+    job_id: str
+    generation: int
+    payload: Dict[str, Any]
+
+
+class WorkQueue:
+    def __init__(self, root: str, lease_seconds: float = LEASE_SECONDS, worker: Optional[str] = None):
+        self.root = root
+        self.lease_seconds = lease_seconds
+        self.worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+        self._dirs = {name: os.path.join(root, name) for name in ('jobs', 'leases', 'done', 'tmp')}
+        for path in self._dirs.values(): os.makedirs(path, exist_ok=True)
+
+    # --- Files ---
+    def _path(self, kind: str, name: str) -> str:
+        return os.path.join(self._dirs[kind], name)
+
+    def _create(self, path: str, content: Dict[str, Any]) -> bool:
+        """Writes `path` only if it does not exist yet; True if this call created it."""
+        tmp = self._path('tmp', f"{uuid.uuid4().hex}.json")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        try:
+            os.link(tmp, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(tmp)
+
+    def _replace(self, path: str, content: Dict[str, Any]) -> None:
+        tmp = self._path('tmp', f"{uuid.uuid4().hex}.json")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _lease_generations(self) -> Dict[str, int]:
+        """Newest lease generation per job."""
+        newest: Dict[str, int] = {}
+        for name in os.listdir(self._dirs['leases']):
+            job_id, _, generation = name.rpartition('.')
+            if generation.isdigit(): newest[job_id] = max(newest.get(job_id, 0), int(generation))
+        return newest
+
+    # --- Producer ---
+    def enqueue(self, job_id: str, payload: Dict[str, Any]) -> bool:
+        """Adds a job; False if a job with this id is already queued (enqueueing is idempotent)."""
+        if '.' in job_id or os.sep in job_id: raise ValueError(f"Job id '{job_id}' may not contain '.' or '{os.sep}'.")
+        return self._create(self._path('jobs', f"{job_id}.json"), payload)
+
+    def job_ids(self) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(self._dirs['jobs']) if name.endswith('.json'))
+
+    def done_ids(self) -> set:
+        return {name[:-5] for name in os.listdir(self._dirs['done']) if name.endswith('.json')}
+
+    def results(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for job_id in sorted(self.done_ids()):
+            result = self._read(self._path('done', f"{job_id}.json"))
+            if result is not None: yield job_id, result
+
+    def status(self) -> Dict[str, int]:
+        jobs, done, now = self.job_ids(), self.done_ids(), time.time()
+        leased = expired = 0
+        for job_id, generation in self._lease_generations().items():
+            if job_id in done: continue
+            lease = self._read(self._path('leases', f"{job_id}.{generation}"))
+            if lease and lease['expires_at'] > now: leased += 1
+            else: expired += 1
+        return {"jobs": len(jobs), "done": len(done & set(jobs)), "leased": leased, "expired": expired,
+                "pending": len(jobs) - len(done & set(jobs)) - leased}
+
+    # --- Consumer ---
+    def claim(self) -> Optional[Lease]:
+        """Leases the first job that is neither done nor validly leased; None if there is none right now."""
+        done, generations, now = self.done_ids(), self._lease_generations(), time.time()
+        for job_id in self.job_ids():
+            if job_id in done: continue
+            generation = generations.get(job_id, 0)
+            if generation:
+                current = self._read(self._path('leases', f"{job_id}.{generation}"))
+                if current is not None and current['expires_at'] > now: continue
+            if generation >= MAX_ATTEMPTS:
+                logging.error(f"Work queue: giving up on job {job_id} after {generation} claims.")
+                self._create(self._path('done', f"{job_id}.json"), {"error": f"no result after {generation} claims"})
+                continue
+            lease_info = {"worker": self.worker, "claimed_at": now, "expires_at": now + self.lease_seconds}
+            lease_path = self._path('leases', f"{job_id}.{generation + 1}")
+            if not self._create(lease_path, lease_info): continue # Lost the race
+            if generation and self._read(self._path('leases', f"{job_id}.{generation}")) != current:
+                os.unlink(lease_path) # The holder renewed between our read and our claim: leave it the job
+                logging.info(f"Work queue: job {job_id} was renewed by its holder while {self.worker} claimed it; backed off.")
+                continue
+            if os.path.exists(self._path('done', f"{job_id}.json")): continue # Finished since the listing above
+            payload = self._read(self._path('jobs', f"{job_id}.json"))
+            if generation: logging.warning(f"Work queue: {self.worker} reclaimed job {job_id} (claim {generation + 1}).")
+            return Lease(job_id, generation + 1, payload)
+        return None
+
+    def holds(self, lease: Lease) -> bool:
+        """False once someone reclaimed the job (this worker's lease had expired)."""
+        return self._lease_generations().get(lease.job_id, 0) == lease.generation
+
+    def renew(self, lease: Lease) -> bool:
+        if not self.holds(lease): return False
+        now = time.time()
+        self._replace(self._path('leases', f"{lease.job_id}.{lease.generation}"),
+                      {"worker": self.worker, "claimed_at": now, "expires_at": now + self.lease_seconds})
+        return True
+
+    def complete(self, lease: Lease, result: Dict[str, Any]) -> bool:
+        """Stores the result unless another worker already did; True if this one was stored."""
+        stored = self._create(self._path('done', f"{lease.job_id}.json"), result)
+        if not stored: logging.info(f"Work queue: job {lease.job_id} was already completed elsewhere; result dropped.")
+        return stored # The lease is left as is: a done job is never claimed again
+
+    def release(self, lease: Lease) -> None:
+        """Gives the lease up early; the expiry is set in the past so the next claim takes the job at once."""
+        if self.holds(lease):
+            self._replace(self._path('leases', f"{lease.job_id}.{lease.generation}"),
+                          {"worker": self.worker, "claimed_at": 0.0, "expires_at": 0.0})
+
+    def work(self, handler: Callable[[Dict[str, Any]], Dict[str, Any]], max_jobs: Optional[int] = None,
+             wait: bool = True) -> int:
+        """
+        Claims and runs jobs until the queue is finished (or `max_jobs` ran). With `wait`, keeps
+        polling while other workers hold the remaining jobs, so the leases of workers that die are
+        picked up. Returns the number of jobs this worker completed.
+        """
+        completed = 0
+        while max_jobs is None or completed < max_jobs:
+            lease = self.claim()
+            if lease is None:
+                if not wait or self.done_ids() >= set(self.job_ids()): break
+                time.sleep(POLL_SECONDS)
+                continue
+            stop_renewing = threading.Event()
+            renewer = threading.Thread(target=self._renew_until, args=(lease, stop_renewing), daemon=True)
+            renewer.start()
+            result = None
+            try:
+                result = handler(lease.payload)
+            except Exception as e:
+                logging.error(f"Work queue: job {lease.job_id} failed on {self.worker}: {e}", exc_info=True)
+            finally:
+                stop_renewing.set()
+                renewer.join() # No renewal may land after the release below
+            if result is None:
+                self.release(lease) # Another claim retries it (up to MAX_ATTEMPTS claims in all)
+            elif self.complete(lease, result):
+                completed += 1
+        return completed
+
+    def _renew_until(self, lease: Lease, stop: threading.Event) -> None:
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.renew(lease):
+                logging.warning(f"Work queue: lost the lease on {lease.job_id}; its result may be dropped.")
+                return